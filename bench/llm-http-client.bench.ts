@@ -0,0 +1,134 @@
+/**
+ * Measures what connection reuse saves per LLM call, against a local
+ * stand-in for the OpenRouter chat completions endpoint.
+ *
+ *   npm run bench:llm-http -- [calls=200] [concurrency=4] [gapMs=0]
+ *
+ * Variants: a fresh connection per call (no keep-alive), bare axios on
+ * Node's global agent, and LlmHttpClientService. BENCH_CONNECT_MS (20) is
+ * added to the first request on every connection, standing in for the
+ * network round trips of a TCP/TLS handshake; BENCH_RESPONSE_MS (50) is the simulated generation time. Set
+ * BENCH_TLS_KEY/BENCH_TLS_CERT (PEM files) to serve over HTTPS. A gapMs
+ * above 5000 shows the global agent dropping its idle sockets between calls.
+ */
+import axios from 'axios';
+import * as fs from 'fs';
+import * as http from 'http';
+import * as https from 'https';
+import { AddressInfo } from 'net';
+import { performance } from 'perf_hooks';
+import { LlmHttpClientService } from '../src/generate/llm-providers/llm-http-client.service';
+import { MetricsService } from '../src/generate/metrics.service';
+
+const calls = Number(process.argv[2]) || 200;
+const concurrency = Number(process.argv[3]) || 4;
+const gapMs = Number(process.argv[4]) || 0;
+const connectMs = Number(process.env.BENCH_CONNECT_MS ?? 20);
+const responseMs = Number(process.env.BENCH_RESPONSE_MS ?? 50);
+const tls = Boolean(process.env.BENCH_TLS_KEY && process.env.BENCH_TLS_CERT);
+
+// New TCP connections accepted by the stand-in server
+let connections = 0;
+
+const completion = JSON.stringify({
+  choices: [{ message: { role: 'assistant', content: 'x'.repeat(2000) } }],
+});
+
+function startServer(): Promise<http.Server> {
+  // The first request on a connection also pays the simulated handshake
+  const warm = new WeakSet<object>();
+  const handler: http.RequestListener = (req, res) => {
+    const delay = warm.has(req.socket) ? responseMs : connectMs + responseMs;
+    warm.add(req.socket);
+    req.resume();
+    req.on('end', () =>
+      setTimeout(() => {
+        res.setHeader('content-type', 'application/json');
+        res.end(completion);
+      }, delay),
+    );
+  };
+  const server = tls
+    ? https.createServer(
+        {
+          key: fs.readFileSync(process.env.BENCH_TLS_KEY!),
+          cert: fs.readFileSync(process.env.BENCH_TLS_CERT!),
+        },
+        handler,
+      )
+    : http.createServer(handler);
+
+  server.on(tls ? 'secureConnection' : 'connection', () => connections++);
+  server.keepAliveTimeout = 120000;
+
+  return new Promise((resolve) => server.listen(0, '127.0.0.1', () => resolve(server)));
+}
+
+async function measure(
+  name: string,
+  url: string,
+  post: (url: string, body: unknown) => Promise<unknown>,
+) {
+  const body = {
+    model: 'meta-llama/llama-3.3-70b-instruct:free',
+    messages: [{ role: 'user', content: 'Generate a dissolution profile' }],
+  };
+  const latencies: number[] = [];
+  const connectionsBefore = connections;
+  let next = 0;
+
+  const started = performance.now();
+  await Promise.all(
+    Array.from({ length: concurrency }, async () => {
+      while (next < calls) {
+        next++;
+        const t0 = performance.now();
+        await post(url, body);
+        latencies.push(performance.now() - t0);
+        if (gapMs) await new Promise((resolve) => setTimeout(resolve, gapMs));
+      }
+    }),
+  );
+  const totalMs = performance.now() - started;
+
+  latencies.sort((a, b) => a - b);
+  const pick = (p: number) => latencies[Math.min(latencies.length - 1, Math.floor(p * latencies.length))];
+  const mean = latencies.reduce((a, b) => a + b, 0) / latencies.length;
+  console.log(
+    `${name.padEnd(8)} calls=${calls} c=${concurrency}` +
+      ` mean=${mean.toFixed(1)}ms p50=${pick(0.5).toFixed(1)}ms p90=${pick(0.9).toFixed(1)}ms` +
+      ` overhead=${(mean - responseMs).toFixed(1)}ms/call` +
+      ` connections=${connections - connectionsBefore}` +
+      ` throughput=${((calls / totalMs) * 1000).toFixed(1)}/s`,
+  );
+}
+
+async function main() {
+  if (tls) {
+    // Self-signed bench certificate
+    process.env.NODE_TLS_REJECT_UNAUTHORIZED = '0';
+  }
+  const server = await startServer();
+  const { port } = server.address() as AddressInfo;
+  const url = `${tls ? 'https' : 'http'}://127.0.0.1:${port}/api/v1/chat/completions`;
+
+  const fresh = axios.create({
+    httpAgent: new http.Agent({ keepAlive: false }),
+    httpsAgent: new https.Agent({ keepAlive: false }),
+  });
+  const pooled = new LlmHttpClientService(new MetricsService());
+
+  await measure('fresh', url, (u, b) => fresh.post(u, b));
+  await measure('global', url, (u, b) => axios.post(u, b));
+  await measure('pooled', url, (u, b) => pooled.post(u, b));
+
+  pooled.onApplicationShutdown();
+  http.globalAgent.destroy();
+  https.globalAgent.destroy();
+  server.close();
+}
+
+main().catch((error) => {
+  console.error(error);
+  process.exit(1);
+});
@@ -0,0 +1,135 @@
+/**
+ * Measures ParserService on large synthetic model outputs, against the
+ * regex-based parser it replaced.
+ *
+ *   npm run bench:parser -- [sizesKb=100,1024,5120] [runs=5]
+ *
+ * Each output repeats a paragraph, a 10-row table and a ```json chart,
+ * with a ```python block every fifth section. The legacy parser rescans
+ * and rewrites the whole text for every table, so it is skipped above
+ * BENCH_LEGACY_MAX_KB (512).
+ */
+import { performance } from 'perf_hooks';
+import { GenerateResponseDto } from '../src/generate/dto/generate-response.dto';
+import { ParserService } from '../src/generate/parser.service';
+
+const sizesKb = (process.argv[2] || '100,1024,5120').split(',').map(Number);
+const runs = Number(process.argv[3]) || 5;
+const legacyMaxKb = Number(process.env.BENCH_LEGACY_MAX_KB ?? 512);
+
+const PYTHON_BLOCK = [
+  '```python',
+  'import matplotlib.pyplot as plt',
+  'plt.plot([0, 15], [0, 40])',
+  '```',
+  '',
+];
+
+function modelOutput(bytes: number): string {
+  const sections: string[] = [];
+  let length = 0;
+  for (let n = 0; length < bytes; n++) {
+    const rows = Array.from({ length: 10 }, (_, i) => `| ${i * 15} | ${(i * n) % 97}.5 |`);
+    const section = [
+      `Section ${n}: the release profile below follows first-order kinetics {k = 0.12}.`,
+      '',
+      `| Time (min) | Release ${n} (%) |`,
+      '|---|---|',
+      ...rows,
+      '',
+      '```json',
+      `{"x": [0, 15, 30, 45], "y": [0, ${n % 40}, 60, 85], "label": "Batch ${n}"}`,
+      '```',
+      '',
+      ...(n % 5 === 0 ? PYTHON_BLOCK : []),
+    ].join('\n');
+    sections.push(section);
+    length += section.length + 1;
+  }
+  return sections.join('\n');
+}
+
+// ParserService.parse before the single-pass tokenizer
+function legacyParse(text: string, label: string): GenerateResponseDto {
+  const result: GenerateResponseDto = {
+    chart: null,
+    tables: [],
+    code: null,
+    explanation: null,
+  };
+  let cleanText = text;
+
+  const jsonMatches = text.match(/```json\s*([\s\S]*?)\s*```/g);
+  jsonMatches?.forEach((match) => {
+    try {
+      const parsed = JSON.parse(match.replace(/```json\s*/, '').replace(/\s*```/, ''));
+      if (parsed.x && parsed.y) {
+        result.chart = {
+          x: parsed.x.map(Number),
+          y: parsed.y.map(Number),
+          label: parsed.label || label,
+        };
+        cleanText = cleanText.replace(match, '');
+      }
+    } catch {}
+  });
+
+  const tableRegex = /\|(.+\|)+\s*\n\s*\|[-:\s|]+\|\s*\n((?:\|.+\|\s*\n?)*)/g;
+  let match: RegExpExecArray | null;
+  while ((match = tableRegex.exec(text)) !== null) {
+    const lines = match[0].trim().split('\n');
+    if (lines.length >= 3) {
+      const split = (line: string) => line.split('|').map((c) => c.trim()).filter(Boolean);
+      result.tables!.push({ headers: split(lines[0]), rows: lines.slice(2).map(split) });
+      cleanText = cleanText.replace(match[0], '');
+    }
+  }
+
+  const codeMatches = text.match(/```(?:python|py)?\s*([\s\S]*?)\s*```/g);
+  if (codeMatches) {
+    result.code = codeMatches[0]
+      .replace(/```(?:python|py)?\s*/, '')
+      .replace(/\s*```/, '')
+      .trim();
+    cleanText = cleanText.replace(codeMatches[0], '');
+  }
+
+  result.explanation = cleanText
+    .replace(/```[\s\S]*?```/g, '')
+    .replace(/\|(.+\|)+\s*\n\s*\|[-:\s|]+\|\s*\n((?:\|.+\|\s*\n?)*)/g, '')
+    .replace(/\{[\s\S]*?\}/g, '')
+    .trim();
+  return result;
+}
+
+function measure(name: string, text: string, parse: (text: string) => GenerateResponseDto) {
+  parse(text); // warm up
+  const times: number[] = [];
+  let tables = 0;
+  for (let run = 0; run < runs; run++) {
+    const t0 = performance.now();
+    tables = parse(text).tables!.length;
+    times.push(performance.now() - t0);
+  }
+  times.sort((a, b) => a - b);
+  const median = times[Math.floor(times.length / 2)];
+  const mb = text.length / (1024 * 1024);
+  console.log(
+    `${name.padEnd(7)} size=${(text.length / 1024).toFixed(0)}KB tables=${tables}` +
+      ` median=${median.toFixed(1)}ms min=${times[0].toFixed(1)}ms` +
+      ` throughput=${(mb / (median / 1000)).toFixed(1)}MB/s`,
+  );
+}
+
+function main() {
+  const parser = new ParserService();
+  for (const kb of sizesKb) {
+    const text = modelOutput(kb * 1024);
+    measure('single', text, (t) => parser.parse(t, 'bench'));
+    if (kb <= legacyMaxKb) {
+      measure('legacy', text, (t) => legacyParse(t, 'bench'));
+    }
+  }
+}
+
+main();
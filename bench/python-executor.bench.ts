@@ -0,0 +1,114 @@
+/**
+ * Compares the executor modes end to end through PythonExecutorService:
+ * exec (script file run through /bin/sh), spawn (interpreter started
+ * directly, code piped over stdin), pool (warm workers) and fork (zygote).
+ * Every mode launches python/launcher.py, worker.py or zygote.py exactly as
+ * a request would; the result cache is disabled.
+ *
+ *   npm run bench:executor -- [runs=50] [concurrency=4] [script.py]
+ *
+ * BENCH_MODES picks the modes (exec,spawn,pool,fork). Reports per-run
+ * latency and how long the event loop was blocked; pool and fork start
+ * their interpreters before the clock does.
+ */
+import * as fs from 'fs';
+import * as path from 'path';
+import { monitorEventLoopDelay, performance } from 'perf_hooks';
+import { ExecutionSchedulerService } from '../src/generate/execution-scheduler.service';
+import { MetricsService } from '../src/generate/metrics.service';
+import { PythonExecutorService } from '../src/generate/python-executor.service';
+import { PythonForkServerService } from '../src/generate/python-fork-server.service';
+import { PythonLimitsService } from '../src/generate/python-limits.service';
+import { PythonResultCacheService } from '../src/generate/python-result-cache.service';
+import { PythonWorkerPoolService } from '../src/generate/python-worker-pool.service';
+
+const TEMP_DIR = path.join(__dirname, '../temp');
+
+const runs = Number(process.argv[2]) || 50;
+const concurrency = Number(process.argv[3]) || 4;
+const code = process.argv[4]
+  ? fs.readFileSync(process.argv[4], 'utf-8')
+  : 'print(sum(range(1000)))\n';
+const modes = (process.env.BENCH_MODES || 'exec,spawn,pool,fork')
+  .split(',')
+  // The fork server needs os.fork
+  .filter((mode) => mode !== 'fork' || process.platform !== 'win32');
+
+// Services read their settings from the environment when constructed
+function createExecutor(mode: string) {
+  Object.assign(process.env, {
+    PYTHON_EXECUTOR_MODE: mode,
+    PYTHON_CACHE_ENABLED: 'false',
+    PYTHON_MAX_CONCURRENCY: String(concurrency),
+    PYTHON_POOL_SIZE: String(concurrency),
+  });
+  const metrics = new MetricsService();
+  const pool = new PythonWorkerPoolService();
+  const forkServer = new PythonForkServerService();
+  const executor = new PythonExecutorService(
+    pool,
+    forkServer,
+    new PythonResultCacheService(metrics),
+    new ExecutionSchedulerService(metrics),
+    new PythonLimitsService(),
+  );
+  const shutdown = () =>
+    Promise.all([pool.onApplicationShutdown(), forkServer.onApplicationShutdown()]);
+  return { executor, shutdown };
+}
+
+async function runOnce(executor: PythonExecutorService) {
+  const result = await executor.execute(code);
+  fs.rmSync(path.join(TEMP_DIR, result.jobId!), { recursive: true, force: true });
+  if (!result.success) {
+    throw new Error(`Script failed (${result.status}): ${result.error}`);
+  }
+}
+
+async function measure(mode: string) {
+  const { executor, shutdown } = createExecutor(mode);
+  executor.onModuleInit();
+  // Boots the pool or zygote and warms the OS page cache
+  await Promise.all(Array.from({ length: concurrency }, () => runOnce(executor)));
+
+  const latencies: number[] = [];
+  const loopDelay = monitorEventLoopDelay({ resolution: 1 });
+  let next = 0;
+
+  loopDelay.enable();
+  const started = performance.now();
+  await Promise.all(
+    Array.from({ length: concurrency }, async () => {
+      while (next < runs) {
+        next++;
+        const t0 = performance.now();
+        await runOnce(executor);
+        latencies.push(performance.now() - t0);
+      }
+    }),
+  );
+  const totalMs = performance.now() - started;
+  loopDelay.disable();
+  await shutdown();
+
+  latencies.sort((a, b) => a - b);
+  const pick = (p: number) => latencies[Math.min(latencies.length - 1, Math.floor(p * latencies.length))];
+  console.log(
+    `${mode.padEnd(8)} runs=${runs} c=${concurrency}` +
+      ` mean=${(latencies.reduce((a, b) => a + b, 0) / runs).toFixed(1)}ms` +
+      ` p50=${pick(0.5).toFixed(1)}ms p90=${pick(0.9).toFixed(1)}ms` +
+      ` throughput=${((runs / totalMs) * 1000).toFixed(1)}/s` +
+      ` loop-delay-max=${(loopDelay.max / 1e6).toFixed(1)}ms`,
+  );
+}
+
+async function main() {
+  for (const mode of modes) {
+    await measure(mode);
+  }
+}
+
+main().catch((error) => {
+  console.error(error);
+  process.exit(1);
+});
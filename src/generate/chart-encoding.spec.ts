@@ -0,0 +1,55 @@
+import { decodeSeries, encodeChart, encodeCharts, lttb } from './chart-encoding';
+import { ChartDto, EncodedChartDto, GenerateResponseDto } from './dto/generate-response.dto';
+
+describe('chart encoding', () => {
+  const x = Array.from({ length: 1000 }, (_, i) => 400 + i * 3.6);
+  // A flat baseline with one sharp absorption peak
+  const y = x.map((_, i) => (i === 617 ? 0.93 : 0.01 * Math.sin(i / 10)));
+  const chart: ChartDto = { x, y, label: 'IR' };
+
+  describe('lttb', () => {
+    it('keeps the endpoints and the peak, in order', () => {
+      const sampled = lttb(x, y, 100);
+      expect(sampled.x).toHaveLength(100);
+      expect(sampled.y).toHaveLength(100);
+      expect(sampled.x[0]).toBe(x[0]);
+      expect(sampled.x[99]).toBe(x[999]);
+      expect(sampled.y).toContain(0.93);
+      expect(sampled.x.every((value, i) => i === 0 || value > sampled.x[i - 1])).toBe(true);
+    });
+
+    it('returns short series unchanged', () => {
+      expect(lttb([1, 2, 3], [4, 5, 6], 10)).toEqual({ x: [1, 2, 3], y: [4, 5, 6] });
+      expect(lttb(x, y, 2).x).toHaveLength(1000);
+    });
+  });
+
+  it('encodes series as little-endian float64 that decodes exactly', () => {
+    const encoded = encodeChart(chart, { format: 'float64' }) as EncodedChartDto;
+    expect(encoded).toMatchObject({ label: 'IR', encoding: 'float64', length: 1000 });
+    expect(decodeSeries(encoded.x, 'float64')).toEqual(x);
+    expect(decodeSeries(encoded.y, 'float64')).toEqual(y);
+    // base64 of 8 bytes per point
+    expect(encoded.x.length).toBe(Math.ceil((1000 * 8) / 3) * 4);
+  });
+
+  it('downsamples to a plot width before encoding as float32', () => {
+    const encoded = encodeChart(chart, { format: 'float32', width: 200 }) as EncodedChartDto;
+    expect(encoded).toMatchObject({ length: 200, downsampledFrom: 1000 });
+    expect(decodeSeries(encoded.y, 'float32')).toContain(Math.fround(0.93));
+  });
+
+  it('copies the response, leaving the shared one untouched', () => {
+    const other: ChartDto = { x: [1, 2], y: [3, 4], label: 'B' };
+    const response: GenerateResponseDto = { chart: other, charts: [chart, other] };
+
+    const encoded = encodeCharts(response, { format: 'float32' });
+    expect(encoded.charts).toHaveLength(2);
+    expect(encoded.chart).toBe(encoded.charts![1]);
+    expect(response.chart).toBe(other);
+    expect(response.charts![0]).toBe(chart);
+
+    expect(encodeCharts(response, { format: 'json' })).toBe(response);
+    expect(encodeCharts(response)).toBe(response);
+  });
+});
@@ -0,0 +1,149 @@
+import {
+  ChartDto,
+  EncodedChartDto,
+  GenerateResponseDto,
+} from './dto/generate-response.dto';
+
+export interface ChartEncoding {
+  // json (default) keeps number arrays; float32/float64 send each series as
+  // base64 of a little-endian typed array. float32 halves the size but keeps
+  // only ~7 significant digits, too few for e.g. epoch-millisecond x values
+  format?: 'json' | 'float32' | 'float64';
+  // Downsample each series to at most this many points (LTTB), e.g. the
+  // pixel width of the plot; at least 3, ignored otherwise
+  width?: number;
+}
+
+/**
+ * The response with its charts downsampled and encoded as requested.
+ * Returns a copy: responses are shared with the prompt cache and with
+ * coalesced requests, which may ask for other encodings.
+ */
+export function encodeCharts(
+  response: GenerateResponseDto,
+  encoding?: ChartEncoding,
+): GenerateResponseDto {
+  if (!encoding || (!isBinary(encoding.format) && !downsampleWidth(encoding))) {
+    return response;
+  }
+  const charts = response.charts?.map((chart) => encodeChart(chart as ChartDto, encoding));
+  let chart = response.chart;
+  if (chart) {
+    // chart is the last of charts, so it is encoded once
+    chart = charts?.length ? charts[charts.length - 1] : encodeChart(chart as ChartDto, encoding);
+  }
+  return { ...response, chart, charts };
+}
+
+export function encodeChart(
+  chart: ChartDto,
+  encoding: ChartEncoding,
+): ChartDto | EncodedChartDto {
+  const width = downsampleWidth(encoding);
+  const length = Math.min(chart.x.length, chart.y.length);
+  const downsample = width !== undefined && width < length;
+  const { x, y } = downsample ? lttb(chart.x, chart.y, width!) : chart;
+  const downsampled = downsample ? { downsampledFrom: length } : {};
+
+  const format = encoding.format;
+  if (!isBinary(format)) {
+    return { x, y, label: chart.label, ...downsampled };
+  }
+  const points = Math.min(x.length, y.length);
+  return {
+    label: chart.label,
+    encoding: format,
+    length: points,
+    x: toBase64(x, points, format),
+    y: toBase64(y, points, format),
+    ...downsampled,
+  };
+}
+
+/**
+ * Largest-Triangle-Three-Buckets: keeps the first and last points and, from
+ * each of threshold - 2 equal buckets in between, the point forming the
+ * largest triangle with the previously kept point and the next bucket's
+ * average. Preserves peaks and the visual shape far better than striding,
+ * in a single O(n) pass. x is expected to be sorted.
+ */
+export function lttb(
+  x: number[],
+  y: number[],
+  threshold: number,
+): { x: number[]; y: number[] } {
+  const length = Math.min(x.length, y.length);
+  if (threshold < 3 || threshold >= length) {
+    return { x: x.slice(0, length), y: y.slice(0, length) };
+  }
+
+  const sampledX = [x[0]];
+  const sampledY = [y[0]];
+  const bucketSize = (length - 2) / (threshold - 2);
+  let kept = 0;
+
+  for (let bucket = 0; bucket < threshold - 2; bucket++) {
+    // Average of the next bucket (the last point, for the final bucket)
+    const nextStart = Math.floor((bucket + 1) * bucketSize) + 1;
+    const nextEnd = Math.min(Math.floor((bucket + 2) * bucketSize) + 1, length);
+    let avgX = 0;
+    let avgY = 0;
+    for (let i = nextStart; i < nextEnd; i++) {
+      avgX += x[i];
+      avgY += y[i];
+    }
+    avgX /= nextEnd - nextStart;
+    avgY /= nextEnd - nextStart;
+
+    const start = Math.floor(bucket * bucketSize) + 1;
+    const end = nextStart;
+    let chosen = start;
+    let maxArea = -1;
+    for (let i = start; i < end; i++) {
+      // Twice the triangle's area; only the comparison matters
+      const area = Math.abs(
+        (x[kept] - avgX) * (y[i] - y[kept]) - (x[kept] - x[i]) * (avgY - y[kept]),
+      );
+      if (area > maxArea) {
+        maxArea = area;
+        chosen = i;
+      }
+    }
+    sampledX.push(x[chosen]);
+    sampledY.push(y[chosen]);
+    kept = chosen;
+  }
+
+  sampledX.push(x[length - 1]);
+  sampledY.push(y[length - 1]);
+  return { x: sampledX, y: sampledY };
+}
+
+/** Decodes a series of an EncodedChartDto, e.g. in tests or Node clients. */
+export function decodeSeries(base64: string, format: EncodedChartDto['encoding']): number[] {
+  const bytes = Buffer.from(base64, 'base64');
+  const view = new DataView(bytes.buffer, bytes.byteOffset, bytes.byteLength);
+  const size = format === 'float32' ? 4 : 8;
+  return Array.from({ length: bytes.byteLength / size }, (_, i) =>
+    size === 4 ? view.getFloat32(i * size, true) : view.getFloat64(i * size, true),
+  );
+}
+
+function toBase64(values: number[], length: number, format: 'float32' | 'float64'): string {
+  const size = format === 'float32' ? 4 : 8;
+  const bytes = Buffer.alloc(length * size);
+  for (let i = 0; i < length; i++) {
+    if (size === 4) bytes.writeFloatLE(values[i], i * size);
+    else bytes.writeDoubleLE(values[i], i * size);
+  }
+  return bytes.toString('base64');
+}
+
+function isBinary(format?: string): format is 'float32' | 'float64' {
+  return format === 'float32' || format === 'float64';
+}
+
+function downsampleWidth(encoding: ChartEncoding): number | undefined {
+  const width = Math.floor(Number(encoding.width));
+  return width >= 3 ? width : undefined;
+}
@@ -0,0 +1,26 @@
+import { EventEmitter } from 'events';
+import type { Response } from 'express';
+import { closeSignal } from './close-signal';
+
+describe('closeSignal', () => {
+  const response = (writableFinished: boolean) =>
+    Object.assign(new EventEmitter(), { writableFinished }) as unknown as Response;
+
+  it('aborts when the client disconnects before the response is sent', () => {
+    const res = response(false);
+    const signal = closeSignal(res);
+
+    res.emit('close');
+
+    expect(signal.aborted).toBe(true);
+  });
+
+  it('does not abort once the response has been sent', () => {
+    const res = response(true);
+    const signal = closeSignal(res);
+
+    res.emit('close');
+
+    expect(signal.aborted).toBe(false);
+  });
+});
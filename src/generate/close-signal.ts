@@ -0,0 +1,10 @@
+import type { Response } from 'express';
+
+/** Aborts when the client disconnects before the response has been sent. */
+export function closeSignal(res: Response): AbortSignal {
+  const abort = new AbortController();
+  res.on('close', () => {
+    if (!res.writableFinished) abort.abort();
+  });
+  return abort.signal;
+}
@@ -0,0 +1,9 @@
+export class CompareGenerateDto {
+  prompt: string;
+
+  // Defaults to every configured model; unknown or repeated models are a 400
+  models?: string[];
+
+  // Shared by all models; capped at COMPARE_DEADLINE_MS
+  deadlineMs?: number;
+}
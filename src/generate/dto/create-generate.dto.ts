@@ -1,4 +1,20 @@
+import type { ChartEncoding } from '../chart-encoding';
+import type { RoutingPolicy } from '../llm-providers/llm-router.service';
+import type { CacheControl } from '../prompt-cache.service';
+
 export class CreateGenerateDto {
   prompt: string;
   model: string;
+
+  // no-cache forces a fresh generation (and refreshes the cache); no-store skips the cache entirely
+  cacheControl?: CacheControl;
+
+  // Hedge the model with a second one past its p90 latency, and/or fall back along a chain on errors
+  routing?: RoutingPolicy;
+
+  // Charts as base64 Float32/Float64 series and/or LTTB-downsampled to a plot width
+  chartEncoding?: ChartEncoding;
+
+  // Answer as Server-Sent Events: tokens as generated, then charts, tables and code, then the result
+  stream?: boolean;
 }
@@ -1,16 +1,50 @@
+// Numeric columns hold numbers, or null for empty cells (map those to NaN for a Float64Array)
+export type TableColumnDto =
+  | { name: string; type: 'number'; values: (number | null)[] }
+  | { name: string; type: 'string'; values: string[] };
+
+export interface ChartDto {
+  x: number[];
+  y: number[];
+  label: string;
+  // Point count before LTTB downsampling, when chartEncoding.width reduced it
+  downsampledFrom?: number;
+}
+
+// A chart requested with chartEncoding.format float32/float64: x and y are
+// base64 of little-endian typed arrays holding length values each
+export interface EncodedChartDto {
+  label: string;
+  encoding: 'float32' | 'float64';
+  length: number;
+  x: string;
+  y: string;
+  downsampledFrom?: number;
+}
+
 export class GenerateResponseDto {
-  chart?: {
-    x: number[];
-    y: number[];
-    label: string;
-  } | null;
+  // The last chart in the response; charts has all of them
+  chart?: ChartDto | EncodedChartDto | null;
+
+  charts?: (ChartDto | EncodedChartDto)[];
 
   tables?: {
     headers: string[];  // Changed from 'columns' to 'headers'
     rows: string[][];
+    // The same cells by column, numbers decoded; empty cells keep their place here
+    columns?: TableColumnDto[];
   }[];
 
+  // The first Python block; codeBlocks has all of them
   code?: string | null;
 
+  codeBlocks?: { language: string; code: string }[];
+
   explanation?: string | null;
+
+  metadata?: {
+    model: string;  // The model that answered, which may differ from the one requested
+    hedged: boolean;
+    failed: string[];  // Models that errored before one answered
+  };
 }
\ No newline at end of file
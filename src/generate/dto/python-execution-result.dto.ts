@@ -0,0 +1,83 @@
+export interface FigureDto {
+  name: string;
+  url: string;
+  format: string;
+  // Pixels for raster formats, size at the save dpi otherwise
+  width: number;
+  height: number;
+  title: string | null;
+}
+
+// Arrays are stored as NPZ files unless noted; dtypes use numpy's notation ('<f8', '<U12', ...)
+export interface SeriesDto {
+  name: string;
+  url: string;
+  label: string | null;
+  // Figure the series was taken from, when registered automatically
+  figure: string | null;
+  length: number;
+  x: { dtype: string };
+  y: { dtype: string };
+}
+
+export interface ColumnStatsDto {
+  nulls: number;
+  distinct?: number;
+  // Numbers and dates (ISO strings) only
+  min?: number | string | null;
+  max?: number | string | null;
+  mean?: number;
+  // Booleans only
+  true?: number;
+}
+
+export interface TableDto {
+  name: string;
+  url: string;
+  kind: 'table' | 'dataframe';
+  // DataFrames are Parquet or Arrow IPC when pyarrow is available
+  format: 'npz' | 'parquet' | 'arrow';
+  length: number;
+  // key is the array (npz) or field name inside the file
+  columns: { name: string; key: string; dtype: string; stats?: ColumnStatsDto }[];
+}
+
+export class PythonExecutionResultDto {
+  success: boolean;
+
+  jobId?: string;
+
+  // completed | failed | killed: timeout | killed: memory limit | killed: cpu limit | ...
+  status?: string;
+
+  stdout?: string;
+
+  stderr?: string | null;
+
+  filePath?: string;
+
+  // Files the script left in its job folder, served via /generate/temp-image/:jobId/:file
+  artifacts?: string[];
+
+  // Every figure the script saved or left open, in creation order
+  figures?: FigureDto[];
+
+  // Data registered through the deepceutix runtime module
+  series?: SeriesDto[];
+
+  tables?: TableDto[];
+
+  // Output was cut at PYTHON_OUTPUT_MAX_BYTES
+  truncated?: boolean;
+
+  // Served from the result cache instead of running the script
+  cached?: boolean;
+
+  // Time spent waiting for an execution slot vs. running the script
+  timings?: {
+    queueMs: number;
+    runMs: number;
+  };
+
+  error?: string;
+}
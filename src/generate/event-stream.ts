@@ -0,0 +1,50 @@
+import { MessageEvent } from '@nestjs/common';
+import type { Response } from 'express';
+import { closeSignal } from './close-signal';
+
+/**
+ * Writes events to an Express response as text/event-stream. @Sse() only
+ * covers GET routes; this serves POST endpoints that stream. The signal
+ * passed to produce() aborts when the client disconnects; a failure after
+ * the headers went out is reported as an error event.
+ */
+export async function writeEventStream(
+  res: Response,
+  produce: (signal: AbortSignal) => AsyncIterable<MessageEvent>,
+) {
+  const signal = closeSignal(res);
+
+  res.status(200);
+  res.setHeader('Content-Type', 'text/event-stream');
+  res.setHeader('Cache-Control', 'no-cache');
+  res.setHeader('Connection', 'keep-alive');
+  // Stop nginx from buffering the stream
+  res.setHeader('X-Accel-Buffering', 'no');
+  res.flushHeaders();
+
+  try {
+    for await (const event of produce(signal)) {
+      if (signal.aborted) break;
+      res.write(formatEvent(event));
+    }
+  } catch (error) {
+    if (!signal.aborted) {
+      res.write(formatEvent({ type: 'error', data: { message: error.message } }));
+    }
+  } finally {
+    res.end();
+  }
+}
+
+function formatEvent({ type, id, data }: MessageEvent): string {
+  const payload = typeof data === 'string' ? data : JSON.stringify(data);
+  return (
+    (type ? `event: ${type}\n` : '') +
+    (id ? `id: ${id}\n` : '') +
+    payload
+      .split('\n')
+      .map((line) => `data: ${line}\n`)
+      .join('') +
+    '\n'
+  );
+}
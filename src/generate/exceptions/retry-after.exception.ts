@@ -0,0 +1,15 @@
+import { HttpException, HttpStatus } from '@nestjs/common';
+
+/**
+ * Rejection that tells the client when to come back; RetryAfterFilter
+ * turns retryAfterSeconds into a Retry-After header.
+ */
+export class RetryAfterException extends HttpException {
+  constructor(
+    message: string,
+    status: HttpStatus,
+    readonly retryAfterSeconds: number,
+  ) {
+    super(message, status);
+  }
+}
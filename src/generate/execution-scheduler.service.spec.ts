@@ -0,0 +1,52 @@
+import { HttpStatus } from '@nestjs/common';
+import { ExecutionSchedulerService } from './execution-scheduler.service';
+import { RetryAfterException } from './exceptions/retry-after.exception';
+import { MetricsService } from './metrics.service';
+
+describe('ExecutionSchedulerService', () => {
+  let scheduler: ExecutionSchedulerService;
+
+  beforeEach(() => {
+    process.env.PYTHON_MAX_CONCURRENCY = '1';
+    process.env.PYTHON_QUEUE_LIMIT = '1';
+    scheduler = new ExecutionSchedulerService(new MetricsService());
+  });
+
+  afterEach(() => {
+    delete process.env.PYTHON_MAX_CONCURRENCY;
+    delete process.env.PYTHON_QUEUE_LIMIT;
+  });
+
+  it('runs queued tasks in FIFO order and reports queue wait', async () => {
+    const order: number[] = [];
+    let release!: () => void;
+    const first = scheduler.schedule(
+      () => new Promise<void>((resolve) => (release = resolve)).then(() => order.push(1)),
+    );
+    const second = scheduler.schedule(async () => order.push(2));
+
+    expect(scheduler.stats()).toMatchObject({ running: 1, queued: 1 });
+    await new Promise((resolve) => setImmediate(resolve));
+    release();
+    const [, queued] = await Promise.all([first, second]);
+
+    expect(order).toEqual([1, 2]);
+    expect(queued.queueMs).toBeGreaterThanOrEqual(0);
+  });
+
+  it('rejects with 429 and Retry-After once the queue is full', async () => {
+    let release!: () => void;
+    const running = scheduler.schedule(() => new Promise<void>((r) => (release = r)));
+    const queued = scheduler.schedule(async () => undefined);
+
+    const rejected = scheduler.schedule(async () => undefined);
+    await expect(rejected).rejects.toBeInstanceOf(RetryAfterException);
+    await rejected.catch((error: RetryAfterException) => {
+      expect(error.getStatus()).toBe(HttpStatus.TOO_MANY_REQUESTS);
+      expect(error.retryAfterSeconds).toBeGreaterThanOrEqual(1);
+    });
+
+    release();
+    await Promise.all([running, queued]);
+  });
+});
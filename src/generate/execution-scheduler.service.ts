@@ -0,0 +1,125 @@
+import { HttpStatus, Injectable } from '@nestjs/common';
+import * as os from 'os';
+import { RetryAfterException } from './exceptions/retry-after.exception';
+import { MetricsService } from './metrics.service';
+
+interface QueuedTask {
+  start: () => void;
+  timer: NodeJS.Timeout;
+}
+
+export interface ScheduledResult<T> {
+  value: T;
+  queueMs: number;
+  runMs: number;
+}
+
+/**
+ * Admission control for script execution: at most PYTHON_MAX_CONCURRENCY
+ * jobs run at once, up to PYTHON_QUEUE_LIMIT wait in FIFO order, and the
+ * rest are turned away immediately with a Retry-After hint.
+ */
+@Injectable()
+export class ExecutionSchedulerService {
+  private readonly concurrency =
+    Number(process.env.PYTHON_MAX_CONCURRENCY) || Math.max(1, os.cpus().length);
+  private readonly queueLimit =
+    Number(process.env.PYTHON_QUEUE_LIMIT) || this.concurrency * 4;
+  private readonly queueTimeoutMs =
+    Number(process.env.PYTHON_QUEUE_TIMEOUT_MS) || 30000;
+
+  private running = 0;
+  private readonly queue: QueuedTask[] = [];
+
+  constructor(private readonly metrics: MetricsService) {}
+
+  async schedule<T>(task: () => Promise<T>): Promise<ScheduledResult<T>> {
+    const enqueuedAt = Date.now();
+    await this.admit();
+    const startedAt = Date.now();
+    const queueMs = startedAt - enqueuedAt;
+    this.metrics.observe('python.queue_wait_ms', queueMs);
+
+    try {
+      const value = await task();
+      const runMs = Date.now() - startedAt;
+      this.metrics.observe('python.run_ms', runMs);
+      return { value, queueMs, runMs };
+    } finally {
+      this.running--;
+      this.queue.shift()?.start();
+    }
+  }
+
+  /**
+   * Throws the same rejection schedule() would, without taking a slot.
+   * Used where the work is started in the background after responding.
+   */
+  assertCapacity() {
+    if (
+      this.running >= this.concurrency &&
+      this.queue.length >= this.queueLimit
+    ) {
+      this.metrics.increment('python.rejected.queue_full');
+      throw this.queueFullException();
+    }
+  }
+
+  stats() {
+    return {
+      running: this.running,
+      queued: this.queue.length,
+      concurrency: this.concurrency,
+      queueLimit: this.queueLimit,
+    };
+  }
+
+  private admit(): Promise<void> {
+    if (this.running < this.concurrency && this.queue.length === 0) {
+      this.running++;
+      return Promise.resolve();
+    }
+
+    if (this.queue.length >= this.queueLimit) {
+      this.metrics.increment('python.rejected.queue_full');
+      throw this.queueFullException();
+    }
+
+    return new Promise<void>((resolve, reject) => {
+      const task: QueuedTask = {
+        start: () => {
+          clearTimeout(task.timer);
+          this.running++;
+          resolve();
+        },
+        timer: setTimeout(() => {
+          this.queue.splice(this.queue.indexOf(task), 1);
+          this.metrics.increment('python.rejected.queue_timeout');
+          reject(
+            new RetryAfterException(
+              'Timed out waiting for an execution slot',
+              HttpStatus.SERVICE_UNAVAILABLE,
+              this.estimateWaitSeconds(),
+            ),
+          );
+        }, this.queueTimeoutMs),
+      };
+      this.queue.push(task);
+    });
+  }
+
+  private queueFullException() {
+    return new RetryAfterException(
+      'Execution queue is full, try again later',
+      HttpStatus.TOO_MANY_REQUESTS,
+      this.estimateWaitSeconds(),
+    );
+  }
+
+  // Time for the queue ahead to drain, assuming typical run times
+  private estimateWaitSeconds(): number {
+    const typicalRunMs = this.metrics.percentile('python.run_ms', 50) ?? 1000;
+    const rounds = Math.ceil((this.queue.length + 1) / this.concurrency);
+    return Math.max(1, Math.ceil((rounds * typicalRunMs) / 1000));
+  }
+}
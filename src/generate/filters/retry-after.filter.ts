@@ -0,0 +1,15 @@
+import { ArgumentsHost, Catch, ExceptionFilter } from '@nestjs/common';
+import type { Response } from 'express';
+import { RetryAfterException } from '../exceptions/retry-after.exception';
+
+@Catch(RetryAfterException)
+export class RetryAfterFilter implements ExceptionFilter {
+  catch(exception: RetryAfterException, host: ArgumentsHost) {
+    const res = host.switchToHttp().getResponse<Response>();
+    const status = exception.getStatus();
+    res
+      .setHeader('Retry-After', String(exception.retryAfterSeconds))
+      .status(status)
+      .json({ statusCode: status, message: exception.message });
+  }
+}
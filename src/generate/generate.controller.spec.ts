@@ -1,18 +1,99 @@
+import { BadRequestException, INestApplication } from '@nestjs/common';
 import { Test, TestingModule } from '@nestjs/testing';
+import * as request from 'supertest';
+import { App } from 'supertest/types';
+import { CompareGenerateDto } from './dto/compare-generate.dto';
+import { CreateGenerateDto } from './dto/create-generate.dto';
+import { ExecutionSchedulerService } from './execution-scheduler.service';
 import { GenerateController } from './generate.controller';
+import { GenerateService } from './generate.service';
+import { PythonExecutorService } from './python-executor.service';
+import { PythonJobStreamService } from './python-job-stream.service';
 
 describe('GenerateController', () => {
+  let app: INestApplication<App>;
   let controller: GenerateController;
 
   beforeEach(async () => {
+    const jobStream = new PythonJobStreamService(
+      { execute: () => new Promise(() => undefined) } as unknown as PythonExecutorService,
+      { assertCapacity: () => undefined } as unknown as ExecutionSchedulerService,
+    );
     const module: TestingModule = await Test.createTestingModule({
       controllers: [GenerateController],
+      providers: [
+        {
+          provide: GenerateService,
+          useValue: {
+            create: async (dto: CreateGenerateDto) => ({ explanation: dto.prompt }),
+            async *createStream(dto: CreateGenerateDto) {
+              yield { type: 'token', data: { text: dto.prompt } };
+              yield { type: 'result', data: { explanation: dto.prompt } };
+            },
+            compareModels: (dto: CompareGenerateDto) => {
+              const unknown = dto.models?.find((model) => model !== 'llama');
+              if (unknown) throw new BadRequestException(`Unsupported model: ${unknown}`);
+              return ['llama'];
+            },
+            async *compare() {
+              yield { type: 'done', data: { completed: 1, failed: 0, timedOut: 0 } };
+            },
+            streamPython: (jobId: string) => jobStream.stream(jobId),
+          },
+        },
+      ],
     }).compile();
 
     controller = module.get<GenerateController>(GenerateController);
+    app = module.createNestApplication();
+    await app.init();
   });
 
+  afterEach(() => app.close());
+
   it('should be defined', () => {
     expect(controller).toBeDefined();
   });
+
+  it('answers POST /generate with JSON, or with events when stream is set', async () => {
+    await request(app.getHttpServer())
+      .post('/generate')
+      .send({ prompt: 'hi', model: 'llama' })
+      .expect(201, { explanation: 'hi' });
+
+    const streamed = await request(app.getHttpServer())
+      .post('/generate')
+      .send({ prompt: 'hi', model: 'llama', stream: true })
+      .expect(200);
+
+    expect(streamed.headers['content-type']).toMatch(/text\/event-stream/);
+    expect(streamed.text).toBe(
+      'event: token\ndata: {"text":"hi"}\n\nevent: result\ndata: {"explanation":"hi"}\n\n',
+    );
+  });
+
+  it('rejects a compare with an unknown model with 400 before opening the stream', async () => {
+    const response = await request(app.getHttpServer())
+      .post('/generate/compare')
+      .send({ prompt: 'hi', models: ['llama', 'gpt-9'] })
+      .expect(400);
+
+    expect(response.headers['content-type']).toMatch(/json/);
+    expect(response.body.message).toBe('Unsupported model: gpt-9');
+
+    const streamed = await request(app.getHttpServer())
+      .post('/generate/compare')
+      .send({ prompt: 'hi', models: ['llama'] })
+      .expect(200);
+    expect(streamed.text).toContain('event: done');
+  });
+
+  it('answers an unknown job stream with 404 before opening the stream', async () => {
+    const response = await request(app.getHttpServer())
+      .get('/generate/execute-python/missing/stream')
+      .expect(404);
+
+    expect(response.headers['content-type']).toMatch(/json/);
+    expect(response.body.message).toBe('Unknown or expired job: missing');
+  });
 });
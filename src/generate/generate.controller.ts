@@ -1,21 +1,86 @@
-import { Body, Controller, Get, Param, Post, Res } from '@nestjs/common';
+import {
+  Body,
+  Controller,
+  Get,
+  HttpStatus,
+  Param,
+  Post,
+  Res,
+  Sse,
+  UseFilters,
+} from '@nestjs/common';
 import { GenerateService } from './generate.service';
 import { CreateGenerateDto } from './dto/create-generate.dto';
+import { CompareGenerateDto } from './dto/compare-generate.dto';
+import { RetryAfterFilter } from './filters/retry-after.filter';
+import { writeEventStream } from './event-stream';
+import { closeSignal } from './close-signal';
 import path from 'path';
 import type { Response } from 'express';
 
+// Types express does not know; everything else is looked up by extension
+const ARTIFACT_TYPES: Record<string, string> = {
+  '.parquet': 'application/vnd.apache.parquet',
+  '.arrow': 'application/vnd.apache.arrow.file',
+  '.npz': 'application/octet-stream',
+};
+
 @Controller('generate')
 export class GenerateController {
   constructor(private readonly generateService: GenerateService) {}
 
   @Post()
-  async create(@Body() dto: CreateGenerateDto) {
-    return this.generateService.create(dto);
+  @UseFilters(RetryAfterFilter)
+  async create(@Body() dto: CreateGenerateDto, @Res() res: Response) {
+    if (dto.stream) {
+      await writeEventStream(res, (signal) =>
+        this.generateService.createStream(dto, signal),
+      );
+      return;
+    }
+    // A client that gives up stops the upstream call as well
+    const response = await this.generateService.create(dto, closeSignal(res));
+    res.status(HttpStatus.CREATED).json(response);
+  }
+
+  @Post('compare')
+  async compare(@Body() dto: CompareGenerateDto, @Res() res: Response) {
+    // Bad model lists get a 400 while a status can still be sent
+    this.generateService.compareModels(dto);
+    await writeEventStream(res, (signal) => this.generateService.compare(dto, signal));
   }
 
   @Post('execute-python')
-  async executePython(@Body() dto: { code: string }) {
-    return this.generateService.executePython(dto.code);
+  @UseFilters(RetryAfterFilter)
+  async executePython(@Body() dto: { code: string; stream?: boolean }) {
+    return this.generateService.executePython(dto.code, dto.stream);
+  }
+
+  @Sse('execute-python/:jobId/stream')
+  streamPython(@Param('jobId') jobId: string) {
+    return this.generateService.streamPython(jobId);
+  }
+
+  @Get('metrics')
+  getMetrics() {
+    return this.generateService.getMetrics();
+  }
+
+  @Get('artifacts/:jobId')
+  getArtifacts(@Param('jobId') jobId: string) {
+    return this.generateService.getArtifacts(jobId);
+  }
+
+  @Get('artifacts/:jobId/:name')
+  async getArtifact(
+    @Param('jobId') jobId: string,
+    @Param('name') name: string,
+    @Res() res: Response
+  ) {
+    const file = await this.generateService.getArtifactPath(jobId, name);
+    const type = ARTIFACT_TYPES[path.extname(file)];
+    if (type) res.type(type);
+    return res.sendFile(file);
   }
 
   @Get('temp-image/:folder/:filename')
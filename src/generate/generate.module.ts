@@ -1,27 +1,41 @@
 import { Module } from '@nestjs/common';
 import { GenerateController } from './generate.controller';
 import { GenerateService } from './generate.service';
-import { GeminiService } from './llm-providers/gemini.service';
-import { ClaudeService } from './llm-providers/claude.service';
-import { DeepSeekService } from './llm-providers/deepseek.service';
-import { LlamaService } from './llm-providers/llama.service';
-import { QwenService } from './llm-providers/qwen.service';
-import { GptOss20bService } from './llm-providers/gpt-oss-20b.service';
+import { LlmHttpClientService } from './llm-providers/llm-http-client.service';
+import { LlmProviderRegistryService } from './llm-providers/llm-provider-registry.service';
+import { LlmRateLimiterService } from './llm-providers/llm-rate-limiter.service';
+import { LlmRouterService } from './llm-providers/llm-router.service';
 import { ParserService } from './parser.service';
+import { ParserPoolService } from './parser-pool.service';
 import { PythonExecutorService } from './python-executor.service';
+import { PythonWorkerPoolService } from './python-worker-pool.service';
+import { PythonForkServerService } from './python-fork-server.service';
+import { PythonResultCacheService } from './python-result-cache.service';
+import { MetricsService } from './metrics.service';
+import { ExecutionSchedulerService } from './execution-scheduler.service';
+import { PythonLimitsService } from './python-limits.service';
+import { PythonJobStreamService } from './python-job-stream.service';
+import { PromptCacheService } from './prompt-cache.service';
 
 @Module({
   controllers: [GenerateController],  
   providers: [
     GenerateService,
-    GeminiService,
-    ClaudeService,
-    DeepSeekService,
-    LlamaService,
-    QwenService,
-    GptOss20bService,
+    LlmHttpClientService,
+    LlmProviderRegistryService,
+    LlmRateLimiterService,
+    LlmRouterService,
     ParserService,
+    ParserPoolService,
     PythonExecutorService,
+    PythonWorkerPoolService,
+    PythonForkServerService,
+    PythonResultCacheService,
+    MetricsService,
+    ExecutionSchedulerService,
+    PythonLimitsService,
+    PythonJobStreamService,
+    PromptCacheService,
   ],
   exports: [GenerateService],
 })
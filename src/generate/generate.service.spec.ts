@@ -1,18 +1,182 @@
-import { Test, TestingModule } from '@nestjs/testing';
-import { GenerateService } from './GenerateService';
+import { BadRequestException, MessageEvent } from '@nestjs/common';
+import { CreateGenerateDto } from './dto/create-generate.dto';
+import { GenerateService } from './generate.service';
+import { LlmHttpClientService } from './llm-providers/llm-http-client.service';
+import { LlmProviderRegistryService } from './llm-providers/llm-provider-registry.service';
+import { LlmRateLimiterService } from './llm-providers/llm-rate-limiter.service';
+import { LlmRouterService } from './llm-providers/llm-router.service';
+import { MetricsService } from './metrics.service';
+import { ParserPoolService } from './parser-pool.service';
+import { PromptCacheService } from './prompt-cache.service';
+import { PythonExecutorService } from './python-executor.service';
+import { PythonJobStreamService } from './python-job-stream.service';
 
 describe('GenerateService', () => {
+  let router: { complete: jest.Mock; stream: jest.Mock };
+  let complete: jest.Mock;
   let service: GenerateService;
 
-  beforeEach(async () => {
-    const module: TestingModule = await Test.createTestingModule({
-      providers: [GenerateService],
-    }).compile();
+  const dto = (extra: Partial<CreateGenerateDto> = {}): CreateGenerateDto => ({
+    prompt: 'hi',
+    model: 'llama',
+    ...extra,
+  });
+
+  const route = { model: 'llama', hedged: false, failed: [] };
+
+  // What the router yields: the first text, the rest once gate resolves, then done
+  async function* routed(texts: string[], gate: Promise<void> = Promise.resolve()) {
+    yield { text: texts[0], ...route };
+    await gate;
+    for (const text of texts.slice(1)) yield { text, ...route };
+    yield { done: true, ...route };
+  }
+
+  const collect = async (events: AsyncIterable<MessageEvent>) => {
+    const received: MessageEvent[] = [];
+    for await (const event of events) received.push(event);
+    return received;
+  };
+
+  const tokens = (events: MessageEvent[]) =>
+    events
+      .filter((event) => event.type === 'token')
+      .map((event) => (event.data as { text: string }).text);
+
+  const tick = () => new Promise((resolve) => setImmediate(resolve));
 
-    service = module.get<GenerateService>(GenerateService);
+  beforeEach(() => {
+    router = { complete: jest.fn(), stream: jest.fn() };
+    complete = jest.fn();
+    service = new GenerateService(
+      {
+        config: () => ({ model: 'llama-3', limits: { maxTokens: 1000 } }),
+        models: () => ['llama', 'qwen', 'gemini'],
+        get: (model: string) => {
+          if (!['llama', 'qwen', 'gemini'].includes(model.toLowerCase())) {
+            throw new Error(`Unsupported model: ${model}`);
+          }
+          return { name: model.toLowerCase() };
+        },
+        complete,
+      } as unknown as LlmProviderRegistryService,
+      {} as LlmHttpClientService,
+      {
+        parse: async (text: string) => ({ explanation: text }),
+      } as unknown as ParserPoolService,
+      {} as PythonExecutorService,
+      {} as PythonJobStreamService,
+      new MetricsService(),
+      {
+        keyFor: (...parts: unknown[]) => JSON.stringify(parts),
+        get: async () => null,
+        set: async () => undefined,
+      } as unknown as PromptCacheService,
+      {} as LlmRateLimiterService,
+      router as unknown as LlmRouterService,
+    );
   });
 
-  it('should be defined', () => {
-    expect(service).toBeDefined();
+  describe('createStream', () => {
+    it('streams tokens through the router and ends with the parsed response', async () => {
+      router.stream.mockImplementation(() => routed(['Hello', ' world']));
+      const routing = { hedge: 'qwen' };
+
+      const events = await collect(service.createStream(dto({ routing })));
+
+      expect(tokens(events)).toEqual(['Hello', ' world']);
+      expect(events[events.length - 1]).toEqual({
+        type: 'result',
+        data: { explanation: 'Hello world', metadata: route },
+      });
+      expect(router.stream.mock.calls[0].slice(0, 3)).toEqual(['llama', 'hi', routing]);
+    });
+
+    it('shares one upstream stream between identical requests', async () => {
+      let release!: () => void;
+      const gate = new Promise<void>((resolve) => (release = resolve));
+      router.stream.mockImplementation(() => routed(['a', 'b', 'c'], gate));
+
+      const first = collect(service.createStream(dto()));
+      await tick();
+      // Joins mid-stream and gets the tokens already sent, then the rest
+      const second = collect(service.createStream(dto()));
+      await tick();
+      release();
+
+      expect(tokens(await first)).toEqual(['a', 'b', 'c']);
+      expect(tokens(await second)).toEqual(['a', 'b', 'c']);
+      expect((await second).pop()).toEqual((await first).pop());
+      expect(router.stream).toHaveBeenCalledTimes(1);
+    });
+
+    it('joins a pending non-streamed generation and gets its text in one piece', async () => {
+      let answer!: (completion: object) => void;
+      router.complete.mockReturnValue(new Promise((resolve) => (answer = resolve)));
+
+      const plain = service.create(dto());
+      await tick();
+      const streamed = collect(service.createStream(dto({ stream: true })));
+      await tick();
+      answer({ text: 'whole answer', ...route });
+
+      expect(tokens(await streamed)).toEqual(['whole answer']);
+      expect((await streamed).pop()!.data).toEqual(await plain);
+      expect(router.stream).not.toHaveBeenCalled();
+    });
+  });
+
+  describe('compare', () => {
+    it('emits a result per model, then a summary', async () => {
+      complete.mockImplementation(async (model: string) => ({
+        text: `from ${model}`,
+        usage: { outputTokens: 2 },
+      }));
+
+      const events = await collect(service.compare({ prompt: 'hi' }));
+
+      const results = events.filter((event) => event.type === 'result');
+      expect(results.map((event) => (event.data as any).model).sort()).toEqual([
+        'gemini',
+        'llama',
+        'qwen',
+      ]);
+      expect(results[0].data).toMatchObject({
+        usage: { outputTokens: 2 },
+        response: { explanation: `from ${(results[0].data as any).model}` },
+      });
+      expect(events[events.length - 1]).toMatchObject({
+        type: 'done',
+        data: { completed: 3, failed: 0, timedOut: 0 },
+      });
+    });
+
+    it('reports a failing model while the others complete', async () => {
+      complete.mockImplementation(async (model: string) => {
+        if (model === 'qwen') throw new Error('status 503');
+        return { text: `from ${model}` };
+      });
+
+      const events = await collect(service.compare({ prompt: 'hi', models: ['llama', 'qwen'] }));
+
+      expect(events.map((event) => event.type).sort()).toEqual(['done', 'failed', 'result']);
+      expect(events.find((event) => event.type === 'failed')!.data).toMatchObject({
+        model: 'qwen',
+        message: 'status 503',
+      });
+      expect(events[events.length - 1].data).toMatchObject({ completed: 1, failed: 1 });
+    });
+
+    it('rejects unknown and repeated models with 400 before running any', () => {
+      const unknown = () => service.compareModels({ prompt: 'hi', models: ['llama', 'gpt-9'] });
+      const repeated = () => service.compareModels({ prompt: 'hi', models: ['llama', 'LLAMA'] });
+
+      expect(unknown).toThrow(BadRequestException);
+      expect(unknown).toThrow('Unsupported model: gpt-9');
+      expect(repeated).toThrow(BadRequestException);
+      expect(repeated).toThrow('Model listed more than once: llama');
+      expect(service.compareModels({ prompt: 'hi', models: ['QWEN'] })).toEqual(['qwen']);
+      expect(complete).not.toHaveBeenCalled();
+    });
   });
 });
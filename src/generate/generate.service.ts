@@ -1,75 +1,332 @@
-import { Injectable } from '@nestjs/common';
+import { BadRequestException, Injectable, MessageEvent } from '@nestjs/common';
+import { Observable } from 'rxjs';
 import { CreateGenerateDto } from './dto/create-generate.dto';
+import { CompareGenerateDto } from './dto/compare-generate.dto';
 import { GenerateResponseDto } from './dto/generate-response.dto';
 
 // Model providers
-import { GeminiService } from './llm-providers/gemini.service';
-import { ClaudeService } from './llm-providers/claude.service';
-import { LlamaService } from './llm-providers/llama.service';
-import { DeepSeekService } from './llm-providers/deepseek.service';
-import { QwenService } from './llm-providers/qwen.service';
-import { GptOss20bService } from './llm-providers/gpt-oss-20b.service';
+import { LlmHttpClientService } from './llm-providers/llm-http-client.service';
+import { LlmProviderRegistryService } from './llm-providers/llm-provider-registry.service';
+import { LlmRateLimiterService } from './llm-providers/llm-rate-limiter.service';
+import {
+  LlmRouterService,
+  RoutedCompletion,
+  RoutingPolicy,
+} from './llm-providers/llm-router.service';
+import { LlmUsage } from './llm-providers/llm-provider.interface';
 
 // Utilities
-import { ParserService } from './parser.service';
+import { ParserPoolService } from './parser-pool.service';
+import { ChartEncoding, encodeChart, encodeCharts } from './chart-encoding';
+import { IncrementalParser, ParseEvent } from './incremental-parser';
 import { PythonExecutorService } from './python-executor.service';
+import { PythonJobStreamService } from './python-job-stream.service';
+import { MetricsService } from './metrics.service';
+import { PromptCacheService } from './prompt-cache.service';
+import { ReplayFeed } from './replay-feed';
+import { SingleFlight } from './single-flight';
 
 @Injectable()
 export class GenerateService {
+  private readonly inFlight = new SingleFlight<GenerateResponseDto>();
+  // Text of the generation in flight for each key, for streamed callers
+  private readonly feeds = new Map<string, ReplayFeed<string>>();
+  private readonly compareDeadlineMs = Number(process.env.COMPARE_DEADLINE_MS) || 60000;
+
   constructor(
-    private readonly gemini: GeminiService,
-    private readonly claude: ClaudeService,
-    private readonly llama: LlamaService,
-    private readonly deepseek: DeepSeekService,
-    private readonly qwen: QwenService,
-    private readonly gptOss20b: GptOss20bService,
-    private readonly parser: ParserService,
+    private readonly providers: LlmProviderRegistryService,
+    private readonly llmHttp: LlmHttpClientService,
+    private readonly parserPool: ParserPoolService,
     private readonly pythonExecutor: PythonExecutorService,
+    private readonly pythonJobStream: PythonJobStreamService,
+    private readonly metrics: MetricsService,
+    private readonly promptCache: PromptCacheService,
+    private readonly rateLimiter: LlmRateLimiterService,
+    private readonly router: LlmRouterService,
   ) {}
 
   /**
    * Main entrypoint — generates response using selected LLM
    */
-  async create(dto: CreateGenerateDto): Promise<GenerateResponseDto> {
+  async create(dto: CreateGenerateDto, signal?: AbortSignal): Promise<GenerateResponseDto> {
     const { prompt, model } = dto;
 
     if (!model) {
       throw new Error('Model name must be provided');
     }
 
-    let rawText: string;
-
-    switch (model.toLowerCase()) {
-      case 'gemini':
-        rawText = await this.gemini.callModel(prompt);
-        break;
-      case 'claude':
-        rawText = await this.claude.callModel(prompt);
-        break;
-      case 'llama':
-        rawText = await this.llama.callModel(prompt);
-        break;
-      case 'deepseek':
-        rawText = await this.deepseek.callModel(prompt);
-        break;
-      case 'qwen':
-        rawText = await this.qwen.callModel(prompt);
-        break;
-      case 'gpt-oss-20b':
-        rawText = await this.gptOss20b.callModel(prompt);
-        break;
-      default:
-        throw new Error(`Unsupported model: ${model}`);
+    const cacheControl = dto.cacheControl ?? 'default';
+    const cacheKey = this.promptCacheKey(model, prompt, dto.routing);
+    if (cacheControl === 'default') {
+      const cached = await this.promptCache.get(cacheKey);
+      if (cached) return encodeCharts(cached.response, dto.chartEncoding);
     }
 
-    // Parse response into structured format
-    return this.parser.parse(rawText, model);
+    const response = await this.generate(cacheKey, dto, false, signal).response;
+    // Encoded per caller, so the cached and shared response stays canonical
+    return encodeCharts(response, dto.chartEncoding);
+  }
+
+  /**
+   * Same as create(), but forwards tokens as they are generated, then chart,
+   * table and code events as each block closes, and ends with the parsed
+   * response
+   */
+  async *createStream(
+    dto: CreateGenerateDto,
+    signal?: AbortSignal,
+  ): AsyncGenerator<MessageEvent> {
+    const { prompt, model } = dto;
+
+    if (!model) {
+      throw new Error('Model name must be provided');
+    }
+
+    const cacheControl = dto.cacheControl ?? 'default';
+    const cacheKey = this.promptCacheKey(model, prompt, dto.routing);
+    const cached =
+      cacheControl === 'default' ? await this.promptCache.get(cacheKey) : null;
+
+    let texts: AsyncIterable<string>;
+    let result: Promise<GenerateResponseDto>;
+    if (cached) {
+      texts = replay(cached.rawText);
+      result = Promise.resolve(cached.response);
+    } else {
+      const flight = this.generate(cacheKey, dto, true, signal);
+      result = flight.response;
+      // Failures are thrown below, once the text read so far has been sent
+      void result.catch(() => undefined);
+      texts = flight.text.read();
+    }
+
+    // Charts, tables and code are sent as soon as they close, ahead of the result
+    const structures = new IncrementalParser(model);
+    for await (const text of texts) {
+      yield { type: 'token', data: { text } };
+      yield* toMessageEvents(structures.push(text), dto.chartEncoding);
+    }
+    yield* toMessageEvents(structures.end(), dto.chartEncoding);
+
+    yield { type: 'result', data: encodeCharts(await result, dto.chartEncoding) };
+  }
+
+  /**
+   * Runs one prompt on several models at once under a shared deadline.
+   * Emits a result (or failed) event per model as it finishes, with its
+   * latency and token usage, then a summary; models still running at the
+   * deadline are cancelled and reported as timed out.
+   */
+  async *compare(
+    dto: CompareGenerateDto,
+    signal?: AbortSignal,
+  ): AsyncGenerator<MessageEvent> {
+    const { prompt } = dto;
+    const models = this.compareModels(dto);
+    const deadline = AbortSignal.timeout(
+      dto.deadlineMs! > 0
+        ? Math.min(dto.deadlineMs!, this.compareDeadlineMs)
+        : this.compareDeadlineMs,
+    );
+    const callSignal = signal ? AbortSignal.any([signal, deadline]) : deadline;
+
+    const startedAt = Date.now();
+    const pending = new Map(
+      models.map((model) => [model, this.compareOne(model, prompt, callSignal, startedAt)]),
+    );
+    const summary = { completed: 0, failed: 0, timedOut: 0 };
+    while (pending.size) {
+      const outcome = await Promise.race(pending.values());
+      pending.delete(outcome.model);
+      if ('response' in outcome) {
+        summary.completed++;
+        yield { type: 'result', data: outcome };
+      } else if (deadline.aborted) {
+        summary.timedOut++;
+        yield { type: 'timeout', data: { model: outcome.model, latencyMs: outcome.latencyMs } };
+      } else {
+        summary.failed++;
+        yield { type: 'failed', data: outcome };
+      }
+    }
+    yield { type: 'done', data: { ...summary, latencyMs: Date.now() - startedAt } };
+  }
+
+  /**
+   * Canonical names of the models compare() runs, every configured model
+   * by default. Unknown or repeated models are rejected with 400; the
+   * controller checks them before the event stream opens.
+   */
+  compareModels(dto: CompareGenerateDto): string[] {
+    if (!dto.models?.length) return this.providers.models();
+    const models = dto.models.map((model) => {
+      try {
+        return this.providers.get(model).name;
+      } catch (error) {
+        throw new BadRequestException(error.message);
+      }
+    });
+    const repeated = models.find((model, index) => models.indexOf(model) !== index);
+    if (repeated) {
+      throw new BadRequestException(`Model listed more than once: ${repeated}`);
+    }
+    return models;
   }
 
   /**
    * Expose Python execution (for charts, code, etc.)
    */
-  async executePython(code: string) {
+  async executePython(code: string, stream = false) {
+    if (stream) {
+      const jobId = this.pythonJobStream.start(code);
+      return { jobId, stream: `/generate/execute-python/${jobId}/stream` };
+    }
     return this.pythonExecutor.execute(code);
   }
+
+  /**
+   * Live output of a job started with stream: true
+   */
+  streamPython(jobId: string): Observable<MessageEvent> {
+    return this.pythonJobStream.stream(jobId);
+  }
+
+  getArtifacts(jobId: string) {
+    return this.pythonExecutor.manifest(jobId);
+  }
+
+  getArtifactPath(jobId: string, name: string) {
+    return this.pythonExecutor.artifactPath(jobId, name);
+  }
+
+  /**
+   * Counters and timings collected across generation and execution
+   */
+  getMetrics() {
+    return {
+      ...this.metrics.snapshot(),
+      python: this.pythonExecutor.stats(),
+      llmHttp: this.llmHttp.stats(),
+      promptCache: this.promptCache.stats(),
+      rateLimits: this.rateLimiter.stats(),
+      parser: this.parserPool.stats(),
+      // saved = upstream calls avoided by joining an identical pending generation
+      coalescing: this.inFlight.stats(),
+    };
+  }
+
+  // Never rejects, so compare() can race the calls
+  private async compareOne(
+    model: string,
+    prompt: string,
+    signal: AbortSignal,
+    startedAt: number,
+  ): Promise<
+    | { model: string; latencyMs: number; usage?: LlmUsage; response: GenerateResponseDto }
+    | { model: string; latencyMs: number; message: string }
+  > {
+    try {
+      const { text, usage } = await this.providers.complete(model, prompt, { signal });
+      const response = await this.parserPool.parse(text, model);
+      return { model, latencyMs: Date.now() - startedAt, usage, response };
+    } catch (error) {
+      return { model, latencyMs: Date.now() - startedAt, message: error.message };
+    }
+  }
+
+  /**
+   * Generates the response for a cache key. Identical requests arriving
+   * while one is generating share it, streamed or not; the upstream call is
+   * cancelled once all of them have gone. Streamed callers read the text
+   * from the flight's feed: token by token when the flight streams, in one
+   * piece when it does not.
+   */
+  private generate(
+    cacheKey: string,
+    dto: CreateGenerateDto,
+    stream: boolean,
+    signal?: AbortSignal,
+  ): { response: Promise<GenerateResponseDto>; text: ReplayFeed<string> } {
+    const { prompt, model } = dto;
+    const cacheControl = dto.cacheControl ?? 'default';
+
+    const response = this.inFlight.run(
+      cacheKey,
+      async (upstreamSignal) => {
+        // Runs before run() returns, so the caller that started the flight finds it
+        const feed = new ReplayFeed<string>();
+        this.feeds.set(cacheKey, feed);
+        try {
+          this.metrics.increment('generate.upstream_calls');
+          let rawText = '';
+          let routed: Omit<RoutedCompletion, 'text' | 'usage'>;
+          if (stream) {
+            routed = { model, hedged: false, failed: [] };
+            const chunks = this.router.stream(model, prompt, dto.routing, upstreamSignal);
+            for await (const chunk of chunks) {
+              routed = { model: chunk.model, hedged: chunk.hedged, failed: chunk.failed };
+              if (chunk.text) {
+                rawText += chunk.text;
+                feed.push(chunk.text);
+              }
+            }
+          } else {
+            routed = await this.router.complete(model, prompt, dto.routing, upstreamSignal);
+            rawText = routed.text;
+            feed.push(rawText);
+          }
+          feed.end();
+
+          // Parse response into structured format
+          const response = await this.parserPool.parse(rawText, routed.model);
+          response.metadata = {
+            model: routed.model,
+            hedged: routed.hedged,
+            failed: routed.failed,
+          };
+          if (cacheControl !== 'no-store') {
+            await this.promptCache.set(cacheKey, rawText, response);
+          }
+          return response;
+        } finally {
+          feed.end();
+        }
+      },
+      signal,
+    );
+
+    // Kept until the flight has settled, so every caller that joins it finds its feed
+    const text = this.feeds.get(cacheKey)!;
+    const forget = () => {
+      if (this.feeds.get(cacheKey) === text) this.feeds.delete(cacheKey);
+    };
+    void response.then(forget, forget);
+    return { response, text };
+  }
+
+  // Changing a model's id or token limit in models.json invalidates its entries
+  private promptCacheKey(model: string, prompt: string, routing?: RoutingPolicy): string {
+    const config = this.providers.config(model);
+    return this.promptCache.keyFor(model, prompt, {
+      model: config.model,
+      maxTokens: config.limits?.maxTokens,
+      // A routed answer may come from another model
+      ...(routing && { routing }),
+    });
+  }
+}
+
+// A cached response, delivered in one piece
+async function* replay(text: string): AsyncGenerator<string> {
+  yield text;
+}
+
+function toMessageEvents(events: ParseEvent[], encoding?: ChartEncoding): MessageEvent[] {
+  return events.map((event) => {
+    if (event.type === 'chart' && encoding) {
+      return { type: event.type, data: { chart: encodeChart(event.chart, encoding) } };
+    }
+    const { type, ...data } = event;
+    return { type, data };
+  });
 }
@@ -0,0 +1,94 @@
+import { IncrementalParser, ParseEvent } from './incremental-parser';
+
+const RESPONSE = [
+  'Here is the spectrum.',
+  '',
+  '```json',
+  '{"x": [1, 2, 3], "y": ["4", 5, 6], "label": "FT-IR"}',
+  '```',
+  '',
+  '| Peak | Assignment |',
+  '|------|------------|',
+  '| 1700 | C=O |',
+  '| 2950 | C-H |',
+  '',
+  '```python',
+  'import matplotlib.pyplot as plt',
+  '| not | a table |',
+  '```',
+  'Done.',
+].join('\n');
+
+function feed(text: string, chunkSize: number): ParseEvent[] {
+  const parser = new IncrementalParser('model');
+  const events: ParseEvent[] = [];
+  for (let i = 0; i < text.length; i += chunkSize) {
+    events.push(...parser.push(text.slice(i, i + chunkSize)));
+  }
+  return [...events, ...parser.end()];
+}
+
+describe('IncrementalParser', () => {
+  it('emits each structure once it closes, whatever the chunking', () => {
+    const expected: ParseEvent[] = [
+      { type: 'chart', chart: { x: [1, 2, 3], y: [4, 5, 6], label: 'FT-IR' } },
+      {
+        type: 'table',
+        table: {
+          headers: ['Peak', 'Assignment'],
+          rows: [['1700', 'C=O'], ['2950', 'C-H']],
+          columns: [
+            { name: 'Peak', type: 'number', values: [1700, 2950] },
+            { name: 'Assignment', type: 'string', values: ['C=O', 'C-H'] },
+          ],
+        },
+      },
+      {
+        type: 'code',
+        code: 'import matplotlib.pyplot as plt\n| not | a table |',
+        language: 'python',
+      },
+    ];
+
+    for (const size of [1, 3, 7, RESPONSE.length]) {
+      expect(feed(RESPONSE, size)).toEqual(expected);
+    }
+  });
+
+  it('emits the chart before the rest of the response arrives', () => {
+    const parser = new IncrementalParser('model');
+    expect(parser.push('```json\n{"x": [1], "y": [2]}\n')).toEqual([]);
+    expect(parser.push('```\nstill writing')).toEqual([
+      { type: 'chart', chart: { x: [1], y: [2], label: 'model' } },
+    ]);
+  });
+
+  it('closes a table at the end of the stream and ignores lines without a separator', () => {
+    const events = feed('| a | b |\n| c | d |\n| x | y |\n|---|---|\n| 1 | 2 |', 4);
+    expect(events).toEqual([
+      {
+        type: 'table',
+        table: {
+          headers: ['x', 'y'],
+          rows: [['1', '2']],
+          columns: [
+            { name: 'x', type: 'number', values: [1] },
+            { name: 'y', type: 'number', values: [2] },
+          ],
+        },
+      },
+    ]);
+  });
+
+  it('drops unterminated fences and charts without data', () => {
+    expect(feed('```json\n{"label": "none"}\n```\n```python\nprint(1)', 5)).toEqual([]);
+  });
+
+  it('keeps text outside structures as the explanation', () => {
+    const parser = new IncrementalParser('model');
+    parser.push('| a | b |\r\n| c | d |\nprose\n```python\nunter');
+    parser.push('minated');
+    expect(parser.end()).toEqual([]);
+    expect(parser.explanation()).toBe('| a | b |\n| c | d |\nprose\n```python\nunterminated');
+  });
+});
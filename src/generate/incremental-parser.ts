@@ -0,0 +1,226 @@
+import {
+  ChartDto as Chart,
+  GenerateResponseDto,
+  TableColumnDto,
+} from './dto/generate-response.dto';
+
+type Table = NonNullable<GenerateResponseDto['tables']>[number];
+
+export type ParseEvent =
+  | { type: 'chart'; chart: Chart }
+  | { type: 'table'; table: Table }
+  | { type: 'code'; code: string; language: string };
+
+const FENCE_LANGUAGE = /^[\w+-]*$/;
+const SEPARATOR_CHARS = '-:| \t\f\v';
+const CODE_LANGUAGES = new Set(['', 'python', 'py']);
+const NUMBER_CHARS = '0123456789+-.eE';
+// Columns may hold at most this many times the cells the rows provide
+const MAX_PADDING = 4;
+
+/**
+ * Parses a model response while it is still being generated. Text is fed
+ * in arbitrary chunks and processed line by line; an event is emitted as
+ * soon as a structure closes: a ```json chart fence, a markdown table
+ * (on the first line after it), or a ```python block. Lines outside any
+ * structure are kept as the explanation.
+ *
+ * Parsing is linear in the length of the text, whatever its shape: each
+ * chunk is searched for newlines once, partial lines are joined once, and
+ * each line is classified by a constant number of left-to-right scans
+ * (trim, prefix/suffix checks, fenceLanguage, isTableSeparator) with no
+ * backtracking. A line is never revisited once the next one starts.
+ */
+export class IncrementalParser {
+  // Pieces of the current line, joined once its newline arrives
+  private pending: string[] = [];
+  private fence: { opener: string; language: string; lines: string[] } | null = null;
+  private table: string[] = [];
+  private readonly prose: string[] = [];
+
+  constructor(private readonly label: string) {}
+
+  push(chunk: string): ParseEvent[] {
+    const events: ParseEvent[] = [];
+    let newline = chunk.indexOf('\n');
+    if (newline === -1) {
+      this.pending.push(chunk);
+      return events;
+    }
+    this.pending.push(chunk.slice(0, newline));
+    this.line(this.pending.join(''), events);
+    let start = newline + 1;
+    while ((newline = chunk.indexOf('\n', start)) !== -1) {
+      this.line(chunk.slice(start, newline), events);
+      start = newline + 1;
+    }
+    this.pending = start < chunk.length ? [chunk.slice(start)] : [];
+    return events;
+  }
+
+  /** Flushes the last line; an unterminated fence stays in the explanation. */
+  end(): ParseEvent[] {
+    const events: ParseEvent[] = [];
+    const last = this.pending.join('');
+    this.pending = [];
+    if (last) this.line(last, events);
+    this.closeTable(events);
+    if (this.fence) {
+      this.prose.push(this.fence.opener);
+      for (const line of this.fence.lines) this.prose.push(line);
+      this.fence = null;
+    }
+    return events;
+  }
+
+  /** The text outside charts, tables and fenced blocks seen so far. */
+  explanation(): string {
+    return this.prose.join('\n').trim();
+  }
+
+  private line(line: string, events: ParseEvent[]) {
+    if (line.endsWith('\r')) line = line.slice(0, -1);
+    if (this.fence) {
+      // Only a bare ``` closes; ```lang inside a block is content
+      if (fenceLanguage(line) === '') {
+        this.closeFence(events);
+      } else {
+        this.fence.lines.push(line);
+      }
+      return;
+    }
+
+    const trimmed = line.trim();
+    if (trimmed.startsWith('|') && trimmed.endsWith('|') && trimmed.length > 1) {
+      // The second line of a table must be its separator
+      if (this.table.length === 1 && !isTableSeparator(trimmed)) {
+        this.prose.push(this.table[0]);
+        this.table = [];
+      }
+      this.table.push(trimmed);
+      return;
+    }
+    this.closeTable(events);
+
+    const language = fenceLanguage(line);
+    if (language !== null) {
+      this.fence = { opener: line, language: language.toLowerCase(), lines: [] };
+    } else {
+      this.prose.push(line);
+    }
+  }
+
+  private closeFence(events: ParseEvent[]) {
+    const { language, lines } = this.fence!;
+    this.fence = null;
+    const body = lines.join('\n').trim();
+
+    if (language === 'json') {
+      const chart = parseChart(body, this.label);
+      if (chart) events.push({ type: 'chart', chart });
+    } else if (CODE_LANGUAGES.has(language)) {
+      events.push({ type: 'code', code: body, language: language || 'python' });
+    }
+  }
+
+  private closeTable(events: ParseEvent[]) {
+    const lines = this.table;
+    this.table = [];
+    if (lines.length < 3) {
+      this.prose.push(...lines);
+      return;
+    }
+    const [header, , ...body] = lines.map(splitCells);
+    events.push({
+      type: 'table',
+      table: {
+        headers: header.filter(Boolean),
+        rows: body.map((cells) => cells.filter(Boolean)),
+        columns: typedColumns(header, body),
+      },
+    });
+  }
+}
+
+export function parseChart(json: string, label: string): Chart | null {
+  try {
+    const parsed = JSON.parse(json);
+    if (parsed.x && parsed.y) {
+      return {
+        x: parsed.x.map(Number),
+        y: parsed.y.map(Number),
+        label: parsed.label || label,
+      };
+    }
+  } catch {}
+  return null;
+}
+
+/**
+ * The language tag of a fence line (``` plus an optional tag, alone on
+ * the line): '' for a bare fence, null if the line is not a fence.
+ */
+function fenceLanguage(line: string): string | null {
+  const trimmed = line.trim();
+  if (!trimmed.startsWith('```')) return null;
+  const language = trimmed.slice(3).trimStart();
+  return FENCE_LANGUAGE.test(language) ? language : null;
+}
+
+// |---|:--:| and the like: pipes at both ends, only dashes, colons, pipes and blanks between
+function isTableSeparator(trimmed: string): boolean {
+  if (trimmed.length < 3 || trimmed[0] !== '|' || trimmed[trimmed.length - 1] !== '|') {
+    return false;
+  }
+  for (let i = 1; i < trimmed.length - 1; i++) {
+    if (!SEPARATOR_CHARS.includes(trimmed[i])) return false;
+  }
+  return true;
+}
+
+/**
+ * A table's cells by column, one per header cell. Unlike rows, empty cells
+ * keep their position. A column is numeric when every non-empty cell is a
+ * plain decimal number. Left out when the rows are far narrower than the
+ * header, as padding them would cost more than the table itself.
+ */
+function typedColumns(names: string[], rows: string[][]): TableColumnDto[] | undefined {
+  const width = names.length;
+  let cells = 0;
+  for (const row of rows) cells += Math.min(row.length, width);
+  if (width * rows.length > MAX_PADDING * cells + width) return undefined;
+
+  const columns: TableColumnDto[] = [];
+  for (let i = 0; i < width; i++) {
+    const values = rows.map((row) => row[i] ?? '');
+    const numbers = values.map(toNumber);
+    const numeric =
+      values.some(Boolean) && numbers.every((n, row) => n !== null || !values[row]);
+    const name = names[i] || `column_${i + 1}`;
+    columns.push(
+      numeric
+        ? { name, type: 'number', values: numbers }
+        : { name, type: 'string', values },
+    );
+  }
+  return columns;
+}
+
+// Every cell between the outer pipes, empty ones included; rows and
+// headers drop the empty ones
+function splitCells(line: string): string[] {
+  return line
+    .slice(1, -1)
+    .split('|')
+    .map((cell) => cell.trim());
+}
+
+// Digits, sign, decimal point and exponent only: no hex, Infinity or blanks
+function toNumber(cell: string): number | null {
+  if (!cell) return null;
+  for (let i = 0; i < cell.length; i++) {
+    if (!NUMBER_CHARS.includes(cell[i])) return null;
+  }
+  const value = Number(cell);
+  return Number.isFinite(value) ? value : null;
+}
@@ -0,0 +1,10 @@
+export interface ParseRequest {
+  id: number;
+  text: string;
+  label: string;
+}
+
+export type ParseReply =
+  // The parsed response as UTF-8 JSON, its buffer transferred rather than copied
+  | { id: number; json: Uint8Array; parseMs: number }
+  | { id: number; error: string };
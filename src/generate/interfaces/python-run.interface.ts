@@ -0,0 +1,35 @@
+import { OutputStream } from '../output-collector';
+
+export interface ResourceLimits {
+  memoryMb?: number;
+  cpuSeconds?: number;
+  openFiles?: number;
+  fileSizeMb?: number;
+}
+
+export interface PythonJob {
+  id: string;
+  code: string;
+  filename: string;
+  cwd?: string;
+  timeoutMs: number;
+  limits?: ResourceLimits;
+  // cgroup v2 directory the script should join, if any
+  cgroup?: string | null;
+  // Output budget shared by stdout and stderr, enforced where the output is read
+  maxOutputBytes?: number;
+  // Receives output while the script runs
+  onOutput?: (stream: OutputStream, chunk: string) => void;
+}
+
+export interface PythonRunOutcome {
+  exitCode: number | null;
+  signal?: string | null;
+  stdout: string;
+  stderr: string;
+  timedOut: boolean;
+  oomKilled?: boolean;
+  truncated?: boolean;
+  artifacts?: string[] | null;
+  error?: string;
+}
@@ -0,0 +1,130 @@
+import { GatewayTimeoutException } from '@nestjs/common';
+import { AxiosResponse, isAxiosError } from 'axios';
+import { LlmHttpClientService } from './llm-http-client.service';
+import {
+  LlmCallOptions,
+  LlmCompletion,
+  LlmProvider,
+  LlmStreamChunk,
+  ModelConfig,
+} from './llm-provider.interface';
+import { ProtocolAdapter, ProtocolRequest } from './protocols';
+import { readSse } from './sse';
+
+/** A models.json entry bound to its protocol adapter and the shared HTTP client. */
+export class HttpLlmProvider implements LlmProvider {
+  constructor(
+    readonly name: string,
+    private readonly config: ModelConfig,
+    private readonly adapter: ProtocolAdapter,
+    private readonly http: LlmHttpClientService,
+    // Sees every upstream response, including errors, for rate-limit headers
+    private readonly onResponse?: (headers: any, status: number) => void,
+  ) {}
+
+  async complete(
+    prompt: string,
+    options: LlmCallOptions = {},
+  ): Promise<LlmCompletion> {
+    const request = this.adapter.request(this.config, prompt, this.withDefaults(options));
+    const deadline = this.deadline(options);
+    try {
+      const response = await this.send(request, deadline.signal);
+      return this.adapter.parse(response.data, this.config);
+    } catch (error) {
+      throw deadline.translate(error);
+    }
+  }
+
+  async *stream(
+    prompt: string,
+    options: LlmCallOptions = {},
+  ): AsyncGenerator<LlmStreamChunk> {
+    const request = this.adapter.streamRequest(
+      this.config,
+      prompt,
+      this.withDefaults(options),
+    );
+    // The deadline covers the whole stream, not just the first byte
+    const deadline = this.deadline(options);
+    let response: AxiosResponse | undefined;
+    try {
+      response = await this.send(request, deadline.signal, true);
+      for await (const event of readSse(response.data)) {
+        const chunk = this.adapter.parseEvent(event);
+        if (!chunk) continue;
+        yield chunk;
+        if (chunk.done) break;
+      }
+    } catch (error) {
+      throw deadline.translate(error);
+    } finally {
+      // Consumer stopped early: release the connection instead of leaving it half-read
+      response?.data.destroy();
+    }
+  }
+
+  /**
+   * The caller's signal combined with the total timeout. translate() turns
+   * the cancellation caused by the timeout into a 504.
+   */
+  private deadline(options: LlmCallOptions) {
+    const timeoutMs = this.config.limits?.timeoutMs;
+    if (!timeoutMs) {
+      return { signal: options.signal, translate: (error: unknown) => error };
+    }
+    const timeout = AbortSignal.timeout(timeoutMs);
+    return {
+      signal: options.signal ? AbortSignal.any([options.signal, timeout]) : timeout,
+      translate: (error: unknown) =>
+        timeout.aborted && !options.signal?.aborted
+          ? new GatewayTimeoutException(`${this.name} did not finish within ${timeoutMs}ms`)
+          : error,
+    };
+  }
+
+  private async send(request: ProtocolRequest, signal?: AbortSignal, stream = false) {
+    try {
+      const response = await this.http.post(
+        request.url,
+        request.body,
+        {
+          headers: { ...this.headers(), ...request.headers },
+          signal,
+          ...(stream && { responseType: 'stream' as const }),
+        },
+        this.config.limits?.connectTimeoutMs,
+      );
+      this.onResponse?.(response.headers, response.status);
+      return response;
+    } catch (error) {
+      if (isAxiosError(error) && error.response) {
+        this.onResponse?.(error.response.headers, error.response.status);
+      }
+      throw error;
+    }
+  }
+
+  private withDefaults(options: LlmCallOptions): LlmCallOptions {
+    return {
+      ...options,
+      maxTokens: options.maxTokens ?? this.config.limits?.maxTokens,
+    };
+  }
+
+  // Resolved per call so keys rotated in the environment are picked up
+  private headers(): Record<string, string> {
+    const headers: Record<string, string> = { 'Content-Type': 'application/json' };
+    for (const [name, template] of Object.entries(this.config.headers ?? {})) {
+      const value = template.replace(/\$\{(\w+)\}/g, (_, key) => process.env[key] ?? '');
+      if (value) headers[name] = value;
+    }
+    const { auth } = this.config;
+    if (auth) {
+      const key = process.env[auth.env] ?? '';
+      const header = auth.header ?? 'Authorization';
+      headers[header] = (auth.prefix ?? (auth.header ? '' : 'Bearer ')) + key;
+    }
+    return headers;
+  }
+}
@@ -0,0 +1,115 @@
+import { Injectable, OnApplicationShutdown } from '@nestjs/common';
+import axios, { AxiosInstance, AxiosRequestConfig, AxiosResponse } from 'axios';
+import * as http from 'http';
+import * as https from 'https';
+import * as tls from 'tls';
+import { MetricsService } from '../metrics.service';
+
+/**
+ * HTTP client shared by every LLM provider. Keep-alive agents pool sockets
+ * per host, so consecutive generations against the same API reuse a warm
+ * TCP/TLS connection instead of handshaking again.
+ */
+@Injectable()
+export class LlmHttpClientService implements OnApplicationShutdown {
+  // Per host; requests beyond this wait for a free socket
+  private readonly maxSockets = Number(process.env.LLM_HTTP_MAX_SOCKETS) || 32;
+  private readonly maxFreeSockets =
+    Number(process.env.LLM_HTTP_MAX_FREE_SOCKETS) || 8;
+  // Idle sockets are closed after this; Node's own default (5s) is shorter
+  // than the gap between most generations
+  private readonly idleTimeoutMs =
+    Number(process.env.LLM_HTTP_IDLE_TIMEOUT_MS) || 60000;
+
+  private readonly httpAgent = new http.Agent(this.agentOptions());
+  private readonly httpsAgent = new https.Agent(this.agentOptions());
+
+  readonly client: AxiosInstance = axios.create({
+    httpAgent: this.httpAgent,
+    httpsAgent: this.httpsAgent,
+  });
+
+  constructor(private readonly metrics: MetricsService) {
+    this.client.interceptors.response.use((response) => {
+      this.metrics.increment(
+        response.request?.reusedSocket
+          ? 'llm.http.connection_reused'
+          : 'llm.http.connection_new',
+      );
+      return response;
+    });
+  }
+
+  /**
+   * connectTimeoutMs bounds opening a new connection (TCP and TLS); it does
+   * not apply when a pooled socket is reused.
+   */
+  post<T = any>(
+    url: string,
+    body: unknown,
+    config?: AxiosRequestConfig,
+    connectTimeoutMs?: number,
+  ): Promise<AxiosResponse<T>> {
+    return this.client.post<T>(url, body, {
+      ...config,
+      ...(connectTimeoutMs && { transport: connectTimeoutTransport(connectTimeoutMs) }),
+    });
+  }
+
+  /** Open and idle sockets per host. */
+  stats() {
+    const hosts: Record<string, { active: number; idle: number }> = {};
+    for (const agent of [this.httpAgent, this.httpsAgent]) {
+      for (const [name, sockets] of Object.entries(agent.sockets)) {
+        hosts[name] = { active: sockets?.length ?? 0, idle: 0 };
+      }
+      for (const [name, sockets] of Object.entries(agent.freeSockets)) {
+        hosts[name] = {
+          active: hosts[name]?.active ?? 0,
+          idle: sockets?.length ?? 0,
+        };
+      }
+    }
+    return { maxSockets: this.maxSockets, hosts };
+  }
+
+  onApplicationShutdown() {
+    this.httpAgent.destroy();
+    this.httpsAgent.destroy();
+  }
+
+  private agentOptions(): https.AgentOptions {
+    return {
+      keepAlive: true,
+      maxSockets: this.maxSockets,
+      maxFreeSockets: this.maxFreeSockets,
+      timeout: this.idleTimeoutMs,
+      scheduling: 'lifo',
+    };
+  }
+}
+
+// An axios transport that fails the request if its socket does not connect in time
+function connectTimeoutTransport(timeoutMs: number) {
+  return {
+    request(options: https.RequestOptions, callback: (res: http.IncomingMessage) => void) {
+      const transport = options.protocol === 'https:' ? https : http;
+      const req = transport.request(options, callback);
+      req.once('socket', (socket) => {
+        if (!socket.connecting) return;
+        const timer = setTimeout(() => {
+          const error: NodeJS.ErrnoException = new Error(
+            `Connection to ${options.hostname} not established within ${timeoutMs}ms`,
+          );
+          error.code = 'ETIMEDOUT';
+          req.destroy(error);
+        }, timeoutMs);
+        socket.once(socket instanceof tls.TLSSocket ? 'secureConnect' : 'connect', () =>
+          clearTimeout(timer),
+        );
+        socket.once('close', () => clearTimeout(timer));
+      });
+      return req;
+    },
+  };
+}
@@ -0,0 +1,157 @@
+import { GatewayTimeoutException } from '@nestjs/common';
+import { AxiosError, CanceledError } from 'axios';
+import { MetricsService } from '../metrics.service';
+import { LlmHttpClientService } from './llm-http-client.service';
+import { LlmProviderRegistryService } from './llm-provider-registry.service';
+import { LlmRateLimiterService } from './llm-rate-limiter.service';
+
+function httpError(status: number) {
+  return new AxiosError(`status ${status}`, 'ERR_BAD_RESPONSE', undefined, undefined, {
+    status,
+  } as any);
+}
+
+describe('LlmProviderRegistryService', () => {
+  let post: jest.Mock;
+  let metrics: MetricsService;
+  let registry: LlmProviderRegistryService;
+
+  beforeEach(() => {
+    process.env.LLAMA_API_KEY = 'llama-key';
+    process.env.ANTHROPIC_API_KEY = 'claude-key';
+    post = jest.fn();
+    metrics = new MetricsService();
+    registry = new LlmProviderRegistryService(
+      { post } as unknown as LlmHttpClientService,
+      metrics,
+      new LlmRateLimiterService(metrics),
+    );
+  });
+
+  afterEach(() => {
+    delete process.env.LLAMA_API_KEY;
+    delete process.env.ANTHROPIC_API_KEY;
+  });
+
+  it('loads every model from models.json', () => {
+    expect(registry.models()).toEqual(
+      expect.arrayContaining(['gemini', 'claude', 'llama', 'deepseek', 'qwen', 'gpt-oss-20b']),
+    );
+    expect(() => registry.get('gpt-5')).toThrow('Unsupported model: gpt-5');
+  });
+
+  it('shapes OpenAI-compatible requests from config', async () => {
+    post.mockResolvedValue({
+      data: {
+        choices: [{ message: { content: 'hello' } }],
+        usage: { prompt_tokens: 3, completion_tokens: 1 },
+      },
+    });
+
+    const completion = await registry.complete('Llama', 'hi');
+
+    expect(completion).toEqual({ text: 'hello', usage: { inputTokens: 3, outputTokens: 1 } });
+    const [url, body, config] = post.mock.calls[0];
+    expect(url).toBe('https://openrouter.ai/api/v1/chat/completions');
+    expect(body).toMatchObject({ model: 'meta-llama/llama-3.3-70b-instruct:free' });
+    expect(config.headers.Authorization).toBe('Bearer llama-key');
+    expect(metrics.count('llm.calls.llama')).toBe(1);
+  });
+
+  it('shapes Anthropic requests from config', async () => {
+    post.mockResolvedValue({ data: { content: [{ type: 'text', text: 'ok' }] } });
+
+    await expect(registry.complete('claude', 'hi')).resolves.toMatchObject({ text: 'ok' });
+    const [, body, config] = post.mock.calls[0];
+    expect(body).toMatchObject({ max_tokens: 1000 });
+    expect(config.headers['x-api-key']).toBe('claude-key');
+    expect(config.headers['anthropic-version']).toBe('2023-06-01');
+  });
+
+  it('retries server errors but not client errors', async () => {
+    post
+      .mockRejectedValueOnce(httpError(503))
+      .mockResolvedValueOnce({ data: { choices: [{ message: { content: 'ok' } }] } });
+    await expect(registry.complete('qwen', 'hi')).resolves.toMatchObject({ text: 'ok' });
+    expect(metrics.count('llm.retries.qwen')).toBe(1);
+
+    post.mockReset().mockRejectedValue(httpError(400));
+    await expect(registry.complete('qwen', 'hi')).rejects.toThrow('status 400');
+    expect(post).toHaveBeenCalledTimes(1);
+  });
+
+  it('rejects an OpenAI-compatible answer without content', async () => {
+    post.mockResolvedValue({ data: { choices: [], error: { message: 'overloaded' } } });
+    await expect(registry.complete('qwen', 'hi')).rejects.toThrow(
+      'API error: {"choices":[],"error":{"message":"overloaded"}}',
+    );
+  });
+
+  it('falls back to one retry when LLM_RETRIES is not a number', async () => {
+    process.env.LLM_RETRIES = 'three';
+    try {
+      registry = new LlmProviderRegistryService(
+        { post } as unknown as LlmHttpClientService,
+        metrics,
+        new LlmRateLimiterService(metrics),
+      );
+    } finally {
+      delete process.env.LLM_RETRIES;
+    }
+    post.mockRejectedValue(httpError(503));
+
+    await expect(registry.complete('qwen', 'hi')).rejects.toThrow('status 503');
+    expect(post).toHaveBeenCalledTimes(2);
+  });
+
+  it('gives up with a 504 once the total timeout passes', async () => {
+    registry.register('slow', {
+      protocol: 'openai-chat',
+      endpoint: 'https://llm.example/v1/chat/completions',
+      model: 'slow-model',
+      limits: { timeoutMs: 50, retries: 2 },
+    });
+    post.mockImplementation(
+      (_url, _body, { signal }) =>
+        new Promise((_, reject) =>
+          signal.addEventListener('abort', () => reject(new CanceledError())),
+        ),
+    );
+
+    await expect(registry.complete('slow', 'hi')).rejects.toBeInstanceOf(GatewayTimeoutException);
+    // A timed-out call is not repeated
+    expect(post).toHaveBeenCalledTimes(1);
+    expect(post.mock.calls[0][3]).toBe(10000);
+  });
+
+  it('frees the rate-limit slot of a failed stream while backing off', async () => {
+    let held = 0;
+    const rateLimiter = {
+      acquire: async () => {
+        held++;
+        return () => held--;
+      },
+    } as unknown as LlmRateLimiterService;
+    registry = new LlmProviderRegistryService(
+      { post } as unknown as LlmHttpClientService,
+      metrics,
+      rateLimiter,
+    );
+    const heldDuringBackoff: number[] = [];
+    jest.spyOn(registry as any, 'backoff').mockImplementation(async () => {
+      heldDuringBackoff.push(held);
+    });
+    let attempts = 0;
+    jest.spyOn(registry.get('qwen'), 'stream').mockImplementation(async function* () {
+      if (attempts++ === 0) throw httpError(503);
+      yield { text: 'ok' };
+    });
+
+    const chunks: string[] = [];
+    for await (const chunk of registry.stream('qwen', 'hi')) chunks.push(chunk.text!);
+
+    expect(chunks).toEqual(['ok']);
+    expect(heldDuringBackoff).toEqual([0]);
+    expect(held).toBe(0);
+  });
+});
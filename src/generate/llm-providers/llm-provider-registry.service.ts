@@ -0,0 +1,221 @@
+import { Injectable, Logger } from '@nestjs/common';
+import { isAxiosError } from 'axios';
+import * as fs from 'fs';
+import * as path from 'path';
+import { MetricsService } from '../metrics.service';
+import { HttpLlmProvider } from './http-llm-provider';
+import { LlmHttpClientService } from './llm-http-client.service';
+import { LlmRateLimiterService } from './llm-rate-limiter.service';
+import {
+  LlmCallOptions,
+  LlmCompletion,
+  LlmProvider,
+  LlmStreamChunk,
+  LlmUsage,
+  ModelConfig,
+} from './llm-provider.interface';
+import { PROTOCOLS } from './protocols';
+
+/**
+ * Providers configured in models.json (or LLM_MODELS_FILE), keyed by the
+ * model name clients send. Every call goes through complete() or stream(),
+ * which is where rate limits, timeouts, retries and metrics are applied
+ * uniformly.
+ */
+@Injectable()
+export class LlmProviderRegistryService {
+  private readonly logger = new Logger(LlmProviderRegistryService.name);
+
+  private readonly modelsFile =
+    process.env.LLM_MODELS_FILE || path.join(__dirname, 'models.json');
+  private readonly defaultConnectTimeoutMs =
+    Number(process.env.LLM_CONNECT_TIMEOUT_MS) || 10000;
+  private readonly defaultTimeoutMs = Number(process.env.LLM_TIMEOUT_MS) || 120000;
+  private readonly defaultRetries = retryCount(process.env.LLM_RETRIES);
+  // Retry n waits a random time up to min(max, base * 2^n)
+  private readonly retryBaseMs = Number(process.env.LLM_RETRY_BASE_MS) || 500;
+  private readonly retryMaxMs = Number(process.env.LLM_RETRY_MAX_MS) || 10000;
+
+  private readonly providers = new Map<string, LlmProvider>();
+  private readonly configs = new Map<string, ModelConfig>();
+
+  constructor(
+    private readonly http: LlmHttpClientService,
+    private readonly metrics: MetricsService,
+    private readonly rateLimiter: LlmRateLimiterService,
+  ) {
+    const models: Record<string, ModelConfig> = JSON.parse(
+      fs.readFileSync(this.modelsFile, 'utf-8'),
+    );
+    for (const [name, config] of Object.entries(models)) {
+      this.register(name, config);
+    }
+    this.logger.log(`Loaded ${this.providers.size} models from ${this.modelsFile}`);
+  }
+
+  register(name: string, config: ModelConfig) {
+    const adapter = PROTOCOLS[config.protocol];
+    if (!adapter) {
+      throw new Error(`Model ${name}: unknown protocol "${config.protocol}"`);
+    }
+    const retries = config.limits?.retries;
+    if (retries !== undefined && !isRetryCount(retries)) {
+      throw new Error(`Model ${name}: retries must be a non-negative number`);
+    }
+    const key = name.toLowerCase();
+    const resolved: ModelConfig = {
+      ...config,
+      limits: {
+        connectTimeoutMs: this.defaultConnectTimeoutMs,
+        timeoutMs: this.defaultTimeoutMs,
+        retries: this.defaultRetries,
+        ...config.limits,
+      },
+    };
+    this.configs.set(key, resolved);
+    this.providers.set(
+      key,
+      new HttpLlmProvider(key, resolved, adapter, this.http, (headers, status) =>
+        this.rateLimiter.observe(key, resolved, headers, status),
+      ),
+    );
+  }
+
+  models(): string[] {
+    return [...this.providers.keys()];
+  }
+
+  config(model: string): ModelConfig {
+    return this.configs.get(this.get(model).name)!;
+  }
+
+  get(model: string): LlmProvider {
+    const provider = model && this.providers.get(model.toLowerCase());
+    if (!provider) {
+      throw new Error(`Unsupported model: ${model}`);
+    }
+    return provider;
+  }
+
+  async complete(
+    model: string,
+    prompt: string,
+    options: LlmCallOptions = {},
+  ): Promise<LlmCompletion> {
+    const provider = this.get(model);
+    const config = this.configs.get(provider.name)!;
+    const { retries } = config.limits!;
+
+    for (let attempt = 0; ; attempt++) {
+      const release = await this.rateLimiter.acquire(provider.name, config, options.signal);
+      const startedAt = Date.now();
+      try {
+        const completion = await provider.complete(prompt, options);
+        release();
+        this.record(provider.name, Date.now() - startedAt, completion);
+        return completion;
+      } catch (error) {
+        release();
+        // Cancelled by the caller, e.g. the losing side of a hedge: not an error
+        if (options.signal?.aborted) throw error;
+        this.metrics.increment(`llm.errors.${provider.name}`);
+        if (attempt >= retries! || !isRetryable(error)) throw error;
+        this.metrics.increment(`llm.retries.${provider.name}`);
+        await this.backoff(attempt, options.signal);
+      }
+    }
+  }
+
+  /**
+   * Streams completion chunks. Failures are retried only until the first
+   * chunk has been handed out; time to first token is recorded per model.
+   */
+  async *stream(
+    model: string,
+    prompt: string,
+    options: LlmCallOptions = {},
+  ): AsyncGenerator<LlmStreamChunk> {
+    const provider = this.get(model);
+    const config = this.configs.get(provider.name)!;
+    const { retries } = config.limits!;
+    const startedAt = Date.now();
+    const usage: LlmUsage = {};
+    let started = false;
+
+    for (let attempt = 0; ; attempt++) {
+      // Held for the whole attempt, including while the consumer reads it
+      const release = await this.rateLimiter.acquire(provider.name, config, options.signal);
+      try {
+        for await (const chunk of provider.stream(prompt, options)) {
+          if (chunk.text) {
+            if (!started) {
+              this.metrics.observe(`llm.ttft_ms.${provider.name}`, Date.now() - startedAt);
+            }
+            started = true;
+          }
+          Object.assign(usage, chunk.usage);
+          yield chunk;
+        }
+        break;
+      } catch (error) {
+        if (options.signal?.aborted) throw error;
+        this.metrics.increment(`llm.errors.${provider.name}`);
+        if (started || attempt >= retries! || !isRetryable(error)) throw error;
+        this.metrics.increment(`llm.retries.${provider.name}`);
+      } finally {
+        release();
+      }
+      // After release, so the slot is free for others while this one waits
+      await this.backoff(attempt, options.signal);
+    }
+    this.record(provider.name, Date.now() - startedAt, { text: '', usage });
+  }
+
+  // Full jitter, so clients that failed together do not retry together
+  private backoff(attempt: number, signal?: AbortSignal): Promise<void> {
+    const delayMs = Math.random() * Math.min(this.retryMaxMs, this.retryBaseMs * 2 ** attempt);
+    if (signal?.aborted) return Promise.reject(signal.reason);
+    return new Promise((resolve, reject) => {
+      const onAbort = () => {
+        clearTimeout(timer);
+        reject(signal!.reason);
+      };
+      const timer = setTimeout(() => {
+        signal?.removeEventListener('abort', onAbort);
+        resolve();
+      }, delayMs);
+      signal?.addEventListener('abort', onAbort, { once: true });
+    });
+  }
+
+  private record(model: string, latencyMs: number, completion: LlmCompletion) {
+    this.metrics.increment(`llm.calls.${model}`);
+    this.metrics.observe(`llm.latency_ms.${model}`, latencyMs);
+    if (completion.usage?.inputTokens) {
+      this.metrics.increment(`llm.tokens.input.${model}`, completion.usage.inputTokens);
+    }
+    if (completion.usage?.outputTokens) {
+      this.metrics.increment(`llm.tokens.output.${model}`, completion.usage.outputTokens);
+    }
+  }
+}
+
+function retryCount(value: string | undefined): number {
+  const retries = Number(value ?? 1);
+  return isRetryCount(retries) ? retries : 1;
+}
+
+// NaN would make `attempt >= retries` never true, retrying forever
+function isRetryCount(value: unknown): value is number {
+  return typeof value === 'number' && Number.isFinite(value) && value >= 0;
+}
+
+// Connection failures (resets, connect timeouts), rate limits and server
+// errors; other 4xx will not improve. Generation requests have no side
+// effects upstream, so repeating them is safe.
+function isRetryable(error: unknown): boolean {
+  if (!isAxiosError(error)) return false;
+  if (error.code === 'ERR_CANCELED') return false;
+  const status = error.response?.status;
+  return status === undefined || status === 408 || status === 429 || status >= 500;
+}
@@ -0,0 +1,56 @@
+import type { RateLimit } from './rate-limiter';
+
+export interface LlmUsage {
+  inputTokens?: number;
+  outputTokens?: number;
+}
+
+export interface LlmCompletion {
+  text: string;
+  usage?: LlmUsage;
+}
+
+export interface LlmStreamChunk {
+  text?: string;
+  // Usage arrives in pieces; later chunks complete earlier ones
+  usage?: LlmUsage;
+  done?: boolean;
+}
+
+export interface LlmCallOptions {
+  maxTokens?: number;
+  signal?: AbortSignal;
+}
+
+export interface LlmProvider {
+  readonly name: string;
+  complete(prompt: string, options?: LlmCallOptions): Promise<LlmCompletion>;
+  stream(prompt: string, options?: LlmCallOptions): AsyncIterable<LlmStreamChunk>;
+}
+
+/** One entry of models.json. */
+export interface ModelConfig {
+  // openai-chat (OpenRouter and other OpenAI-compatible APIs) | anthropic | gemini
+  protocol: string;
+  endpoint: string;
+  model: string;
+  auth?: {
+    // Environment variable holding the key
+    env: string;
+    header?: string;
+    prefix?: string;
+    // Shared by every model using the same key
+    rateLimit?: RateLimit;
+  };
+  // Extra headers; ${VAR} is replaced from the environment, empty ones are dropped
+  headers?: Record<string, string>;
+  limits?: {
+    // Opening a new connection, TCP and TLS
+    connectTimeoutMs?: number;
+    // The whole call, including reading a streamed response
+    timeoutMs?: number;
+    retries?: number;
+    maxTokens?: number;
+  };
+  rateLimit?: RateLimit;
+}
@@ -0,0 +1,132 @@
+import { Injectable } from '@nestjs/common';
+import { createHash } from 'crypto';
+import { MetricsService } from '../metrics.service';
+import { ModelConfig } from './llm-provider.interface';
+import { RateLimit, RateLimiter } from './rate-limiter';
+
+type Headers = Record<string, any> | undefined;
+
+/**
+ * Rate limiters for LLM calls: one per model (models.json rateLimit) and
+ * one per API key (auth.rateLimit), shared by every model using that key.
+ * Requests queue for up to LLM_RATE_LIMIT_QUEUE_MS. Limiters pause when an
+ * upstream answers with Retry-After or reports its rate-limit window as
+ * exhausted.
+ */
+@Injectable()
+export class LlmRateLimiterService {
+  private readonly queueTimeoutMs =
+    Number(process.env.LLM_RATE_LIMIT_QUEUE_MS) || 30000;
+  private readonly maxQueue = Number(process.env.LLM_RATE_LIMIT_MAX_QUEUE) || 100;
+
+  private readonly limiters = new Map<string, RateLimiter>();
+
+  constructor(private readonly metrics: MetricsService) {}
+
+  /** Waits for both limiters of a model; resolves with a release function. */
+  async acquire(
+    model: string,
+    config: ModelConfig,
+    signal?: AbortSignal,
+  ): Promise<() => void> {
+    const startedAt = Date.now();
+    const releases: (() => void)[] = [];
+    try {
+      for (const limiter of this.limitersFor(model, config)) {
+        const remainingMs = this.queueTimeoutMs - (Date.now() - startedAt);
+        releases.push(await limiter.acquire(Math.max(0, remainingMs), signal));
+      }
+    } catch (error) {
+      releases.forEach((release) => release());
+      this.metrics.increment(`llm.rate_limited.${model}`);
+      throw error;
+    }
+    this.metrics.observe(`llm.rate_limit_wait_ms.${model}`, Date.now() - startedAt);
+    return () => releases.forEach((release) => release());
+  }
+
+  /** Adapts to the rate-limit information in an upstream response. */
+  observe(model: string, config: ModelConfig, headers: Headers, status?: number) {
+    const until = pauseUntil(headers, status, Date.now());
+    if (until === null) return;
+    this.metrics.increment(`llm.rate_limit_paused.${model}`);
+    for (const limiter of this.limitersFor(model, config)) {
+      limiter.pause(until);
+    }
+  }
+
+  stats() {
+    return Object.fromEntries(
+      [...this.limiters].map(([name, limiter]) => [name, limiter.stats()]),
+    );
+  }
+
+  private limitersFor(model: string, config: ModelConfig): RateLimiter[] {
+    const limiters = [this.limiter(`model:${model}`, config.rateLimit ?? {})];
+    const key = config.auth && process.env[config.auth.env];
+    if (key) {
+      // Never keep the key itself, even in a map key shown on /metrics
+      const id = createHash('sha256').update(key).digest('hex').slice(0, 12);
+      limiters.push(this.limiter(`key:${id}`, config.auth!.rateLimit ?? {}));
+    }
+    return limiters;
+  }
+
+  private limiter(name: string, limit: RateLimit) {
+    let limiter = this.limiters.get(name);
+    if (!limiter) {
+      limiter = new RateLimiter(name, limit, this.maxQueue);
+      this.limiters.set(name, limiter);
+    }
+    return limiter;
+  }
+}
+
+/**
+ * When the upstream wants us to hold off: Retry-After (seconds or HTTP
+ * date), or an exhausted window in OpenRouter/OpenAI-style x-ratelimit-*
+ * or Anthropic's anthropic-ratelimit-requests-* headers.
+ */
+export function pauseUntil(headers: Headers, status: number | undefined, now: number): number | null {
+  const header = (name: string): string | undefined => {
+    const value = headers?.[name] ?? headers?.get?.(name);
+    return value === undefined || value === null ? undefined : String(value);
+  };
+
+  const retryAfter = header('retry-after');
+  if (retryAfter && (status === 429 || status === 503)) {
+    const seconds = Number(retryAfter);
+    const until = Number.isFinite(seconds) ? now + seconds * 1000 : Date.parse(retryAfter);
+    if (Number.isFinite(until)) return until;
+  }
+
+  for (const [remaining, reset] of [
+    ['x-ratelimit-remaining', 'x-ratelimit-reset'],
+    ['x-ratelimit-remaining-requests', 'x-ratelimit-reset-requests'],
+    ['anthropic-ratelimit-requests-remaining', 'anthropic-ratelimit-requests-reset'],
+  ]) {
+    if (header(remaining) === '0') {
+      const until = resetTime(header(reset), now);
+      if (until !== null) return until;
+    }
+  }
+  return null;
+}
+
+// Reset headers come as epoch ms, epoch seconds, seconds from now, durations like "6m0s", or dates
+function resetTime(value: string | undefined, now: number): number | null {
+  if (!value) return null;
+  const number = Number(value);
+  if (Number.isFinite(number)) {
+    if (number > 1e12) return number;
+    if (number > 1e9) return number * 1000;
+    return now + number * 1000;
+  }
+  const duration = /^(?:(\d+)h)?(?:(\d+)m(?!s))?(?:([\d.]+)s)?(?:(\d+)ms)?$/.exec(value);
+  if (duration && duration[0]) {
+    const [, h, m, s, ms] = duration.map((part) => Number(part ?? 0));
+    return now + ((h * 60 + m) * 60 + s) * 1000 + ms;
+  }
+  const date = Date.parse(value);
+  return Number.isFinite(date) ? date : null;
+}
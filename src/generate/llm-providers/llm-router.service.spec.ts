@@ -0,0 +1,138 @@
+import { MetricsService } from '../metrics.service';
+import { LlmProviderRegistryService } from './llm-provider-registry.service';
+import { LlmRouterService } from './llm-router.service';
+
+describe('LlmRouterService', () => {
+  let complete: jest.Mock;
+  let stream: jest.Mock;
+  let metrics: MetricsService;
+  let router: LlmRouterService;
+
+  // Never answers; rejects once its call is aborted
+  const hang = (_model: string, _prompt: string, { signal }: { signal: AbortSignal }) =>
+    new Promise((_, reject) => signal.addEventListener('abort', () => reject(signal.reason)));
+
+  beforeEach(() => {
+    jest.useFakeTimers();
+    complete = jest.fn();
+    stream = jest.fn();
+    metrics = new MetricsService();
+    router = new LlmRouterService(
+      {
+        get: (name: string) => ({ name }),
+        complete,
+        stream,
+      } as unknown as LlmProviderRegistryService,
+      metrics,
+    );
+  });
+
+  afterEach(() => jest.useRealTimers());
+
+  it('falls back along the chain on errors', async () => {
+    complete
+      .mockRejectedValueOnce(new Error('status 503'))
+      .mockResolvedValueOnce({ text: 'ok' });
+
+    await expect(
+      router.complete('llama', 'hi', { fallback: ['qwen', 'gemini'] }),
+    ).resolves.toEqual({ text: 'ok', model: 'qwen', hedged: false, failed: ['llama'] });
+    expect(complete).toHaveBeenCalledTimes(2);
+  });
+
+  it('does not hedge when the primary answers within its p90', async () => {
+    metrics.observe('llm.latency_ms.llama', 1000);
+    complete.mockResolvedValue({ text: 'fast' });
+
+    await expect(router.complete('llama', 'hi', { hedge: 'qwen' })).resolves.toMatchObject({
+      model: 'llama',
+      hedged: false,
+    });
+    expect(complete).toHaveBeenCalledTimes(1);
+  });
+
+  it('hedges a slow primary and cancels the loser', async () => {
+    metrics.observe('llm.latency_ms.llama', 1000);
+    complete.mockImplementation((model, prompt, options) =>
+      model === 'qwen' ? Promise.resolve({ text: 'hedge' }) : hang(model, prompt, options),
+    );
+
+    const routed = router.complete('llama', 'hi', { hedge: 'qwen' });
+    await jest.advanceTimersByTimeAsync(999);
+    expect(complete).toHaveBeenCalledTimes(1);
+    await jest.advanceTimersByTimeAsync(1);
+
+    await expect(routed).resolves.toMatchObject({ text: 'hedge', model: 'qwen', hedged: true });
+    expect(complete.mock.calls[0][2].signal.aborted).toBe(true);
+    expect(metrics.count('llm.hedge_wins.qwen')).toBe(1);
+  });
+
+  describe('stream', () => {
+    // Sends its texts, then fails if given an error; waits for ms first
+    async function* chunks(texts: string[], error?: Error, ms = 0, signal?: AbortSignal) {
+      if (ms) {
+        await new Promise((resolve, reject) => {
+          setTimeout(resolve, ms);
+          signal?.addEventListener('abort', () => reject(signal.reason));
+        });
+      }
+      for (const text of texts) yield { text };
+      if (error) throw error;
+    }
+
+    const collect = async (routed: AsyncIterable<any>) => {
+      const received: any[] = [];
+      for await (const chunk of routed) received.push(chunk);
+      return received;
+    };
+
+    it('falls back while the model has sent nothing, and reports the route', async () => {
+      stream
+        .mockImplementationOnce(() => chunks([], new Error('status 503')))
+        .mockImplementationOnce(() => chunks(['o', 'k']));
+
+      const received = await collect(router.stream('llama', 'hi', { fallback: ['qwen'] }));
+
+      const route = { model: 'qwen', hedged: false, failed: ['llama'] };
+      expect(received).toEqual([
+        { text: 'o', ...route },
+        { text: 'k', ...route },
+        { done: true, ...route },
+      ]);
+      expect(metrics.count('llm.fallback_wins.qwen')).toBe(1);
+    });
+
+    it('does not switch models once text has been sent', async () => {
+      stream.mockImplementation(() => chunks(['partial'], new Error('connection reset')));
+
+      const received: any[] = [];
+      await expect(
+        (async () => {
+          for await (const chunk of router.stream('llama', 'hi', { fallback: ['qwen'] })) {
+            received.push(chunk);
+          }
+        })(),
+      ).rejects.toThrow('connection reset');
+      expect(received.map((chunk) => chunk.text)).toEqual(['partial']);
+      expect(stream).toHaveBeenCalledTimes(1);
+    });
+
+    it('hedges a primary slower than its p90 time to first token', async () => {
+      metrics.observe('llm.ttft_ms.llama', 1000);
+      stream.mockImplementation((model, _prompt, { signal }) =>
+        model === 'qwen' ? chunks(['hedge']) : chunks(['late'], undefined, 60000, signal),
+      );
+
+      const received = collect(router.stream('llama', 'hi', { hedge: 'qwen' }));
+      await jest.advanceTimersByTimeAsync(999);
+      expect(stream).toHaveBeenCalledTimes(1);
+      await jest.advanceTimersByTimeAsync(1);
+
+      expect((await received).map((chunk) => chunk.text)).toEqual(['hedge', undefined]);
+      expect((await received)[0]).toMatchObject({ model: 'qwen', hedged: true });
+      expect(stream.mock.calls[0][2].signal.aborted).toBe(true);
+      expect(stream.mock.calls[1][2].signal.aborted).toBe(false);
+      expect(metrics.count('llm.hedge_wins.qwen')).toBe(1);
+    });
+  });
+});
@@ -0,0 +1,240 @@
+import { Injectable } from '@nestjs/common';
+import { MetricsService } from '../metrics.service';
+import { LlmProviderRegistryService } from './llm-provider-registry.service';
+import { LlmCompletion, LlmStreamChunk } from './llm-provider.interface';
+
+export interface RoutingPolicy {
+  // Models tried in order once the requested model errors or times out
+  fallback?: string[];
+  // Sent the same prompt when the requested model runs past its p90 latency
+  // (time to first token when streaming)
+  hedge?: string;
+}
+
+export interface RoutedCompletion extends LlmCompletion {
+  // The model whose answer was used
+  model: string;
+  hedged: boolean;
+  // Models that failed before one answered
+  failed: string[];
+}
+
+export type RoutedStreamChunk = LlmStreamChunk & Omit<RoutedCompletion, 'text' | 'usage'>;
+
+interface OpenedStream {
+  model: string;
+  hedged: boolean;
+  chunks: AsyncIterator<LlmStreamChunk>;
+  first: IteratorResult<LlmStreamChunk>;
+}
+
+/**
+ * Routes a prompt across models for tail latency: hedges the requested
+ * model with a second one once it is slower than usual, and falls back
+ * along a chain of models on errors, for whole answers and streams.
+ * Losing and abandoned calls are cancelled.
+ */
+@Injectable()
+export class LlmRouterService {
+  // Hedge delay used until a model has latency samples
+  private readonly defaultHedgeMs = Number(process.env.LLM_HEDGE_DEFAULT_MS) || 10000;
+  private readonly minHedgeMs = Number(process.env.LLM_HEDGE_MIN_MS) || 500;
+
+  constructor(
+    private readonly providers: LlmProviderRegistryService,
+    private readonly metrics: MetricsService,
+  ) {}
+
+  async complete(
+    model: string,
+    prompt: string,
+    routing: RoutingPolicy = {},
+    signal?: AbortSignal,
+  ): Promise<RoutedCompletion> {
+    // Canonical names; unknown models are rejected before anything is sent
+    const chain = [model, ...(routing.fallback ?? [])].map(
+      (name) => this.providers.get(name).name,
+    );
+    const hedgeWith = routing.hedge && this.providers.get(routing.hedge).name;
+
+    const failed: string[] = [];
+    for (const [index, candidate] of chain.entries()) {
+      const hedge = index === 0 && hedgeWith !== candidate ? hedgeWith : undefined;
+      try {
+        const result = hedge
+          ? await this.hedged(candidate, hedge, prompt, signal)
+          : await this.single(candidate, prompt, signal);
+        if (failed.length) this.metrics.increment(`llm.fallback_wins.${result.model}`);
+        return { ...result, failed };
+      } catch (error) {
+        failed.push(candidate);
+        if (index === chain.length - 1 || signal?.aborted) throw error;
+        this.metrics.increment(`llm.fallbacks.${candidate}`);
+      }
+    }
+    throw new Error('Routing chain is empty');
+  }
+
+  /**
+   * Streaming counterpart of complete(). A model is hedged and failed over
+   * only until its first chunk: once text has been forwarded the answer
+   * cannot switch models. Every chunk carries the route, and the stream
+   * ends with a done chunk.
+   */
+  async *stream(
+    model: string,
+    prompt: string,
+    routing: RoutingPolicy = {},
+    signal?: AbortSignal,
+  ): AsyncGenerator<RoutedStreamChunk> {
+    const chain = [model, ...(routing.fallback ?? [])].map(
+      (name) => this.providers.get(name).name,
+    );
+    const hedgeWith = routing.hedge && this.providers.get(routing.hedge).name;
+
+    const failed: string[] = [];
+    for (const [index, candidate] of chain.entries()) {
+      const hedge = index === 0 && hedgeWith !== candidate ? hedgeWith : undefined;
+      let sent = false;
+      try {
+        const opened = hedge
+          ? await this.openHedged(candidate, hedge, prompt, signal)
+          : await this.open(candidate, prompt, signal);
+        if (failed.length) this.metrics.increment(`llm.fallback_wins.${opened.model}`);
+        const route = { model: opened.model, hedged: opened.hedged, failed };
+        try {
+          for (let next = opened.first; !next.done; next = await opened.chunks.next()) {
+            sent = true;
+            yield { ...next.value, ...route };
+          }
+        } finally {
+          await opened.chunks.return?.();
+        }
+        yield { done: true, ...route };
+        return;
+      } catch (error) {
+        failed.push(candidate);
+        if (sent || index === chain.length - 1 || signal?.aborted) throw error;
+        this.metrics.increment(`llm.fallbacks.${candidate}`);
+      }
+    }
+    throw new Error('Routing chain is empty');
+  }
+
+  private async single(model: string, prompt: string, signal?: AbortSignal) {
+    const completion = await this.providers.complete(model, prompt, { signal });
+    return { ...completion, model, hedged: false };
+  }
+
+  /**
+   * Calls primary; if it has not answered within its p90, also calls hedge.
+   * The first successful answer wins and the other call is aborted.
+   */
+  private async hedged(
+    primary: string,
+    hedge: string,
+    prompt: string,
+    signal?: AbortSignal,
+  ): Promise<Omit<RoutedCompletion, 'failed'>> {
+    const controllers = new Map<string, AbortController>();
+    const call = (model: string) => {
+      const controller = new AbortController();
+      controllers.set(model, controller);
+      const callSignal = signal
+        ? AbortSignal.any([signal, controller.signal])
+        : controller.signal;
+      return this.providers
+        .complete(model, prompt, { signal: callSignal })
+        .then((completion) => ({ ...completion, model }));
+    };
+
+    const primaryCall = call(primary);
+    let timer: NodeJS.Timeout | undefined;
+    const slow = new Promise<void>((resolve) => {
+      timer = setTimeout(resolve, this.hedgeDelay(`llm.latency_ms.${primary}`));
+    });
+    try {
+      // An early primary failure propagates to the fallback chain as is
+      const first = await Promise.race([primaryCall, slow]);
+      if (first) return { ...first, hedged: false };
+    } finally {
+      clearTimeout(timer);
+    }
+
+    this.metrics.increment(`llm.hedged.${primary}`);
+    try {
+      const winner = await Promise.any([primaryCall, call(hedge)]);
+      if (winner.model === hedge) this.metrics.increment(`llm.hedge_wins.${hedge}`);
+      return { ...winner, hedged: true };
+    } catch (error) {
+      throw (error as AggregateError).errors[0];
+    } finally {
+      for (const controller of controllers.values()) controller.abort();
+    }
+  }
+
+  // Starts a stream and waits for its first chunk
+  private async open(
+    model: string,
+    prompt: string,
+    signal?: AbortSignal,
+  ): Promise<OpenedStream> {
+    const chunks = this.providers.stream(model, prompt, { signal })[Symbol.asyncIterator]();
+    return { model, hedged: false, chunks, first: await chunks.next() };
+  }
+
+  /**
+   * Opens primary; if its first chunk has not arrived within its p90 time
+   * to first token, also opens hedge. The first stream to produce a chunk
+   * is kept and the other is aborted.
+   */
+  private async openHedged(
+    primary: string,
+    hedge: string,
+    prompt: string,
+    signal?: AbortSignal,
+  ): Promise<OpenedStream> {
+    const controllers = new Map<string, AbortController>();
+    const open = (model: string) => {
+      const controller = new AbortController();
+      controllers.set(model, controller);
+      const callSignal = signal
+        ? AbortSignal.any([signal, controller.signal])
+        : controller.signal;
+      return this.open(model, prompt, callSignal);
+    };
+
+    const primaryOpen = open(primary);
+    let timer: NodeJS.Timeout | undefined;
+    const slow = new Promise<void>((resolve) => {
+      timer = setTimeout(resolve, this.hedgeDelay(`llm.ttft_ms.${primary}`));
+    });
+    try {
+      const first = await Promise.race([primaryOpen, slow]);
+      if (first) return first;
+    } finally {
+      clearTimeout(timer);
+    }
+
+    this.metrics.increment(`llm.hedged.${primary}`);
+    const hedgeOpen = open(hedge);
+    let winner: OpenedStream;
+    try {
+      winner = await Promise.any([primaryOpen, hedgeOpen]);
+    } catch (error) {
+      throw (error as AggregateError).errors[0];
+    }
+    // The winner keeps streaming; the loser is aborted and, if it opened
+    // after all, closed
+    const loser = winner.model === primary ? hedgeOpen : primaryOpen;
+    controllers.get(loser === hedgeOpen ? hedge : primary)!.abort();
+    loser.then((opened) => opened.chunks.return?.(), () => undefined);
+    if (winner.model === hedge) this.metrics.increment(`llm.hedge_wins.${hedge}`);
+    return { ...winner, hedged: true };
+  }
+
+  private hedgeDelay(metric: string): number {
+    const p90 = this.metrics.percentile(metric, 90);
+    return Math.max(this.minHedgeMs, p90 ?? this.defaultHedgeMs);
+  }
+}
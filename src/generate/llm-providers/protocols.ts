@@ -0,0 +1,153 @@
+import {
+  LlmCallOptions,
+  LlmCompletion,
+  LlmStreamChunk,
+  ModelConfig,
+} from './llm-provider.interface';
+import { SseEvent } from './sse';
+
+export interface ProtocolRequest {
+  url: string;
+  body: unknown;
+  headers?: Record<string, string>;
+}
+
+/** How one family of APIs shapes a completion request and its response. */
+export interface ProtocolAdapter {
+  request(config: ModelConfig, prompt: string, options: LlmCallOptions): ProtocolRequest;
+  parse(data: any, config: ModelConfig): LlmCompletion;
+  // Same request asking for a server-sent event stream
+  streamRequest(config: ModelConfig, prompt: string, options: LlmCallOptions): ProtocolRequest;
+  // null for events that carry nothing of interest (pings, block starts)
+  parseEvent(event: SseEvent): LlmStreamChunk | null;
+}
+
+const openAiChat: ProtocolAdapter = {
+  request: (config, prompt, options) => ({
+    url: config.endpoint,
+    body: {
+      model: config.model,
+      messages: [{ role: 'user', content: prompt }],
+      ...(options.maxTokens && { max_tokens: options.maxTokens }),
+    },
+  }),
+  parse: (data, config) => {
+    // Qwen and other OpenRouter models sometimes answer 200 with no choice or no content
+    if (!data.choices?.[0]?.message?.content) {
+      throw new Error(`${config.model} API error: ${JSON.stringify(data)}`);
+    }
+    return {
+      text: data.choices[0].message.content,
+      usage: data.usage && {
+        inputTokens: data.usage.prompt_tokens,
+        outputTokens: data.usage.completion_tokens,
+      },
+    };
+  },
+  streamRequest(config, prompt, options) {
+    const request = this.request(config, prompt, options);
+    return {
+      ...request,
+      body: {
+        ...(request.body as object),
+        stream: true,
+        stream_options: { include_usage: true },
+      },
+    };
+  },
+  parseEvent: (event) => {
+    if (event.data === '[DONE]') return { done: true };
+    const data = JSON.parse(event.data);
+    if (data.error) throw new Error(data.error.message ?? 'Stream error');
+    return {
+      text: data.choices?.[0]?.delta?.content || undefined,
+      usage: data.usage && {
+        inputTokens: data.usage.prompt_tokens,
+        outputTokens: data.usage.completion_tokens,
+      },
+    };
+  },
+};
+
+const anthropic: ProtocolAdapter = {
+  request: (config, prompt, options) => ({
+    url: config.endpoint,
+    body: {
+      model: config.model,
+      max_tokens: options.maxTokens ?? 1000,
+      messages: [{ role: 'user', content: prompt }],
+    },
+    headers: { 'anthropic-version': '2023-06-01' },
+  }),
+  parse: (data) => ({
+    text: data.content
+      .filter((block: any) => block.type === 'text')
+      .map((block: any) => block.text)
+      .join(''),
+    usage: data.usage && {
+      inputTokens: data.usage.input_tokens,
+      outputTokens: data.usage.output_tokens,
+    },
+  }),
+  streamRequest(config, prompt, options) {
+    const request = this.request(config, prompt, options);
+    return { ...request, body: { ...(request.body as object), stream: true } };
+  },
+  parseEvent: (event) => {
+    const data = JSON.parse(event.data);
+    switch (data.type) {
+      case 'content_block_delta':
+        return data.delta.type === 'text_delta' ? { text: data.delta.text } : null;
+      case 'message_start':
+        return { usage: { inputTokens: data.message.usage?.input_tokens } };
+      case 'message_delta':
+        return { usage: { outputTokens: data.usage?.output_tokens } };
+      case 'message_stop':
+        return { done: true };
+      case 'error':
+        throw new Error(data.error?.message ?? 'Stream error');
+      default:
+        return null;
+    }
+  },
+};
+
+const gemini: ProtocolAdapter = {
+  request: (config, prompt, options) => ({
+    url: `${config.endpoint}/${config.model}:generateContent`,
+    body: {
+      contents: [{ parts: [{ text: prompt }] }],
+      ...(options.maxTokens && {
+        generationConfig: { maxOutputTokens: options.maxTokens },
+      }),
+    },
+  }),
+  parse: (data) => ({
+    // Stream chunks may carry only a finish reason or usage
+    text: (data.candidates?.[0]?.content?.parts ?? [])
+      .map((part: any) => part.text ?? '')
+      .join(''),
+    usage: data.usageMetadata && {
+      inputTokens: data.usageMetadata.promptTokenCount,
+      outputTokens: data.usageMetadata.candidatesTokenCount,
+    },
+  }),
+  streamRequest(config, prompt, options) {
+    const request = this.request(config, prompt, options);
+    return {
+      ...request,
+      url: `${config.endpoint}/${config.model}:streamGenerateContent?alt=sse`,
+    };
+  },
+  // Every event is a partial GenerateContentResponse; the stream just ends
+  parseEvent(event) {
+    const { text, usage } = this.parse(JSON.parse(event.data));
+    return { text: text || undefined, usage };
+  },
+};
+
+export const PROTOCOLS: Record<string, ProtocolAdapter> = {
+  'openai-chat': openAiChat,
+  anthropic,
+  gemini,
+};
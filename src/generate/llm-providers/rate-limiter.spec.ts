@@ -0,0 +1,85 @@
+import { HttpStatus } from '@nestjs/common';
+import { RetryAfterException } from '../exceptions/retry-after.exception';
+import { pauseUntil } from './llm-rate-limiter.service';
+import { RateLimiter } from './rate-limiter';
+
+describe('RateLimiter', () => {
+  beforeEach(() => jest.useFakeTimers({ now: 0 }));
+  afterEach(() => jest.useRealTimers());
+
+  it('allows a burst, then spaces requests at the sustained rate', async () => {
+    const limiter = new RateLimiter('test', { requestsPerMinute: 60, burst: 2 });
+    await limiter.acquire(10000);
+    await limiter.acquire(10000);
+
+    let granted = false;
+    const third = limiter.acquire(10000).then(() => (granted = true));
+    await jest.advanceTimersByTimeAsync(900);
+    expect(granted).toBe(false);
+    await jest.advanceTimersByTimeAsync(100);
+    await third;
+    expect(granted).toBe(true);
+  });
+
+  it('caps concurrent requests until one is released', async () => {
+    const limiter = new RateLimiter('test', { maxInFlight: 1 });
+    const release = await limiter.acquire(10000);
+
+    let granted = false;
+    const second = limiter.acquire(10000).then(() => (granted = true));
+    await jest.advanceTimersByTimeAsync(1000);
+    expect(granted).toBe(false);
+    expect(limiter.stats()).toMatchObject({ inFlight: 1, queued: 1 });
+
+    release();
+    await second;
+    expect(limiter.stats()).toMatchObject({ inFlight: 1, queued: 0 });
+  });
+
+  it('rejects with 429 and Retry-After when the deadline passes', async () => {
+    const limiter = new RateLimiter('test', { requestsPerMinute: 6 });
+    await limiter.acquire(1000);
+
+    const waiting = limiter.acquire(1000).catch((e: RetryAfterException) => e);
+    await jest.advanceTimersByTimeAsync(1000);
+    const error = (await waiting) as RetryAfterException;
+    expect(error).toBeInstanceOf(RetryAfterException);
+    expect(error.getStatus()).toBe(HttpStatus.TOO_MANY_REQUESTS);
+    expect(error.retryAfterSeconds).toBeGreaterThanOrEqual(1);
+    expect(limiter.stats().queued).toBe(0);
+  });
+
+  it('holds requests while paused by the upstream', async () => {
+    const limiter = new RateLimiter('test', {});
+    limiter.pause(5000);
+
+    let granted = false;
+    const waiting = limiter.acquire(10000).then(() => (granted = true));
+    await jest.advanceTimersByTimeAsync(4900);
+    expect(granted).toBe(false);
+    await jest.advanceTimersByTimeAsync(100);
+    await waiting;
+    expect(granted).toBe(true);
+  });
+});
+
+describe('pauseUntil', () => {
+  it('reads Retry-After on 429 responses', () => {
+    expect(pauseUntil({ 'retry-after': '3' }, 429, 1000)).toBe(4000);
+    expect(pauseUntil({ 'retry-after': '3' }, 200, 1000)).toBeNull();
+  });
+
+  it('pauses until the reset of an exhausted window', () => {
+    expect(
+      pauseUntil({ 'x-ratelimit-remaining': '0', 'x-ratelimit-reset': '1700000000000' }, 200, 0),
+    ).toBe(1700000000000);
+    expect(
+      pauseUntil(
+        { 'x-ratelimit-remaining-requests': '0', 'x-ratelimit-reset-requests': '1m30s' },
+        200,
+        0,
+      ),
+    ).toBe(90000);
+    expect(pauseUntil({ 'x-ratelimit-remaining': '5' }, 200, 0)).toBeNull();
+  });
+});
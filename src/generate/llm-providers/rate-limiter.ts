@@ -0,0 +1,162 @@
+import { HttpStatus } from '@nestjs/common';
+import { RetryAfterException } from '../exceptions/retry-after.exception';
+
+export interface RateLimit {
+  // Sustained rate; unset means no rate limit
+  requestsPerMinute?: number;
+  // Requests allowed back to back before the rate applies (default: 1)
+  burst?: number;
+  // Concurrent requests; unset means unlimited
+  maxInFlight?: number;
+}
+
+interface Waiter {
+  grant: () => void;
+}
+
+/**
+ * Token bucket plus a cap on concurrent requests, with a FIFO queue.
+ * Callers wait their turn up to a deadline; pause() holds everyone back
+ * when the upstream says so (Retry-After, exhausted rate-limit headers).
+ */
+export class RateLimiter {
+  private readonly capacity: number;
+  private readonly refillPerMs: number;
+  private readonly maxInFlight: number;
+
+  private tokens: number;
+  private refilledAt = Date.now();
+  private pausedUntil = 0;
+  private inFlight = 0;
+  private readonly queue: Waiter[] = [];
+  private timer?: NodeJS.Timeout;
+
+  constructor(
+    readonly name: string,
+    limit: RateLimit,
+    private readonly maxQueue = Infinity,
+  ) {
+    this.refillPerMs = limit.requestsPerMinute ? limit.requestsPerMinute / 60000 : Infinity;
+    this.capacity = Math.max(1, limit.burst ?? 1);
+    this.tokens = this.capacity;
+    this.maxInFlight = limit.maxInFlight ?? Infinity;
+  }
+
+  /**
+   * Resolves with a release function once a request may start. Rejects with
+   * a 429 RetryAfterException if the deadline passes or the queue is full.
+   */
+  acquire(deadlineMs: number, signal?: AbortSignal): Promise<() => void> {
+    if (signal?.aborted) {
+      return Promise.reject(signal.reason);
+    }
+    if (this.queue.length >= this.maxQueue) {
+      return Promise.reject(this.rejection('queue is full'));
+    }
+
+    return new Promise((resolve, reject) => {
+      const cleanup = () => {
+        clearTimeout(deadline);
+        signal?.removeEventListener('abort', onAbort);
+        const index = this.queue.indexOf(waiter);
+        if (index !== -1) this.queue.splice(index, 1);
+      };
+      const onAbort = () => {
+        cleanup();
+        reject(signal!.reason ?? new Error('Aborted'));
+      };
+      const deadline = setTimeout(() => {
+        cleanup();
+        reject(this.rejection('timed out waiting for capacity'));
+      }, deadlineMs);
+      const waiter: Waiter = {
+        grant: () => {
+          cleanup();
+          resolve(this.releaser());
+        },
+      };
+
+      signal?.addEventListener('abort', onAbort, { once: true });
+      this.queue.push(waiter);
+      this.pump();
+    });
+  }
+
+  /** Holds every request back until the given time. */
+  pause(until: number) {
+    if (until <= this.pausedUntil) return;
+    this.pausedUntil = until;
+    // The upstream reset the window; do not burst straight back into it
+    this.tokens = Math.min(this.tokens, 1);
+    this.schedule(until - Date.now());
+  }
+
+  stats() {
+    this.refill();
+    return {
+      tokens: Number.isFinite(this.tokens) ? Math.floor(this.tokens) : null,
+      inFlight: this.inFlight,
+      queued: this.queue.length,
+      pausedForMs: Math.max(0, this.pausedUntil - Date.now()),
+    };
+  }
+
+  private releaser(): () => void {
+    let released = false;
+    return () => {
+      if (released) return;
+      released = true;
+      this.inFlight--;
+      this.pump();
+    };
+  }
+
+  private pump() {
+    while (this.queue.length) {
+      this.refill();
+      const now = Date.now();
+      if (now < this.pausedUntil) return this.schedule(this.pausedUntil - now);
+      if (this.inFlight >= this.maxInFlight) return;
+      if (this.tokens < 1) return this.schedule((1 - this.tokens) / this.refillPerMs);
+
+      this.tokens--;
+      this.inFlight++;
+      this.queue[0].grant();
+    }
+  }
+
+  private refill() {
+    const now = Date.now();
+    if (!Number.isFinite(this.refillPerMs)) {
+      this.tokens = now < this.pausedUntil ? 0 : this.capacity;
+      this.refilledAt = now;
+      return;
+    }
+    this.tokens = Math.min(
+      this.capacity,
+      this.tokens + (now - this.refilledAt) * this.refillPerMs,
+    );
+    this.refilledAt = now;
+  }
+
+  private schedule(delayMs: number) {
+    if (this.timer) return;
+    this.timer = setTimeout(() => {
+      this.timer = undefined;
+      this.pump();
+    }, Math.max(1, Math.ceil(delayMs)));
+    this.timer.unref?.();
+  }
+
+  private rejection(reason: string) {
+    const waitMs = Math.max(
+      this.pausedUntil - Date.now(),
+      Number.isFinite(this.refillPerMs) ? (this.queue.length + 1) / this.refillPerMs : 0,
+    );
+    return new RetryAfterException(
+      `Rate limit for ${this.name}: ${reason}`,
+      HttpStatus.TOO_MANY_REQUESTS,
+      Math.max(1, Math.ceil(waitMs / 1000)),
+    );
+  }
+}
@@ -0,0 +1,45 @@
+import { readSse } from './sse';
+
+async function collect(chunks: string[]) {
+  const events: unknown[] = [];
+  for await (const event of readSse(chunks.map((chunk) => Buffer.from(chunk)))) {
+    events.push(event);
+  }
+  return events;
+}
+
+describe('readSse', () => {
+  it('reassembles events split across chunks', async () => {
+    const events = await collect([
+      ': OPENROUTER PROCESSING\n\n',
+      'event: content_block_delta\nda',
+      'ta: {"a":1}\r\n\r\ndata: line 1\ndata: line 2\n',
+      '\ndata: [DONE]',
+    ]);
+
+    expect(events).toEqual([
+      { event: 'content_block_delta', data: '{"a":1}' },
+      { event: undefined, data: 'line 1\nline 2' },
+      { event: undefined, data: '[DONE]' },
+    ]);
+  });
+
+  it('splits a large chunk holding many events', async () => {
+    const chunk = Array.from({ length: 20000 }, (_, i) => `data: ${i}\r\n\r\n`).join('');
+
+    const events = await collect([chunk]);
+
+    expect(events).toHaveLength(20000);
+    expect(events[0]).toEqual({ event: undefined, data: '0' });
+    expect(events[19999]).toEqual({ event: undefined, data: '19999' });
+  });
+
+  it('keeps multi-byte characters cut between chunks', async () => {
+    const bytes = Buffer.from('data: héllo\n\n');
+    const chunks = [bytes.subarray(0, 8), bytes.subarray(8)];
+    const events: unknown[] = [];
+    for await (const event of readSse(chunks)) events.push(event);
+
+    expect(events).toEqual([{ event: undefined, data: 'héllo' }]);
+  });
+});
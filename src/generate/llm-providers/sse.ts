@@ -0,0 +1,59 @@
+export interface SseEvent {
+  event?: string;
+  data: string;
+}
+
+/**
+ * Decodes a text/event-stream body into events. Comment lines (": ...",
+ * which OpenRouter sends as keep-alives) and ids/retry hints are skipped.
+ */
+export async function* readSse(
+  body: AsyncIterable<Buffer | string>,
+): AsyncGenerator<SseEvent> {
+  const decoder = new TextDecoder();
+  let buffer = '';
+  let event: string | undefined;
+  let data: string[] = [];
+
+  // Scans from an offset and keeps the unfinished tail once per chunk,
+  // rather than re-slicing the buffer after every line
+  const lines = function* (text: string) {
+    buffer += text;
+    let start = 0;
+    let newline: number;
+    while ((newline = buffer.indexOf('\n', start)) !== -1) {
+      const end = newline > start && buffer[newline - 1] === '\r' ? newline - 1 : newline;
+      yield buffer.slice(start, end);
+      start = newline + 1;
+    }
+    buffer = buffer.slice(start);
+  };
+
+  const flush = (): SseEvent | undefined => {
+    const complete = data.length ? { event, data: data.join('\n') } : undefined;
+    event = undefined;
+    data = [];
+    return complete;
+  };
+
+  for await (const chunk of body) {
+    const text =
+      typeof chunk === 'string' ? chunk : decoder.decode(chunk, { stream: true });
+    for (const line of lines(text)) {
+      if (line === '') {
+        const complete = flush();
+        if (complete) yield complete;
+      } else if (line.startsWith('data:')) {
+        data.push(line.slice(line[5] === ' ' ? 6 : 5));
+      } else if (line.startsWith('event:')) {
+        event = line.slice(6).trim();
+      }
+    }
+  }
+  // A stream may end without the final blank line
+  for (const line of lines(decoder.decode() + '\n')) {
+    if (line.startsWith('data:')) data.push(line.slice(line[5] === ' ' ? 6 : 5));
+  }
+  const complete = flush();
+  if (complete) yield complete;
+}
@@ -0,0 +1,72 @@
+import { Injectable } from '@nestjs/common';
+
+const MAX_SAMPLES = 1024;
+
+interface Timing {
+  count: number;
+  sum: number;
+  max: number;
+  // Ring buffer of the most recent samples, used for percentiles
+  samples: number[];
+  next: number;
+}
+
+/**
+ * In-process counters and timings, exposed on GET /generate/metrics.
+ */
+@Injectable()
+export class MetricsService {
+  private readonly counters = new Map<string, number>();
+  private readonly timings = new Map<string, Timing>();
+
+  increment(name: string, by = 1) {
+    this.counters.set(name, (this.counters.get(name) ?? 0) + by);
+  }
+
+  observe(name: string, value: number) {
+    let timing = this.timings.get(name);
+    if (!timing) {
+      timing = { count: 0, sum: 0, max: 0, samples: [], next: 0 };
+      this.timings.set(name, timing);
+    }
+    timing.count++;
+    timing.sum += value;
+    timing.max = Math.max(timing.max, value);
+    if (timing.samples.length < MAX_SAMPLES) {
+      timing.samples.push(value);
+    } else {
+      timing.samples[timing.next] = value;
+      timing.next = (timing.next + 1) % MAX_SAMPLES;
+    }
+  }
+
+  count(name: string): number {
+    return this.counters.get(name) ?? 0;
+  }
+
+  percentile(name: string, p: number): number | undefined {
+    const timing = this.timings.get(name);
+    if (!timing || timing.samples.length === 0) return undefined;
+    const sorted = [...timing.samples].sort((a, b) => a - b);
+    const index = Math.min(sorted.length - 1, Math.ceil((p / 100) * sorted.length) - 1);
+    return sorted[Math.max(0, index)];
+  }
+
+  snapshot() {
+    const timings: Record<string, Record<string, number | undefined>> = {};
+    for (const [name, timing] of this.timings) {
+      timings[name] = {
+        count: timing.count,
+        mean: timing.sum / timing.count,
+        p50: this.percentile(name, 50),
+        p90: this.percentile(name, 90),
+        p99: this.percentile(name, 99),
+        max: timing.max,
+      };
+    }
+    return {
+      counters: Object.fromEntries(this.counters),
+      timings,
+    };
+  }
+}
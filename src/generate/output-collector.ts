@@ -0,0 +1,37 @@
+export type OutputStream = 'stdout' | 'stderr';
+
+/**
+ * Accumulates script output up to a byte budget shared by stdout and
+ * stderr, forwarding every accepted chunk as it arrives.
+ */
+export class OutputCollector {
+  readonly output: Record<OutputStream, string> = { stdout: '', stderr: '' };
+  truncated = false;
+  private bytes = 0;
+
+  constructor(
+    private readonly maxBytes: number,
+    private readonly onChunk?: (stream: OutputStream, chunk: string) => void,
+  ) {}
+
+  push(stream: OutputStream, chunk: string) {
+    if (this.truncated || !chunk) return;
+
+    let size = Buffer.byteLength(chunk);
+    if (this.bytes + size > this.maxBytes) {
+      chunk = truncateUtf8(chunk, this.maxBytes - this.bytes);
+      size = Buffer.byteLength(chunk);
+      this.truncated = true;
+    }
+    this.bytes += size;
+    this.output[stream] += chunk;
+    if (chunk) this.onChunk?.(stream, chunk);
+  }
+}
+
+export function truncateUtf8(text: string, maxBytes: number): string {
+  const buffer = Buffer.from(text, 'utf-8');
+  if (buffer.length <= maxBytes) return text;
+  // Drop a multi-byte character cut in half by the limit
+  return buffer.subarray(0, Math.max(0, maxBytes)).toString('utf-8').replace(/�$/, '');
+}
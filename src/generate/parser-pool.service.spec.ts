@@ -0,0 +1,77 @@
+import * as fs from 'fs';
+import * as os from 'os';
+import * as path from 'path';
+import { MetricsService } from './metrics.service';
+import { ParserPoolService } from './parser-pool.service';
+import { ParserService } from './parser.service';
+
+describe('ParserPoolService', () => {
+  const text = '| a | b |\n|---|---|\n| 1 | 2 |\n\n```python\nprint(1)\n```\n';
+  let metrics: MetricsService;
+  let pool: ParserPoolService;
+
+  beforeEach(() => {
+    metrics = new MetricsService();
+    pool = new ParserPoolService(new ParserService(), metrics);
+  });
+
+  afterEach(() => pool.onApplicationShutdown());
+
+  it('parses small responses inline, as ParserService does', async () => {
+    expect(await pool.parse(text, 'm')).toEqual(new ParserService().parse(text, 'm'));
+    expect(metrics.count('parser.inline')).toBe(1);
+    expect(metrics.percentile('parser.blocked_ms', 50)).toBeGreaterThanOrEqual(0);
+  });
+
+  it('parses inline when the worker script is not built', async () => {
+    // Running from TypeScript sources, parser-worker.js does not exist
+    const large = text.repeat(30000);
+    expect((await pool.parse(large, 'm')).tables).toHaveLength(30000);
+    expect(metrics.count('parser.offloaded')).toBe(0);
+    expect(pool.stats()).toMatchObject({ workers: 0, threshold: null });
+  });
+
+  describe('with worker threads', () => {
+    const env = { ...process.env };
+    let fixtureDir: string;
+
+    beforeEach(async () => {
+      await pool.onApplicationShutdown();
+      // Stands in for the compiled parser-worker.js: loads the TypeScript source through ts-node
+      fixtureDir = fs.mkdtempSync(path.join(os.tmpdir(), 'parser-worker-'));
+      const script = path.join(fixtureDir, 'parser-worker.js');
+      fs.writeFileSync(
+        script,
+        [
+          `require(${JSON.stringify(require.resolve('ts-node'))}).register({`,
+          `  transpileOnly: true,`,
+          `  compilerOptions: { module: 'commonjs', moduleResolution: 'node' },`,
+          `});`,
+          `require(${JSON.stringify(path.join(__dirname, 'parser-worker.ts'))});`,
+        ].join('\n'),
+      );
+      process.env.PARSER_WORKER_SCRIPT = script;
+      process.env.PARSER_WORKER_THRESHOLD = '1';
+      pool = new ParserPoolService(new ParserService(), metrics);
+    });
+
+    afterEach(() => {
+      process.env = { ...env };
+      fs.rmSync(fixtureDir, { recursive: true, force: true });
+    });
+
+    it('offloads parsing and returns what ParserService would', async () => {
+      const texts = [text, text.repeat(500), '```json\n{"x": [1, 2], "y": [3, 4]}\n```\nDone.'];
+
+      const responses = await Promise.all(texts.map((input) => pool.parse(input, 'm')));
+
+      texts.forEach((input, i) => {
+        expect(responses[i]).toEqual(new ParserService().parse(input, 'm'));
+      });
+      expect(metrics.count('parser.offloaded')).toBe(texts.length);
+      expect(metrics.count('parser.inline')).toBe(0);
+      expect(metrics.percentile('parser.worker_ms', 50)).toBeGreaterThanOrEqual(0);
+      expect(pool.stats()).toMatchObject({ workers: 2, busy: 0, queued: 0, threshold: 1 });
+    }, 30000);
+  });
+});
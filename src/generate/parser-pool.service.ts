@@ -0,0 +1,158 @@
+import { Injectable, Logger, OnApplicationShutdown } from '@nestjs/common';
+import * as fs from 'fs';
+import * as path from 'path';
+import { monitorEventLoopDelay } from 'perf_hooks';
+import { Worker } from 'worker_threads';
+import { GenerateResponseDto } from './dto/generate-response.dto';
+import { ParseReply, ParseRequest } from './interfaces/parser-worker.interface';
+import { MetricsService } from './metrics.service';
+import { ParserService } from './parser.service';
+
+// Compiled next to this file; absent when running from TypeScript sources
+const WORKER_SCRIPT = path.join(__dirname, 'parser-worker.js');
+
+interface ParseTask extends ParseRequest {
+  resolve: (response: GenerateResponseDto) => void;
+  reject: (error: Error) => void;
+}
+
+interface ParserWorker {
+  worker: Worker;
+  task?: ParseTask;
+}
+
+/**
+ * Parses model responses without stalling the event loop: responses of at
+ * least PARSER_WORKER_THRESHOLD characters go to a pool of PARSER_WORKERS
+ * threads (0 disables it), smaller ones are parsed inline. Workers send
+ * the result back as a transferred JSON buffer, so the main thread only
+ * pays for JSON.parse. parser.blocked_ms records how long each parse held
+ * the event loop either way.
+ */
+@Injectable()
+export class ParserPoolService implements OnApplicationShutdown {
+  private readonly logger = new Logger(ParserPoolService.name);
+
+  private readonly size = Number(process.env.PARSER_WORKERS ?? 2);
+  private readonly threshold =
+    Number(process.env.PARSER_WORKER_THRESHOLD) || 256 * 1024;
+  // Overridable for bundled builds, where the worker is emitted elsewhere
+  private readonly script = process.env.PARSER_WORKER_SCRIPT || WORKER_SCRIPT;
+  private readonly available = this.size > 0 && fs.existsSync(this.script);
+
+  private readonly workers: ParserWorker[] = [];
+  private readonly queue: ParseTask[] = [];
+  private nextId = 0;
+
+  private readonly decoder = new TextDecoder();
+  private readonly loopDelay = monitorEventLoopDelay({ resolution: 10 });
+
+  constructor(
+    private readonly parser: ParserService,
+    private readonly metrics: MetricsService,
+  ) {
+    this.loopDelay.enable();
+  }
+
+  async parse(text: string, label: string): Promise<GenerateResponseDto> {
+    if (!this.available || text.length < this.threshold) {
+      return this.parseInline(text, label);
+    }
+    try {
+      return await this.offload(text, label);
+    } catch (error) {
+      this.logger.warn(`Parser worker failed, parsing inline: ${error.message}`);
+      return this.parseInline(text, label);
+    }
+  }
+
+  stats() {
+    const ms = (ns: number) => Math.round(ns / 1e4) / 100;
+    return {
+      workers: this.workers.length,
+      busy: this.workers.filter((entry) => entry.task).length,
+      queued: this.queue.length,
+      threshold: this.available ? this.threshold : null,
+      // Delay of the whole event loop since startup, whatever caused it
+      eventLoopDelayMs: {
+        p50: ms(this.loopDelay.percentile(50)),
+        p99: ms(this.loopDelay.percentile(99)),
+        max: ms(this.loopDelay.max),
+      },
+    };
+  }
+
+  async onApplicationShutdown() {
+    this.loopDelay.disable();
+    await Promise.all(this.workers.map((entry) => entry.worker.terminate()));
+  }
+
+  private parseInline(text: string, label: string): GenerateResponseDto {
+    const started = performance.now();
+    const response = this.parser.parse(text, label);
+    this.metrics.observe('parser.blocked_ms', performance.now() - started);
+    this.metrics.increment('parser.inline');
+    return response;
+  }
+
+  private offload(text: string, label: string): Promise<GenerateResponseDto> {
+    return new Promise((resolve, reject) => {
+      this.queue.push({ id: this.nextId++, text, label, resolve, reject });
+      this.dispatch();
+    });
+  }
+
+  private dispatch() {
+    while (this.queue.length) {
+      let entry = this.workers.find((candidate) => !candidate.task);
+      if (!entry && this.workers.length < this.size) entry = this.spawn();
+      if (!entry) return;
+
+      const task = this.queue.shift()!;
+      entry.task = task;
+      const request: ParseRequest = { id: task.id, text: task.text, label: task.label };
+      entry.worker.postMessage(request);
+    }
+  }
+
+  private spawn(): ParserWorker {
+    const entry: ParserWorker = { worker: new Worker(this.script) };
+    // Idle parser threads should not keep the process alive
+    entry.worker.unref();
+    entry.worker.on('message', (reply: ParseReply) => this.settle(entry, reply));
+    entry.worker.on('error', (error) => this.discard(entry, error));
+    entry.worker.on('exit', (code) =>
+      this.discard(entry, new Error(`Parser worker exited with code ${code}`)),
+    );
+    this.workers.push(entry);
+    return entry;
+  }
+
+  private settle(entry: ParserWorker, reply: ParseReply) {
+    const task = entry.task;
+    entry.task = undefined;
+    if (task?.id === reply.id) {
+      if ('error' in reply) {
+        task.reject(new Error(reply.error));
+      } else {
+        const started = performance.now();
+        const response = JSON.parse(this.decoder.decode(reply.json));
+        this.metrics.observe('parser.blocked_ms', performance.now() - started);
+        this.metrics.observe('parser.worker_ms', reply.parseMs);
+        this.metrics.increment('parser.offloaded');
+        task.resolve(response);
+      }
+    }
+    this.dispatch();
+  }
+
+  // A crashed or terminated worker is dropped; dispatch() starts a new one on demand
+  private discard(entry: ParserWorker, error: Error) {
+    const index = this.workers.indexOf(entry);
+    if (index !== -1) this.workers.splice(index, 1);
+    const task = entry.task;
+    entry.task = undefined;
+    task?.reject(error);
+    this.dispatch();
+  }
+}
@@ -0,0 +1,19 @@
+import { parentPort } from 'worker_threads';
+import { ParseReply, ParseRequest } from './interfaces/parser-worker.interface';
+import { ParserService } from './parser.service';
+
+// Entry point of the ParserPoolService threads
+const parser = new ParserService();
+const encoder = new TextEncoder();
+
+parentPort!.on('message', ({ id, text, label }: ParseRequest) => {
+  const started = performance.now();
+  let reply: ParseReply;
+  try {
+    const json = encoder.encode(JSON.stringify(parser.parse(text, label)));
+    reply = { id, json, parseMs: performance.now() - started };
+  } catch (error) {
+    reply = { id, error: error.message };
+  }
+  parentPort!.postMessage(reply, 'json' in reply ? [reply.json.buffer as ArrayBuffer] : []);
+});
@@ -0,0 +1,71 @@
+import { IncrementalParser } from './incremental-parser';
+import { ParserService } from './parser.service';
+
+// Generous for CI machines; a backtracking parser takes minutes on these inputs
+const BUDGET_MS = Number(process.env.PARSER_PERF_BUDGET_MS) || 2000;
+const MB = 1024 * 1024;
+
+function timed(run: () => void): number {
+  const started = performance.now();
+  run();
+  return performance.now() - started;
+}
+
+// Deterministic, so a failing input can be reproduced
+function fuzz(seed: number, length: number, alphabet: string[]): string {
+  let state = seed;
+  const parts: string[] = [];
+  for (let i = 0; i < length; i++) {
+    state = (state * 1103515245 + 12345) & 0x7fffffff;
+    parts.push(alphabet[state % alphabet.length]);
+  }
+  return parts.join('');
+}
+
+describe('ParserService on adversarial input', () => {
+  const parser = new ParserService();
+
+  const inputs: [string, string][] = [
+    ['one long pipe-heavy line', '|' + 'a|'.repeat(MB / 2)],
+    ['pipe-heavy line before a near-separator', '| x |' + ' |'.repeat(MB / 4) + '\n|' + '-'.repeat(MB / 2) + 'x'],
+    ['separator characters without closing pipe', '| a |\n|' + '-: |'.repeat(MB / 4) + '-'],
+    ['table headers that never get a separator', '| a | b | c |\n'.repeat(MB / 14)],
+    ['many small tables', '| a | b |\n|---|---|\n| 1 | 2 |\n\n'.repeat(MB / 28)],
+    ['a table with a huge number of rows', '| a | b |\n|---|---|\n' + '| 1 | 2 |\n'.repeat(MB / 10)],
+    ['a very wide header over many short rows', '|' + 'h|'.repeat(MB / 4) + '\n|-|\n' + '|1|\n'.repeat(MB / 8)],
+    ['fence openers on every line', '```python\n'.repeat(MB / 10)],
+    ['fence-like line with an invalid tag', '```' + ' a'.repeat(MB / 2) + '!'],
+    ['an unterminated fence', '```json\n' + '{"x": [1, '.repeat(MB / 10)],
+    ['unbalanced braces in the explanation', '{'.repeat(MB)],
+    ['fuzzed markdown', fuzz(1, MB, ['|', '-', ':', ' ', '\n', '`', '{', '}', 'a', '\r'])],
+    ['fuzzed table lines', fuzz(2, MB, ['|', '|', '-', ' ', ' ', '\n', 'x'])],
+  ];
+
+  it.each(inputs)('parses %s within the budget', (_, text) => {
+    expect(timed(() => parser.parse(text, 'm'))).toBeLessThan(BUDGET_MS);
+  });
+
+  it('streams a single long line in tiny chunks within the budget', () => {
+    const line = '| ' + 'a | '.repeat(MB / 16);
+    const elapsed = timed(() => {
+      const incremental = new IncrementalParser('m');
+      for (let i = 0; i < line.length; i += 2) {
+        incremental.push(line.slice(i, i + 2));
+      }
+      incremental.end();
+    });
+    expect(elapsed).toBeLessThan(BUDGET_MS);
+  });
+
+  it('scales linearly with input size', () => {
+    const block = '| a | b |\n| c |' + ' |'.repeat(50) + '\n```\n{\n';
+    const small = block.repeat(MB / block.length / 2);
+    const large = small.repeat(4);
+    // Best of several runs, to keep GC and JIT pauses out of the ratio
+    const best = (text: string) =>
+      Math.min(...Array.from({ length: 5 }, () => timed(() => parser.parse(text, 'm'))));
+
+    // 4x the input: ~4x the time when linear, ~16x when quadratic
+    expect(best(large) / best(small)).toBeLessThan(12);
+  });
+});
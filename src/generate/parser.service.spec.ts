@@ -0,0 +1,81 @@
+import { ParserService } from './parser.service';
+
+describe('ParserService', () => {
+  const parser = new ParserService();
+
+  it('splits a response into chart, tables, code and explanation', () => {
+    const text = [
+      'Dissolution results {batch 7}.',
+      '',
+      '```json',
+      '{"x": [0, 15], "y": ["0", 40]}',
+      '```',
+      '| Time | Release |',
+      '|------|---------|',
+      '| 15 | 40 |',
+      '',
+      '```python',
+      'print(1)',
+      '```',
+      '```python',
+      'print(2)',
+      '```',
+      'First-order kinetics.',
+    ].join('\n');
+
+    const chart = { x: [0, 15], y: [0, 40], label: 'llama' };
+    expect(parser.parse(text, 'llama')).toEqual({
+      chart,
+      charts: [chart],
+      tables: [
+        {
+          headers: ['Time', 'Release'],
+          rows: [['15', '40']],
+          columns: [
+            { name: 'Time', type: 'number', values: [15] },
+            { name: 'Release', type: 'number', values: [40] },
+          ],
+        },
+      ],
+      code: 'print(1)',
+      codeBlocks: [
+        { language: 'python', code: 'print(1)' },
+        { language: 'python', code: 'print(2)' },
+      ],
+      explanation: 'Dissolution results .\n\n\nFirst-order kinetics.',
+    });
+  });
+
+  it('keeps every chart, the last as chart, and never takes a chart fence as code', () => {
+    const text = '```json\n{"x": [1], "y": [2]}\n```\n```json\n{"x": [3], "y": [4], "label": "B"}\n```';
+    expect(parser.parse(text, 'm')).toMatchObject({
+      chart: { x: [3], y: [4], label: 'B' },
+      charts: [
+        { x: [1], y: [2], label: 'm' },
+        { x: [3], y: [4], label: 'B' },
+      ],
+      code: null,
+      codeBlocks: [],
+      explanation: '',
+    });
+  });
+
+  it('types table columns, keeping empty cells in place', () => {
+    const text = [
+      '| Batch | Release (%) | pH | Note |',
+      '|---|---|---|---|',
+      '| A | 40.5 | | ok |',
+      '| B | 1e2 | 6.8 | |',
+      '| C | -3 | 7 | 0x10 |',
+    ].join('\n');
+
+    const [table] = parser.parse(text, 'm').tables!;
+    expect(table.rows[0]).toEqual(['A', '40.5', 'ok']);
+    expect(table.columns).toEqual([
+      { name: 'Batch', type: 'string', values: ['A', 'B', 'C'] },
+      { name: 'Release (%)', type: 'number', values: [40.5, 100, -3] },
+      { name: 'pH', type: 'number', values: [null, 6.8, 7] },
+      { name: 'Note', type: 'string', values: ['ok', '', '0x10'] },
+    ]);
+  });
+});
@@ -1,73 +1,56 @@
 import { Injectable } from '@nestjs/common';
 import { GenerateResponseDto } from './dto/generate-response.dto';
+import { IncrementalParser } from './incremental-parser';
 
 @Injectable()
 export class ParserService {
+  /**
+   * Splits a model response into chart, tables, code and explanation in a
+   * single pass over its lines. charts and codeBlocks list every chart and
+   * Python block in order; chart and code keep the last chart and the first
+   * block for older clients. The explanation is whatever lies outside
+   * fenced blocks and tables.
+   */
   parse(text: string, label: string): GenerateResponseDto {
     const result: GenerateResponseDto = {
       chart: null,
+      charts: [],
       tables: [],
       code: null,
+      codeBlocks: [],
       explanation: null,
     };
 
-    let cleanText = text;
-
-    // --- JSON CHART ---
-    try {
-      const jsonMatches = text.match(/```json\s*([\s\S]*?)\s*```/g);
-      if (jsonMatches) {
-        jsonMatches.forEach((match) => {
-          try {
-            const jsonContent = match.replace(/```json\s*/, '').replace(/\s*```/, '');
-            const parsed = JSON.parse(jsonContent);
-            if (parsed.x && parsed.y) {
-              result.chart = {
-                x: parsed.x.map(Number),
-                y: parsed.y.map(Number),
-                label: parsed.label || label,
-              };
-              cleanText = cleanText.replace(match, '');
-            }
-          } catch {}
-        });
-      }
-    } catch {}
-
-    // --- TABLES ---
-    const tableRegex = /\|(.+\|)+\s*\n\s*\|[-:\s|]+\|\s*\n((?:\|.+\|\s*\n?)*)/g;
-    let match;
-    while ((match = tableRegex.exec(text)) !== null) {
-      const tableText = match[0];
-      const lines = tableText.trim().split('\n');
-      if (lines.length >= 3) {
-        const headers = lines[0].split('|').map((h) => h.trim()).filter(Boolean);
-        const rows = lines.slice(2).map((line) =>
-          line.split('|').map((c) => c.trim()).filter(Boolean),
-        );
-        (result.tables ??= []).push({ headers, rows });
-        cleanText = cleanText.replace(tableText, '');
+    const parser = new IncrementalParser(label);
+    for (const event of [...parser.push(text), ...parser.end()]) {
+      if (event.type === 'chart') {
+        result.chart = event.chart;
+        result.charts!.push(event.chart);
+      } else if (event.type === 'table') {
+        result.tables!.push(event.table);
+      } else {
+        result.code ??= event.code;
+        result.codeBlocks!.push({ language: event.language, code: event.code });
       }
     }
 
-    // --- CODE BLOCK ---
-    const codeMatches = text.match(/```(?:python|py)?\s*([\s\S]*?)\s*```/g);
-    if (codeMatches) {
-      const code = codeMatches[0]
-        .replace(/```(?:python|py)?\s*/, '')
-        .replace(/\s*```/, '')
-        .trim();
-      result.code = code;
-      cleanText = cleanText.replace(codeMatches[0], '');
-    }
-
-    // --- EXPLANATION ---
-    result.explanation = cleanText
-      .replace(/```[\s\S]*?```/g, '')
-      .replace(/\|(.+\|)+\s*\n\s*\|[-:\s|]+\|\s*\n((?:\|.+\|\s*\n?)*)/g, '')
-      .replace(/\{[\s\S]*?\}/g, '')
-      .trim();
-
+    result.explanation = stripBraces(parser.explanation()).trim();
     return result;
   }
 }
+
+// Drops {...} spans (stray JSON) from the explanation, as /\{[\s\S]*?\}/g
+// would, without rescanning the rest of the text for every unmatched brace
+function stripBraces(text: string): string {
+  const kept: string[] = [];
+  let start = 0;
+  let open: number;
+  while ((open = text.indexOf('{', start)) !== -1) {
+    const close = text.indexOf('}', open + 1);
+    if (close === -1) break;
+    kept.push(text.slice(start, open));
+    start = close + 1;
+  }
+  kept.push(text.slice(start));
+  return kept.join('');
+}
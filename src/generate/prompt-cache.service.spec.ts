@@ -0,0 +1,82 @@
+import * as fs from 'fs';
+import * as os from 'os';
+import * as path from 'path';
+import { MetricsService } from './metrics.service';
+import { normalizePrompt, PromptCacheService } from './prompt-cache.service';
+
+const RESPONSE = { chart: null, tables: [], code: 'print(1)', explanation: 'ok' };
+
+describe('PromptCacheService', () => {
+  const env = { ...process.env };
+  let cacheDir: string;
+
+  beforeEach(() => {
+    cacheDir = fs.mkdtempSync(path.join(os.tmpdir(), 'prompt-cache-'));
+  });
+
+  afterEach(() => {
+    process.env = { ...env };
+    fs.rmSync(cacheDir, { recursive: true, force: true });
+    jest.useRealTimers();
+  });
+
+  it('keys on model, normalized prompt and params', () => {
+    const cache = new PromptCacheService(new MetricsService());
+    const key = cache.keyFor('Claude', '  plot x vs\n x squared ');
+
+    expect(normalizePrompt('  plot x vs\n x squared ')).toBe('plot x vs x squared');
+    expect(cache.keyFor('claude', 'plot x vs x squared')).toBe(key);
+    expect(cache.keyFor('gemini', 'plot x vs x squared')).not.toBe(key);
+    expect(cache.keyFor('claude', 'plot x vs x squared', { maxTokens: 10 })).not.toBe(key);
+  });
+
+  it('evicts the least recently used entry', async () => {
+    process.env.PROMPT_CACHE_MAX_ENTRIES = '2';
+    const cache = new PromptCacheService(new MetricsService());
+
+    await cache.set('a', 'A', RESPONSE);
+    await cache.set('b', 'B', RESPONSE);
+    await cache.get('a');
+    await cache.set('c', 'C', RESPONSE);
+
+    expect(await cache.get('b')).toBeNull();
+    expect((await cache.get('a'))?.rawText).toBe('A');
+    expect((await cache.get('c'))?.rawText).toBe('C');
+  });
+
+  it('expires entries after the TTL', async () => {
+    process.env.PROMPT_CACHE_TTL_MS = '1000';
+    jest.useFakeTimers({ now: 0 });
+    const cache = new PromptCacheService(new MetricsService());
+
+    await cache.set('a', 'A', RESPONSE);
+    jest.setSystemTime(999);
+    expect(await cache.get('a')).not.toBeNull();
+    jest.setSystemTime(1000);
+    expect(await cache.get('a')).toBeNull();
+  });
+
+  it('serves entries from disk after a restart', async () => {
+    process.env.PROMPT_CACHE_DIR = cacheDir;
+    const first = new PromptCacheService(new MetricsService());
+    await first.onModuleInit();
+    await first.set('a', 'A', RESPONSE);
+
+    const metrics = new MetricsService();
+    const second = new PromptCacheService(metrics);
+    await second.onModuleInit();
+
+    expect(await second.get('a')).toMatchObject({ rawText: 'A', response: RESPONSE });
+    expect(metrics.count('prompt_cache.hit_disk')).toBe(1);
+  });
+
+  it('writes concurrent entries for one key without clashing', async () => {
+    process.env.PROMPT_CACHE_DIR = cacheDir;
+    const cache = new PromptCacheService(new MetricsService());
+    await cache.onModuleInit();
+
+    await Promise.all([cache.set('a', 'A', RESPONSE), cache.set('a', 'A', RESPONSE)]);
+
+    expect(fs.readdirSync(cacheDir)).toEqual(['a.json']);
+  });
+});
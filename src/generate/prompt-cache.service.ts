@@ -0,0 +1,199 @@
+import { Injectable, Logger, OnModuleInit } from '@nestjs/common';
+import { createHash, randomBytes } from 'crypto';
+import * as fs from 'fs/promises';
+import * as path from 'path';
+import { GenerateResponseDto } from './dto/generate-response.dto';
+import { MetricsService } from './metrics.service';
+
+// default: serve from cache | no-cache: always generate, then store | no-store: bypass entirely
+export type CacheControl = 'default' | 'no-cache' | 'no-store';
+
+// Staging files older than this were left by a crash, not by a write in progress
+const STALE_STAGING_MS = 60 * 60 * 1000;
+
+export interface CachedGeneration {
+  rawText: string;
+  response: GenerateResponseDto;
+  storedAt: number;
+}
+
+/**
+ * Cache of model responses keyed on (model, normalized prompt, generation
+ * params). Entries live in memory and, when PROMPT_CACHE_DIR is set, also
+ * on disk so they survive restarts; both tiers expire after
+ * PROMPT_CACHE_TTL_MS and evict least recently used entries first.
+ */
+@Injectable()
+export class PromptCacheService implements OnModuleInit {
+  private readonly logger = new Logger(PromptCacheService.name);
+
+  private readonly enabled = process.env.PROMPT_CACHE_ENABLED !== 'false';
+  private readonly ttlMs =
+    Number(process.env.PROMPT_CACHE_TTL_MS) || 24 * 60 * 60 * 1000;
+  private readonly maxEntries = Number(process.env.PROMPT_CACHE_MAX_ENTRIES) || 500;
+  private readonly cacheDir = process.env.PROMPT_CACHE_DIR || '';
+  private readonly maxDiskEntries =
+    Number(process.env.PROMPT_CACHE_DISK_MAX_ENTRIES) || 5000;
+
+  // Insertion order doubles as LRU order: oldest access first
+  private readonly memory = new Map<string, CachedGeneration>();
+  // Disk entries by key, with the time they were stored
+  private readonly disk = new Map<string, number>();
+
+  constructor(private readonly metrics: MetricsService) {}
+
+  async onModuleInit() {
+    if (!this.enabled || !this.cacheDir) return;
+    await fs.mkdir(this.cacheDir, { recursive: true });
+
+    const loaded: [string, number, number][] = [];
+    for (const name of await fs.readdir(this.cacheDir)) {
+      const file = path.join(this.cacheDir, name);
+      if (name.endsWith('.tmp')) {
+        await removeStaleStaging(file);
+        continue;
+      }
+      if (!name.endsWith('.json')) continue;
+      try {
+        const { rawText, storedAt } = JSON.parse(await fs.readFile(file, 'utf-8'));
+        if (typeof rawText !== 'string' || this.expired(storedAt)) throw new Error();
+        loaded.push([name.slice(0, -5), storedAt, (await fs.stat(file)).mtimeMs]);
+      } catch {
+        // Expired, or half-written before a crash
+        await fs.rm(file, { force: true });
+      }
+    }
+    // mtime is bumped on every hit, so it orders the entries by last use
+    loaded.sort((a, b) => a[2] - b[2]);
+    for (const [key, storedAt] of loaded) {
+      this.disk.set(key, storedAt);
+    }
+  }
+
+  keyFor(model: string, prompt: string, params: object = {}): string {
+    return createHash('sha256')
+      .update(JSON.stringify([model.toLowerCase(), normalizePrompt(prompt), params]))
+      .digest('hex');
+  }
+
+  async get(key: string): Promise<CachedGeneration | null> {
+    if (!this.enabled) return null;
+
+    const cached = this.memory.get(key);
+    if (cached && !this.expired(cached.storedAt)) {
+      this.memory.delete(key);
+      this.memory.set(key, cached);
+      this.metrics.increment('prompt_cache.hit');
+      return cached;
+    }
+    if (cached) this.memory.delete(key);
+
+    const fromDisk = await this.readDisk(key);
+    if (fromDisk) {
+      this.remember(key, fromDisk);
+      this.metrics.increment('prompt_cache.hit_disk');
+      return fromDisk;
+    }
+
+    this.metrics.increment('prompt_cache.miss');
+    return null;
+  }
+
+  async set(key: string, rawText: string, response: GenerateResponseDto) {
+    if (!this.enabled) return;
+    const entry: CachedGeneration = { rawText, response, storedAt: Date.now() };
+    this.remember(key, entry);
+    await this.writeDisk(key, entry);
+  }
+
+  stats() {
+    return {
+      enabled: this.enabled,
+      entries: this.memory.size,
+      diskEntries: this.disk.size,
+      hits: this.metrics.count('prompt_cache.hit'),
+      diskHits: this.metrics.count('prompt_cache.hit_disk'),
+      misses: this.metrics.count('prompt_cache.miss'),
+    };
+  }
+
+  private remember(key: string, entry: CachedGeneration) {
+    this.memory.delete(key);
+    this.memory.set(key, entry);
+    for (const oldest of this.memory.keys()) {
+      if (this.memory.size <= this.maxEntries) break;
+      this.memory.delete(oldest);
+      this.metrics.increment('prompt_cache.evicted');
+    }
+  }
+
+  private async readDisk(key: string): Promise<CachedGeneration | null> {
+    const storedAt = this.disk.get(key);
+    if (storedAt === undefined) return null;
+
+    const file = this.file(key);
+    if (this.expired(storedAt)) {
+      this.disk.delete(key);
+      await fs.rm(file, { force: true });
+      return null;
+    }
+    try {
+      const entry: CachedGeneration = JSON.parse(await fs.readFile(file, 'utf-8'));
+      this.disk.delete(key);
+      this.disk.set(key, storedAt);
+      const now = new Date();
+      await fs.utimes(file, now, now);
+      return entry;
+    } catch {
+      this.disk.delete(key);
+      return null;
+    }
+  }
+
+  private async writeDisk(key: string, entry: CachedGeneration) {
+    if (!this.cacheDir) return;
+    const file = this.file(key);
+    // Unique per write: identical prompts may finish at the same time
+    const staging = `${file}.${process.pid}.${randomBytes(4).toString('hex')}.tmp`;
+    try {
+      await fs.writeFile(staging, JSON.stringify(entry));
+      await fs.rename(staging, file);
+      this.disk.delete(key);
+      this.disk.set(key, entry.storedAt);
+    } catch (error) {
+      this.logger.warn(`Could not persist prompt cache entry ${key}: ${error.message}`);
+      await fs.rm(staging, { force: true });
+      return;
+    }
+
+    for (const oldest of this.disk.keys()) {
+      if (this.disk.size <= this.maxDiskEntries) break;
+      this.disk.delete(oldest);
+      await fs.rm(this.file(oldest), { force: true });
+    }
+  }
+
+  private file(key: string): string {
+    return path.join(this.cacheDir, `${key}.json`);
+  }
+
+  private expired(storedAt: number): boolean {
+    return !(Date.now() - storedAt < this.ttlMs);
+  }
+}
+
+/** Prompts differing only in whitespace or Unicode composition share an entry. */
+export function normalizePrompt(prompt: string): string {
+  return prompt.normalize('NFC').trim().replace(/\s+/g, ' ');
+}
+
+// Left by a crash mid-write; a younger one may belong to another process sharing the folder
+async function removeStaleStaging(file: string) {
+  try {
+    if (Date.now() - (await fs.stat(file)).mtimeMs > STALE_STAGING_MS) {
+      await fs.rm(file, { force: true });
+    }
+  } catch {
+    // Already renamed or removed
+  }
+}
@@ -1,42 +1,392 @@
-import { Injectable } from '@nestjs/common';
-import { exec } from 'child_process';
-import { promisify } from 'util';
-import * as fs from 'fs';
+import {
+  Injectable,
+  Logger,
+  NotFoundException,
+  OnModuleInit,
+} from '@nestjs/common';
+import { spawn } from 'child_process';
+import { randomBytes } from 'crypto';
+import * as fs from 'fs/promises';
 import * as path from 'path';
+import {
+  FigureDto,
+  PythonExecutionResultDto,
+  SeriesDto,
+  TableDto,
+} from './dto/python-execution-result.dto';
+import { PythonJob, PythonRunOutcome } from './interfaces/python-run.interface';
+import { PythonWorkerPoolService } from './python-worker-pool.service';
+import { PythonForkServerService } from './python-fork-server.service';
+import { PythonResultCacheService } from './python-result-cache.service';
+import { PythonLimitsService } from './python-limits.service';
+import { OutputCollector, OutputStream, truncateUtf8 } from './output-collector';
+import {
+  ExecutionSchedulerService,
+  ScheduledResult,
+} from './execution-scheduler.service';
 
-const execAsync = promisify(exec);
+const TEMP_DIR = path.join(__dirname, '../../temp');
+const LAUNCHER_SCRIPT = path.join(__dirname, 'python', 'launcher.py');
+const SCRIPT_NAME = 'script.py';
+// Written by the deepceutix runtime next to the script's outputs
+const MANIFEST_NAME = 'manifest.json';
+
+export interface ExecuteOptions {
+  jobId?: string;
+  onOutput?: (stream: OutputStream, chunk: string) => void;
+}
+
+export function createJobId(): string {
+  return `${Date.now()}-${randomBytes(4).toString('hex')}`;
+}
 
 @Injectable()
-export class PythonExecutorService {
-  
-  async execute(code: string) {
-    const tempDir = path.join(__dirname, '../../temp');
-    if (!fs.existsSync(tempDir)) {
-      fs.mkdirSync(tempDir, { recursive: true });
-    }
+export class PythonExecutorService implements OnModuleInit {
+  private readonly logger = new Logger(PythonExecutorService.name);
 
-    const fileName = `script_${Date.now()}.py`;
-    const filePath = path.join(tempDir, fileName);
+  // spawn | exec | pool | fork
+  private readonly mode = (process.env.PYTHON_EXECUTOR_MODE || 'spawn').toLowerCase();
+  // Only the legacy exec mode needs the script on disk
+  private readonly keepScripts =
+    this.mode === 'exec' || process.env.PYTHON_KEEP_SCRIPTS === 'true';
+  private readonly pythonBin = process.env.PYTHON_BIN || 'python';
+  private readonly timeoutMs = Number(process.env.PYTHON_TIMEOUT_MS) || 15000;
+  private readonly maxOutputBytes =
+    Number(process.env.PYTHON_OUTPUT_MAX_BYTES) || 1024 * 1024;
 
-    fs.writeFileSync(filePath, code, 'utf-8');
+  constructor(
+    private readonly pool: PythonWorkerPoolService,
+    private readonly forkServer: PythonForkServerService,
+    private readonly cache: PythonResultCacheService,
+    private readonly scheduler: ExecutionSchedulerService,
+    private readonly limits: PythonLimitsService,
+  ) {}
 
-    try {
-      const { stdout, stderr } = await execAsync(`python "${filePath}"`, {
-        timeout: 15000, 
+  onModuleInit() {
+    // Warm the interpreters at boot rather than on the first request
+    if (this.mode === 'pool') {
+      this.pool.start();
+    } else if (this.mode === 'fork') {
+      this.forkServer.start().catch((error) => {
+        this.logger.error(`Python fork server failed to start: ${error.message}`);
       });
+    }
+  }
+
+  async execute(
+    code: string,
+    options: ExecuteOptions = {},
+  ): Promise<PythonExecutionResultDto> {
+    const jobId = options.jobId ?? createJobId();
+    const jobDir = path.join(TEMP_DIR, jobId);
+    await fs.mkdir(jobDir, { recursive: true });
 
+    const scriptPath = path.join(jobDir, SCRIPT_NAME);
+    if (this.keepScripts) {
+      await fs.writeFile(scriptPath, code, 'utf-8');
+    }
+    const filePath = this.keepScripts ? scriptPath : undefined;
+
+    const cacheKey = await this.cache.keyFor(code);
+    const cached = cacheKey && (await this.cache.restore(cacheKey, code, jobDir));
+    if (cached) {
       return {
         success: true,
-        stdout: stdout.trim(),
-        stderr: stderr.trim() || null,
+        jobId,
+        status: 'completed',
+        stdout: cached.stdout,
+        stderr: cached.stderr || null,
         filePath,
+        artifacts: cached.artifacts,
+        ...(await this.readManifest(jobId, jobDir)),
+        cached: true,
       };
+    }
+
+    const job: PythonJob = {
+      id: jobId,
+      code,
+      filename: scriptPath,
+      cwd: jobDir,
+      timeoutMs: this.timeoutMs,
+      limits: this.limits.limits,
+      maxOutputBytes: this.maxOutputBytes,
+      onOutput: options.onOutput,
+    };
+
+    let scheduled: ScheduledResult<PythonRunOutcome>;
+    try {
+      scheduled = await this.scheduler.schedule(() => this.run(job));
     } catch (error) {
+      // Turned away before running; the job folder is of no use
+      await fs.rm(jobDir, { recursive: true, force: true });
+      throw error;
+    }
+    const { value: outcome, queueMs, runMs } = scheduled;
+    const timings = { queueMs, runMs };
+    const status = this.limits.classify(outcome, outcome.oomKilled);
+
+    if (outcome.exitCode !== 0) {
       return {
         success: false,
+        jobId,
+        status,
+        error: truncateUtf8(
+          outcome.error ||
+            outcome.stderr.trim() ||
+            `Script exited with code ${outcome.exitCode}`,
+          this.maxOutputBytes,
+        ),
+        timings,
+      };
+    }
+
+    // Every mode caps output where it is read, with one budget for both
+    // streams; this only guards against a runner that did not
+    const stdout = truncateUtf8(outcome.stdout, this.maxOutputBytes);
+    const stderr = truncateUtf8(outcome.stderr, this.maxOutputBytes);
+    const truncated =
+      outcome.truncated || stdout !== outcome.stdout || stderr !== outcome.stderr;
+
+    const result = {
+      stdout: stdout.trim(),
+      stderr: stderr.trim(),
+      artifacts: outcome.artifacts ?? (await this.listArtifacts(jobDir)),
+    };
+    if (cacheKey && !truncated) {
+      await this.cache.store(cacheKey, code, jobDir, result);
+    }
+
+    return {
+      success: true,
+      jobId,
+      status,
+      stdout: result.stdout,
+      stderr: result.stderr || null,
+      filePath,
+      artifacts: result.artifacts,
+      ...(await this.readManifest(jobId, jobDir)),
+      cached: false,
+      truncated,
+      timings,
+    };
+  }
+
+  stats() {
+    return {
+      mode: this.mode,
+      scheduler: this.scheduler.stats(),
+      cache: this.cache.stats(),
+    };
+  }
+
+  private async run(job: PythonJob): Promise<PythonRunOutcome> {
+    // A long-lived worker cannot leave a cgroup again, so pool mode relies on rlimits
+    const cgroup =
+      this.mode === 'pool' ? null : await this.limits.createCgroup(job.id);
+
+    let outcome: PythonRunOutcome;
+    try {
+      switch (this.mode) {
+        case 'pool':
+          outcome = await this.pool.run(job);
+          break;
+        case 'fork':
+          outcome = await this.forkServer.run({ ...job, cgroup });
+          break;
+        case 'exec':
+          outcome = await this.runProcess(
+            { ...job, cgroup },
+            `${this.pythonBin} "${LAUNCHER_SCRIPT}" "${job.filename}"`,
+            [],
+          );
+          break;
+        default:
+          // Interpreter started directly, code fed over stdin: no shell, no script file
+          outcome = await this.runProcess(
+            { ...job, cgroup },
+            this.pythonBin,
+            [LAUNCHER_SCRIPT, '-', job.filename],
+            job.code,
+          );
+      }
+    } catch (error) {
+      outcome = {
+        exitCode: null,
+        stdout: '',
+        stderr: '',
+        timedOut: false,
         error: error.message,
       };
-    } finally {
     }
+
+    const { oomKilled } = await this.limits.releaseCgroup(cgroup);
+    return { ...outcome, oomKilled };
+  }
+
+  /**
+   * Runs one interpreter process. With no args the command goes through a
+   * shell (legacy exec mode); with stdin the code is piped in.
+   */
+  private runProcess(
+    job: PythonJob,
+    command: string,
+    args: string[],
+    stdin?: string,
+  ): Promise<PythonRunOutcome> {
+    const collector = new OutputCollector(this.maxOutputBytes, job.onOutput);
+    const shell = args.length === 0;
+
+    return new Promise((resolve) => {
+      const child = spawn(command, args, {
+        shell,
+        cwd: job.cwd,
+        // Own process group, so a timeout kills the shell and the interpreter
+        detached: process.platform !== 'win32',
+        env: {
+          ...process.env,
+          DEEPCEUTIX_LIMITS: JSON.stringify(job.limits ?? {}),
+          DEEPCEUTIX_CGROUP: job.cgroup ?? '',
+        },
+      });
+
+      let timedOut = false;
+      const timer = setTimeout(() => {
+        timedOut = true;
+        killProcessGroup(child.pid);
+      }, job.timeoutMs);
+
+      // EPIPE if the interpreter dies early; 'close' reports why
+      child.stdin.on('error', () => undefined);
+      child.stdin.end(stdin ?? '', 'utf-8');
+
+      child.stdout.setEncoding('utf-8').on('data', (chunk: string) => {
+        collector.push('stdout', chunk);
+      });
+      child.stderr.setEncoding('utf-8').on('data', (chunk: string) => {
+        collector.push('stderr', chunk);
+      });
+
+      child.on('error', (error) => {
+        clearTimeout(timer);
+        resolve({
+          exitCode: null,
+          stdout: '',
+          stderr: '',
+          timedOut: false,
+          error: error.message,
+        });
+      });
+
+      child.on('close', (exitCode, signal) => {
+        clearTimeout(timer);
+        const { stdout, stderr } = collector.output;
+        resolve({
+          exitCode,
+          signal,
+          stdout,
+          stderr,
+          timedOut,
+          truncated: collector.truncated,
+          error: timedOut
+            ? `Script timed out after ${job.timeoutMs}ms`
+            : exitCode === 0
+              ? undefined
+              : `Command failed: ${[command, ...args].join(' ')}\n${stderr}`,
+        });
+      });
+    });
+  }
+
+  /** Figures and registered data of a finished job. */
+  async manifest(jobId: string) {
+    const jobDir = this.jobDir(jobId);
+    if (!(await exists(jobDir))) {
+      throw new NotFoundException(`Unknown job: ${jobId}`);
+    }
+    return { jobId, ...(await this.readManifest(jobId, jobDir)) };
+  }
+
+  /** Absolute path of one file in a job folder, for download. */
+  async artifactPath(jobId: string, name: string): Promise<string> {
+    const file = path.join(this.jobDir(jobId), safeName(name));
+    if (!(await exists(file))) {
+      throw new NotFoundException(`Unknown artifact: ${jobId}/${name}`);
+    }
+    return file;
+  }
+
+  private jobDir(jobId: string): string {
+    return path.join(TEMP_DIR, safeName(jobId));
+  }
+
+  /** Figures and registered data, as described by the deepceutix runtime. */
+  private async readManifest(
+    jobId: string,
+    jobDir: string,
+  ): Promise<Pick<PythonExecutionResultDto, 'figures' | 'series' | 'tables'>> {
+    let manifest: {
+      figures?: Omit<FigureDto, 'url'>[];
+      series?: (Omit<SeriesDto, 'url'> & { file: string })[];
+      tables?: (Omit<TableDto, 'url'> & { file: string })[];
+    };
+    try {
+      manifest = JSON.parse(
+        await fs.readFile(path.join(jobDir, MANIFEST_NAME), 'utf-8'),
+      );
+    } catch (error) {
+      // Missing when the script died before the runtime could write it
+      if (error.code !== 'ENOENT') {
+        this.logger.warn(`Unreadable manifest for job ${jobId}: ${error.message}`);
+      }
+      return { figures: [], series: [], tables: [] };
+    }
+
+    const url = (name: string) => `/generate/artifacts/${jobId}/${name}`;
+    return {
+      figures: (manifest.figures ?? []).map((figure) => ({
+        ...figure,
+        url: url(figure.name),
+      })),
+      series: (manifest.series ?? []).map(({ file, ...series }) => ({
+        ...series,
+        url: url(file),
+      })),
+      tables: (manifest.tables ?? []).map(({ file, ...table }) => ({
+        ...table,
+        url: url(file),
+      })),
+    };
+  }
+
+  private async listArtifacts(jobDir: string): Promise<string[]> {
+    return (await fs.readdir(jobDir, { withFileTypes: true }))
+      .filter((entry) => entry.isFile() && entry.name !== SCRIPT_NAME)
+      .map((entry) => entry.name)
+      .sort();
+  }
+}
+
+// Job ids and artifact names are plain file names; anything else could escape TEMP_DIR
+function safeName(name: string): string {
+  if (!/^[\w.-]+$/.test(name) || name.startsWith('.')) {
+    throw new NotFoundException(`Invalid name: ${name}`);
+  }
+  return name;
+}
+
+async function exists(file: string): Promise<boolean> {
+  return fs.stat(file).then(
+    () => true,
+    () => false,
+  );
+}
+
+function killProcessGroup(pid: number | undefined) {
+  if (pid === undefined) return;
+  try {
+    process.kill(process.platform === 'win32' ? pid : -pid, 'SIGKILL');
+  } catch {
+    // Already gone
   }
 }
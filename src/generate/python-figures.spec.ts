@@ -0,0 +1,80 @@
+import { spawnSync } from 'child_process';
+import * as fs from 'fs';
+import * as os from 'os';
+import * as path from 'path';
+
+const LAUNCHER_SCRIPT = path.join(__dirname, 'python', 'launcher.py');
+const pythonBin = process.env.PYTHON_BIN || 'python';
+
+// Runs the deepceutix runtime as spawn mode does; needs Python with matplotlib
+const hasMatplotlib =
+  spawnSync(pythonBin, ['-c', 'import matplotlib'], { stdio: 'ignore' }).status === 0;
+const describeWithMatplotlib = hasMatplotlib ? describe : describe.skip;
+
+describeWithMatplotlib('figure capture', () => {
+  let jobDir: string;
+  let outsideDir: string;
+
+  const run = (code: string) => {
+    const result = spawnSync(pythonBin, [LAUNCHER_SCRIPT, '-', 'script.py'], {
+      cwd: jobDir,
+      input: `import matplotlib.pyplot as plt\nplt.plot([1, 2])\n${code}`,
+      env: { ...process.env, MPLBACKEND: 'Agg' },
+      encoding: 'utf-8',
+    });
+    expect(result.stderr).toBe('');
+    expect(result.status).toBe(0);
+  };
+
+  beforeEach(() => {
+    const parent = fs.mkdtempSync(path.join(os.tmpdir(), 'figures-'));
+    jobDir = path.join(parent, 'job');
+    outsideDir = path.join(parent, 'outside');
+    fs.mkdirSync(jobDir);
+  });
+
+  afterEach(() => {
+    fs.rmSync(path.dirname(jobDir), { recursive: true, force: true });
+  });
+
+  it('writes relative targets inside the job folder', () => {
+    run(
+      [
+        "plt.savefig('plots/relative.png')",
+        `plt.savefig(r'${path.join(jobDir, 'inside.png')}')`,
+      ].join('\n'),
+    );
+
+    expect(fs.existsSync(path.join(jobDir, 'plots', 'relative.png'))).toBe(true);
+    expect(fs.existsSync(path.join(jobDir, 'inside.png'))).toBe(true);
+  });
+
+  it('keeps only the file name of Windows-style paths', () => {
+    run(
+      [
+        "plt.savefig('C:/Users/someone/Desktop/forward.png')",
+        "plt.savefig(r'C:\\Users\\someone\\backward.png')",
+        "plt.savefig(r'\\\\server\\share\\unc.png')",
+      ].join('\n'),
+    );
+
+    const saved = fs
+      .readdirSync(jobDir)
+      .filter((name) => name.endsWith('.png') && !name.startsWith('figure_'));
+    expect(saved.sort()).toEqual(['backward.png', 'forward.png', 'unc.png']);
+  });
+
+  it('does not write or create folders outside the job folder', () => {
+    run(
+      [
+        `plt.savefig(r'${path.join(outsideDir, 'nested', 'absolute.png')}')`,
+        "plt.savefig('../escape.png')",
+      ].join('\n'),
+    );
+
+    expect(fs.existsSync(outsideDir)).toBe(false);
+    expect(fs.existsSync(path.join(jobDir, '..', 'escape.png'))).toBe(false);
+    expect(fs.existsSync(path.join(jobDir, 'absolute.png'))).toBe(true);
+    expect(fs.existsSync(path.join(jobDir, 'escape.png'))).toBe(true);
+  });
+});
@@ -0,0 +1,131 @@
+import * as fs from 'fs';
+import * as os from 'os';
+import * as path from 'path';
+import { PythonJob } from './interfaces/python-run.interface';
+import { PythonForkServerService } from './python-fork-server.service';
+
+// The zygote forks, so it only runs on POSIX; it needs PYTHON_BIN (or python)
+const describePosix = process.platform === 'win32' ? describe.skip : describe;
+
+// Zombies still answer kill(pid, 0)
+function isRunning(pid: number): boolean {
+  try {
+    process.kill(pid, 0);
+  } catch {
+    return false;
+  }
+  try {
+    const stat = fs.readFileSync(`/proc/${pid}/stat`, 'utf-8');
+    return stat.slice(stat.lastIndexOf(')') + 2)[0] !== 'Z';
+  } catch {
+    return true;
+  }
+}
+
+describePosix('PythonForkServerService', () => {
+  let server: PythonForkServerService;
+  let jobDir: string;
+  let nextId = 0;
+
+  const job = (code: string, extra: Partial<PythonJob> = {}): PythonJob => ({
+    id: String(nextId++),
+    code,
+    filename: path.join(jobDir, 'script.py'),
+    cwd: jobDir,
+    timeoutMs: 10000,
+    ...extra,
+  });
+
+  beforeEach(() => {
+    jobDir = fs.mkdtempSync(path.join(os.tmpdir(), 'fork-server-'));
+    server = new PythonForkServerService();
+  });
+
+  afterEach(async () => {
+    await server.onApplicationShutdown();
+    fs.rmSync(jobDir, { recursive: true, force: true });
+  });
+
+  it('forks a child per job in the job folder, with its limits and cgroup', async () => {
+    // Stands in for a cgroup v2 directory: the child writes its pid to cgroup.procs
+    const cgroup = fs.mkdtempSync(path.join(os.tmpdir(), 'cgroup-'));
+    const code = [
+      'import os, resource',
+      'print(os.getpid(), os.getcwd(), resource.getrlimit(resource.RLIMIT_NOFILE)[0])',
+    ].join('\n');
+
+    const first = await server.run(job(code, { limits: { openFiles: 64 }, cgroup }));
+    const second = await server.run(job(code));
+
+    const [pid, cwd, openFiles] = first.stdout.trim().split(' ');
+    expect(first.exitCode).toBe(0);
+    expect(cwd).toBe(fs.realpathSync(jobDir));
+    expect(openFiles).toBe('64');
+    expect(fs.readFileSync(path.join(cgroup, 'cgroup.procs'), 'utf-8')).toBe(pid);
+    expect(second.stdout.split(' ')[0]).not.toBe(pid);
+    expect(second.stdout.trim().split(' ')[2]).not.toBe('64');
+    expect(Number(pid)).not.toBe((server as any).zygote.pid);
+    fs.rmSync(cgroup, { recursive: true, force: true });
+  }, 30000);
+
+  it('kills the whole process group on a timeout', async () => {
+    const chunks: string[] = [];
+    const code = [
+      'import subprocess, sys, time',
+      "helper = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)'])",
+      'print(helper.pid, flush=True)',
+      'time.sleep(60)',
+    ].join('\n');
+
+    const outcome = await server.run(
+      job(code, { timeoutMs: 3000, onOutput: (_stream, chunk) => chunks.push(chunk) }),
+    );
+
+    expect(outcome).toMatchObject({ timedOut: true, signal: 'SIGKILL' });
+    expect(outcome.error).toContain('timed out');
+    const helper = Number(chunks.join('').trim());
+    expect(helper).toBeGreaterThan(0);
+    // A helper outside the child's process group would survive the kill
+    await new Promise((resolve) => setTimeout(resolve, 200));
+    expect(isRunning(helper)).toBe(false);
+  }, 30000);
+
+  it('truncates output at maxOutputBytes without splitting a character', async () => {
+    const chunks: string[] = [];
+    // 2-byte characters, so a 51-byte budget cuts one in half
+    const code = "import sys\nsys.stdout.write('é' * 100000)\nprint('done', file=sys.stderr)";
+
+    const outcome = await server.run(
+      job(code, { maxOutputBytes: 51, onOutput: (_stream, chunk) => chunks.push(chunk) }),
+    );
+
+    expect(outcome.exitCode).toBe(0);
+    expect(outcome.truncated).toBe(true);
+    expect(outcome.stdout).toBe('é'.repeat(25));
+    expect(outcome.stderr).toBe('');
+    expect(chunks.join('')).toBe(outcome.stdout);
+  }, 30000);
+
+  it('answers in-flight jobs when the zygote dies, then starts a new one', async () => {
+    let started: () => void;
+    const output = new Promise<void>((resolve) => (started = resolve));
+    const running = server.run(
+      job("import time\nprint('started', flush=True)\ntime.sleep(2)", {
+        onOutput: () => started(),
+      }),
+    );
+    await output;
+    const zygote = (server as any).zygote;
+
+    zygote.kill('SIGKILL');
+
+    expect(await running).toMatchObject({
+      exitCode: null,
+      timedOut: false,
+      error: 'Python fork server exited (SIGKILL)',
+    });
+    const next = await server.run(job("print('again')"));
+    expect(next).toMatchObject({ exitCode: 0, stdout: 'again\n' });
+    expect((server as any).zygote.pid).not.toBe(zygote.pid);
+  }, 30000);
+});
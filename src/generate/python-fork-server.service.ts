@@ -0,0 +1,162 @@
+import { Injectable, Logger, OnApplicationShutdown } from '@nestjs/common';
+import { ChildProcess, spawn } from 'child_process';
+import * as path from 'path';
+import * as readline from 'readline';
+import { PythonJob, PythonRunOutcome } from './interfaces/python-run.interface';
+
+const ZYGOTE_SCRIPT = path.join(__dirname, 'python', 'zygote.py');
+
+interface PendingRun {
+  job: PythonJob;
+  resolve: (outcome: PythonRunOutcome) => void;
+  timer: NodeJS.Timeout;
+  timedOut: boolean;
+}
+
+/**
+ * Runs every job in a child forked from a single zygote process that has
+ * already imported the scientific stack (POSIX only). Unlike the worker
+ * pool, no state can leak from one script to the next.
+ */
+@Injectable()
+export class PythonForkServerService implements OnApplicationShutdown {
+  private readonly logger = new Logger(PythonForkServerService.name);
+
+  private readonly pythonBin = process.env.PYTHON_BIN || 'python';
+  private readonly drainTimeoutMs =
+    Number(process.env.PYTHON_FORK_DRAIN_TIMEOUT_MS) || 15000;
+
+  private zygote?: ChildProcess;
+  private ready?: Promise<void>;
+  private readonly pending = new Map<string, PendingRun>();
+  private stopping = false;
+
+  start(): Promise<void> {
+    if (this.ready) return this.ready;
+
+    const child = spawn(this.pythonBin, ['-u', ZYGOTE_SCRIPT], {
+      stdio: ['pipe', 'pipe', 'pipe'],
+      env: { ...process.env, MPLBACKEND: 'Agg' },
+    });
+    this.zygote = child;
+    child.stdin!.on('error', () => undefined);
+
+    this.ready = new Promise<void>((resolve, reject) => {
+      readline.createInterface({ input: child.stdout! }).on('line', (line) => {
+        let message: any;
+        try {
+          message = JSON.parse(line);
+        } catch {
+          this.logger.warn(`Ignoring malformed fork server message: ${line}`);
+          return;
+        }
+        if (message.type === 'ready') {
+          this.logger.log(`Python fork server ready (pid ${message.pid})`);
+          resolve();
+        } else if (message.type === 'output') {
+          this.pending.get(message.id)?.job.onOutput?.(message.stream, message.data);
+        } else if (message.type === 'result') {
+          this.settle(message);
+        }
+      });
+
+      child.on('error', reject);
+      child.on('exit', (code, signal) => {
+        const reason = `Python fork server exited (${signal ?? code})`;
+        reject(new Error(reason));
+        if (this.zygote !== child) return;
+
+        this.zygote = undefined;
+        this.ready = undefined;
+        for (const run of this.pending.values()) {
+          clearTimeout(run.timer);
+          run.resolve({
+            exitCode: null,
+            stdout: '',
+            stderr: '',
+            timedOut: run.timedOut,
+            error: reason,
+          });
+        }
+        this.pending.clear();
+      });
+    });
+
+    readline.createInterface({ input: child.stderr! }).on('line', (line) => {
+      this.logger.warn(`[zygote ${child.pid}] ${line}`);
+    });
+
+    return this.ready;
+  }
+
+  async run(job: PythonJob): Promise<PythonRunOutcome> {
+    if (this.stopping) {
+      throw new Error('Python fork server is shutting down');
+    }
+    await this.start();
+
+    return new Promise<PythonRunOutcome>((resolve) => {
+      const run: PendingRun = {
+        job,
+        resolve,
+        timedOut: false,
+        timer: setTimeout(() => {
+          // The zygote answers with whatever output the child produced
+          run.timedOut = true;
+          this.send({ op: 'kill', id: job.id });
+        }, job.timeoutMs),
+      };
+      this.pending.set(job.id, run);
+      this.send({
+        op: 'run',
+        id: job.id,
+        code: job.code,
+        filename: job.filename,
+        cwd: job.cwd,
+        limits: job.limits,
+        cgroup: job.cgroup,
+        maxOutputBytes: job.maxOutputBytes,
+        stream: job.onOutput !== undefined,
+      });
+    });
+  }
+
+  async onApplicationShutdown() {
+    const zygote = this.zygote;
+    if (!zygote) return;
+    this.stopping = true;
+
+    // On EOF the zygote waits for its running children, then exits
+    const exited = new Promise<void>((resolve) => zygote.once('exit', () => resolve()));
+    zygote.stdin!.end();
+    const timer = setTimeout(() => zygote.kill('SIGKILL'), this.drainTimeoutMs);
+    await exited;
+    clearTimeout(timer);
+  }
+
+  private settle(message: any) {
+    const run = this.pending.get(message.id);
+    if (!run) return;
+    this.pending.delete(message.id);
+    clearTimeout(run.timer);
+
+    run.resolve({
+      exitCode: message.exitCode,
+      signal: message.signal,
+      stdout: message.stdout,
+      stderr: message.stderr,
+      timedOut: run.timedOut,
+      truncated: message.truncated,
+      artifacts: message.artifacts,
+      error: run.timedOut
+        ? `Script timed out after ${run.job.timeoutMs}ms`
+        : message.signal
+          ? `Script killed by ${message.signal}`
+          : undefined,
+    });
+  }
+
+  private send(message: Record<string, unknown>) {
+    this.zygote?.stdin!.write(JSON.stringify(message) + '\n');
+  }
+}
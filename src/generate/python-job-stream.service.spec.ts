@@ -0,0 +1,130 @@
+import { MessageEvent, NotFoundException, ServiceUnavailableException } from '@nestjs/common';
+import { Observable } from 'rxjs';
+import { PythonExecutionResultDto } from './dto/python-execution-result.dto';
+import { ExecutionSchedulerService } from './execution-scheduler.service';
+import { ExecuteOptions, PythonExecutorService } from './python-executor.service';
+import { PythonJobStreamService } from './python-job-stream.service';
+
+describe('PythonJobStreamService', () => {
+  let options: ExecuteOptions;
+  let finish: (result: Partial<PythonExecutionResultDto>) => void;
+  let fail: (error: Error) => void;
+  let jobs: PythonJobStreamService;
+
+  // Stands in for the executor: the test feeds output and ends the job
+  const executor = {
+    execute(_code: string, executeOptions: ExecuteOptions) {
+      options = executeOptions;
+      return new Promise((resolve, reject) => {
+        finish = resolve;
+        fail = reject;
+      });
+    },
+  };
+
+  const collect = (events: Observable<MessageEvent>) =>
+    new Promise<MessageEvent[]>((resolve, reject) => {
+      const received: MessageEvent[] = [];
+      events.subscribe({
+        next: (event) => received.push(event),
+        error: reject,
+        complete: () => resolve(received),
+      });
+    });
+
+  beforeEach(() => {
+    process.env.PYTHON_OUTPUT_MAX_BYTES = '10';
+    process.env.PYTHON_STREAM_RETENTION_MS = '20';
+    jobs = new PythonJobStreamService(
+      executor as unknown as PythonExecutorService,
+      { assertCapacity: () => undefined } as unknown as ExecutionSchedulerService,
+    );
+  });
+
+  afterEach(() => {
+    delete process.env.PYTHON_OUTPUT_MAX_BYTES;
+    delete process.env.PYTHON_STREAM_RETENTION_MS;
+  });
+
+  it('replays earlier output to late subscribers and completes with the status', async () => {
+    const jobId = jobs.start('print(1)');
+    options.onOutput!('stdout', '1\n');
+    options.onOutput!('stderr', 'warn\n');
+
+    const events = collect(jobs.stream(jobId));
+    finish({ success: true, jobId, stdout: '1\n', stderr: 'warn\n', artifacts: ['plot.png'] });
+
+    expect(await events).toEqual([
+      { type: 'stdout', data: '1\n' },
+      { type: 'stderr', data: 'warn\n' },
+      { type: 'artifact', data: { name: 'plot.png', url: `/generate/artifacts/${jobId}/plot.png` } },
+      { type: 'status', data: { success: true, jobId, artifacts: ['plot.png'] } },
+    ]);
+  });
+
+  it('reports a failed job in the status event', async () => {
+    const jobId = jobs.start('print(1)');
+    const events = collect(jobs.stream(jobId));
+
+    fail(new ServiceUnavailableException('No Python workers are available'));
+
+    expect(await events).toEqual([
+      {
+        type: 'status',
+        data: {
+          success: false,
+          jobId,
+          error: 'No Python workers are available',
+          statusCode: 503,
+        },
+      },
+    ]);
+  });
+
+  it('stops streaming output once the budget is used up', async () => {
+    const jobId = jobs.start('print(1)');
+    const events = collect(jobs.stream(jobId));
+
+    options.onOutput!('stdout', '12345678');
+    options.onOutput!('stderr', 'abcd');
+    options.onOutput!('stdout', 'never sent');
+    finish({ success: true, jobId });
+
+    expect(await events).toEqual([
+      { type: 'stdout', data: '12345678' },
+      { type: 'stderr', data: 'ab' },
+      { type: 'truncated', data: { limitBytes: 10 } },
+      { type: 'status', data: { success: true, jobId } },
+    ]);
+  });
+
+  it('keeps the job running when a subscriber disconnects', async () => {
+    const jobId = jobs.start('print(1)');
+    const received: MessageEvent[] = [];
+    const subscription = jobs.stream(jobId).subscribe((event) => received.push(event));
+    options.onOutput!('stdout', 'a');
+
+    // What Nest does when the client of an @Sse() route goes away
+    subscription.unsubscribe();
+    options.onOutput!('stdout', 'b');
+    finish({ success: true, jobId });
+
+    expect(received).toEqual([{ type: 'stdout', data: 'a' }]);
+    expect((await collect(jobs.stream(jobId))).map((event) => event.type)).toEqual([
+      'stdout',
+      'stdout',
+      'status',
+    ]);
+  });
+
+  it('rejects unknown and expired jobs with 404', async () => {
+    expect(() => jobs.stream('missing')).toThrow(NotFoundException);
+
+    const jobId = jobs.start('print(1)');
+    finish({ success: true, jobId });
+    await collect(jobs.stream(jobId));
+    await new Promise((resolve) => setTimeout(resolve, 50));
+
+    expect(() => jobs.stream(jobId)).toThrow(NotFoundException);
+  });
+});
@@ -0,0 +1,98 @@
+import {
+  HttpException,
+  Injectable,
+  MessageEvent,
+  NotFoundException,
+} from '@nestjs/common';
+import { Observable, ReplaySubject } from 'rxjs';
+import { OutputCollector } from './output-collector';
+import { ExecutionSchedulerService } from './execution-scheduler.service';
+import { createJobId, PythonExecutorService } from './python-executor.service';
+
+/**
+ * Runs scripts in the background and replays their output as Server-Sent
+ * Events: stdout/stderr chunks as they arrive, one artifact event per file
+ * the script produced, then a final status event.
+ */
+@Injectable()
+export class PythonJobStreamService {
+  private readonly maxOutputBytes =
+    Number(process.env.PYTHON_OUTPUT_MAX_BYTES) || 1024 * 1024;
+  // How long a finished job stays available to late subscribers
+  private readonly retentionMs =
+    Number(process.env.PYTHON_STREAM_RETENTION_MS) || 60000;
+
+  private readonly jobs = new Map<string, ReplaySubject<MessageEvent>>();
+
+  constructor(
+    private readonly executor: PythonExecutorService,
+    private readonly scheduler: ExecutionSchedulerService,
+  ) {}
+
+  start(code: string): string {
+    // Reject now; once the job id is handed out errors only reach the stream
+    this.scheduler.assertCapacity();
+
+    const jobId = createJobId();
+    const events = new ReplaySubject<MessageEvent>();
+    this.jobs.set(jobId, events);
+
+    const collector = new OutputCollector(this.maxOutputBytes, (stream, chunk) =>
+      events.next({ type: stream, data: chunk }),
+    );
+
+    this.executor
+      .execute(code, {
+        jobId,
+        onOutput: (stream, chunk) => {
+          const wasTruncated = collector.truncated;
+          collector.push(stream, chunk);
+          if (collector.truncated && !wasTruncated) {
+            events.next({ type: 'truncated', data: { limitBytes: this.maxOutputBytes } });
+          }
+        },
+      })
+      .then((result) => {
+        if (result.cached) {
+          collector.push('stdout', result.stdout ?? '');
+          collector.push('stderr', result.stderr ?? '');
+        }
+        for (const name of result.artifacts ?? []) {
+          events.next({
+            type: 'artifact',
+            data: { name, url: `/generate/artifacts/${jobId}/${name}` },
+          });
+        }
+        // Output has already been streamed
+        events.next({
+          type: 'status',
+          data: { ...result, stdout: undefined, stderr: undefined },
+        });
+      })
+      .catch((error) => {
+        events.next({
+          type: 'status',
+          data: {
+            success: false,
+            jobId,
+            error: error.message,
+            statusCode: error instanceof HttpException ? error.getStatus() : undefined,
+          },
+        });
+      })
+      .finally(() => {
+        events.complete();
+        setTimeout(() => this.jobs.delete(jobId), this.retentionMs).unref();
+      });
+
+    return jobId;
+  }
+
+  stream(jobId: string): Observable<MessageEvent> {
+    const events = this.jobs.get(jobId);
+    if (!events) {
+      throw new NotFoundException(`Unknown or expired job: ${jobId}`);
+    }
+    return events.asObservable();
+  }
+}
@@ -0,0 +1,46 @@
+import { PythonRunOutcome } from './interfaces/python-run.interface';
+import { PythonLimitsService } from './python-limits.service';
+
+describe('PythonLimitsService.classify', () => {
+  const limits = new PythonLimitsService();
+  const outcome = (fields: Partial<PythonRunOutcome>): PythonRunOutcome => ({
+    exitCode: 0,
+    stdout: '',
+    stderr: '',
+    timedOut: false,
+    ...fields,
+  });
+
+  it('reports limit errors of scripts that failed', () => {
+    expect(limits.classify(outcome({ exitCode: 1, stderr: 'MemoryError' }))).toBe(
+      'killed: memory limit',
+    );
+    expect(
+      limits.classify(outcome({ exitCode: 1, stderr: 'OSError: [Errno 24] Too many open files' })),
+    ).toBe('failed: open files limit');
+    expect(limits.classify(outcome({ exitCode: null, signal: 'SIGXCPU' }))).toBe(
+      'killed: cpu limit',
+    );
+  });
+
+  it('reports a SIGKILL as a memory limit only when the OOM killer fired', () => {
+    process.env.PYTHON_CGROUP_ROOT = '/sys/fs/cgroup/app';
+    const cgroupLimits = new PythonLimitsService();
+    delete process.env.PYTHON_CGROUP_ROOT;
+    const killed = outcome({ exitCode: null, signal: 'SIGKILL' });
+
+    expect(cgroupLimits.classify(killed, true)).toBe('killed: memory limit');
+    expect(cgroupLimits.classify(killed, false)).toBe('failed');
+    // e.g. an operator's kill -9, as a shell reports it: 128 + 9
+    expect(cgroupLimits.classify(outcome({ exitCode: 137 }))).toBe('failed');
+  });
+
+  it('ignores limit errors a successful script caught and logged', () => {
+    const stderr = 'MemoryError, retrying in chunks\nToo many open files\nFile too large';
+    expect(limits.classify(outcome({ stderr }))).toBe('completed');
+  });
+
+  it('reports a timeout before anything else', () => {
+    expect(limits.classify(outcome({ exitCode: null, timedOut: true }))).toBe('killed: timeout');
+  });
+});
@@ -0,0 +1,117 @@
+import { Injectable, Logger } from '@nestjs/common';
+import * as fs from 'fs/promises';
+import { constants } from 'os';
+import * as path from 'path';
+import { PythonRunOutcome, ResourceLimits } from './interfaces/python-run.interface';
+
+export type ExecutionStatus =
+  | 'completed'
+  | 'failed'
+  | 'killed: timeout'
+  | 'killed: memory limit'
+  | 'killed: cpu limit'
+  | 'killed: file size limit'
+  | 'failed: open files limit';
+
+/**
+ * Resource caps applied to every generated script: rlimits (address space,
+ * CPU seconds, open files, output file size) and, when PYTHON_CGROUP_ROOT
+ * points at a delegated cgroup v2 directory, one child cgroup per job.
+ */
+@Injectable()
+export class PythonLimitsService {
+  private readonly logger = new Logger(PythonLimitsService.name);
+
+  readonly limits: ResourceLimits = {
+    memoryMb: Number(process.env.PYTHON_LIMIT_MEMORY_MB) || 2048,
+    cpuSeconds: Number(process.env.PYTHON_LIMIT_CPU_SECONDS) || 30,
+    openFiles: Number(process.env.PYTHON_LIMIT_OPEN_FILES) || 256,
+    fileSizeMb: Number(process.env.PYTHON_LIMIT_FILE_SIZE_MB) || 100,
+  };
+
+  private readonly cgroupRoot = process.env.PYTHON_CGROUP_ROOT;
+  private readonly cgroupMemoryMb = Number(process.env.PYTHON_CGROUP_MEMORY_MB) || 0;
+  private readonly cgroupCpuPercent =
+    Number(process.env.PYTHON_CGROUP_CPU_PERCENT) || 100;
+  private readonly cgroupPidsMax = Number(process.env.PYTHON_CGROUP_PIDS_MAX) || 64;
+
+  /**
+   * Creates the job's cgroup; the Python side moves itself in before running.
+   */
+  async createCgroup(jobId: string): Promise<string | null> {
+    if (!this.cgroupRoot) return null;
+    const dir = path.join(this.cgroupRoot, `job-${jobId}`);
+    try {
+      await fs.mkdir(dir);
+      const memoryMb = this.cgroupMemoryMb || this.limits.memoryMb;
+      await fs.writeFile(path.join(dir, 'memory.max'), String(memoryMb * 1024 * 1024));
+      await fs.writeFile(path.join(dir, 'memory.swap.max'), '0').catch(() => undefined);
+      await fs.writeFile(
+        path.join(dir, 'cpu.max'),
+        `${Math.round(this.cgroupCpuPercent * 1000)} 100000`,
+      );
+      await fs.writeFile(path.join(dir, 'pids.max'), String(this.cgroupPidsMax));
+      return dir;
+    } catch (error) {
+      this.logger.warn(`Running ${jobId} without a cgroup: ${error.message}`);
+      await fs.rmdir(dir).catch(() => undefined);
+      return null;
+    }
+  }
+
+  /**
+   * Removes the job's cgroup and reports whether the OOM killer fired in it.
+   */
+  async releaseCgroup(dir: string | null): Promise<{ oomKilled: boolean }> {
+    if (!dir) return { oomKilled: false };
+    let oomKilled = false;
+    try {
+      const events = await fs.readFile(path.join(dir, 'memory.events'), 'utf-8');
+      oomKilled = /^oom_kill\s+[1-9]/m.test(events);
+    } catch {
+      // Controller not enabled for this subtree
+    }
+    await this.removeCgroup(dir);
+    return { oomKilled };
+  }
+
+  classify(outcome: PythonRunOutcome, oomKilled = false): ExecutionStatus {
+    if (outcome.timedOut) return 'killed: timeout';
+    const signal = outcome.signal ?? signalFromExitCode(outcome.exitCode);
+    // A script that caught and logged a MemoryError, then exited cleanly, succeeded
+    if (outcome.exitCode === 0 && !signal) return 'completed';
+    if (oomKilled || /\bMemoryError\b/.test(outcome.stderr)) {
+      return 'killed: memory limit';
+    }
+    if (signal === 'SIGXCPU') return 'killed: cpu limit';
+    if (signal === 'SIGXFSZ' || /\bFile too large\b/.test(outcome.stderr)) {
+      return 'killed: file size limit';
+    }
+    if (/\bToo many open files\b/.test(outcome.stderr)) {
+      return 'failed: open files limit';
+    }
+    return 'failed';
+  }
+
+  private async removeCgroup(dir: string, attempts = 5) {
+    for (let i = 0; i < attempts; i++) {
+      try {
+        await fs.rmdir(dir);
+        return;
+      } catch {
+        // Still populated while the last process is being reaped
+        await new Promise((resolve) => setTimeout(resolve, 50));
+      }
+    }
+    this.logger.warn(`Could not remove cgroup ${dir}`);
+  }
+}
+
+// A shell reports a child killed by signal N as exit code 128 + N
+function signalFromExitCode(exitCode: number | null): string | null {
+  if (exitCode === null || exitCode <= 128) return null;
+  const name = Object.keys(constants.signals).find(
+    (key) => constants.signals[key] === exitCode - 128,
+  );
+  return name ?? null;
+}
@@ -0,0 +1,178 @@
+import * as fs from 'fs';
+import * as os from 'os';
+import * as path from 'path';
+import { MetricsService } from './metrics.service';
+import {
+  isDeterministic,
+  normalizeScript,
+  PythonResultCacheService,
+} from './python-result-cache.service';
+
+describe('normalizeScript', () => {
+  it('masks per-run output folders, comments and blank lines', () => {
+    const a = [
+      '# Plot x squared',
+      'import numpy as np',
+      '',
+      "plt.savefig('C:/app/temp/1758350757715/plot.png')  ",
+    ].join('\r\n');
+    const b = [
+      'import numpy as np',
+      "plt.savefig('C:/app/temp/1758350766782/plot.png')",
+    ].join('\n');
+
+    expect(normalizeScript(a)).toBe(normalizeScript(b));
+    expect(normalizeScript(b)).toContain("'<output>/plot.png'");
+  });
+});
+
+describe('isDeterministic', () => {
+  it('accepts scripts without randomness', () => {
+    expect(isDeterministic('x = np.linspace(0, 10, 100)\ny = x ** 2')).toBe(true);
+  });
+
+  it('accepts seeded numpy randomness', () => {
+    expect(isDeterministic('np.random.seed(0)\nx = np.random.rand(50)')).toBe(true);
+  });
+
+  it('rejects unseeded sources even when another one is seeded', () => {
+    const code = 'np.random.seed(42)\ngender = random.random()';
+    expect(isDeterministic(code)).toBe(false);
+  });
+
+  it('rejects clock and uuid based scripts', () => {
+    expect(isDeterministic('stamp = datetime.now()')).toBe(false);
+    expect(isDeterministic('rng = np.random.default_rng()')).toBe(false);
+  });
+});
+
+describe('PythonResultCacheService', () => {
+  const env = { ...process.env };
+  let cacheDir: string;
+  let jobDir: string;
+
+  beforeEach(() => {
+    cacheDir = fs.mkdtempSync(path.join(os.tmpdir(), 'python-cache-'));
+    jobDir = fs.mkdtempSync(path.join(os.tmpdir(), 'python-job-'));
+    fs.writeFileSync(path.join(jobDir, 'data.csv'), 'x,y\n1,2\n');
+    process.env.PYTHON_CACHE_DIR = cacheDir;
+  });
+
+  afterEach(() => {
+    process.env = { ...env };
+    fs.rmSync(cacheDir, { recursive: true, force: true });
+    fs.rmSync(jobDir, { recursive: true, force: true });
+  });
+
+  const result = { stdout: 'ok', stderr: '', artifacts: ['data.csv'] };
+
+  const entrySize = (key: string) =>
+    ['result.json', 'job/data.csv']
+      .map((name) => fs.statSync(path.join(cacheDir, key, name)).size)
+      .reduce((a, b) => a + b);
+
+  it('stores identical results finishing together without clashing', async () => {
+    const cache = new PythonResultCacheService(new MetricsService());
+    const write = jest.spyOn(cache as any, 'write');
+
+    await Promise.all(
+      Array.from({ length: 8 }, () => cache.store('k', 'print(1)', jobDir, result)),
+    );
+
+    expect(fs.readdirSync(cacheDir)).toEqual(['k']);
+    expect(fs.readdirSync(path.join(cacheDir, 'k', 'job'))).toEqual(['data.csv']);
+    expect(cache.stats()).toMatchObject({ entries: 1, bytes: entrySize('k') });
+    expect(write).toHaveBeenCalledTimes(1);
+  });
+
+  it('restores a stored result into a new job folder', async () => {
+    const cache = new PythonResultCacheService(new MetricsService());
+    const runDir = (id: string) => path.join(jobDir, 'temp', id);
+    const code = (id: string) => `plt.savefig('${runDir(id)}/plot.png')`;
+    fs.mkdirSync(runDir('1'), { recursive: true });
+    fs.writeFileSync(path.join(runDir('1'), 'plot.png'), 'png');
+    await cache.store('k', code('1'), jobDir, result);
+
+    const target = fs.mkdtempSync(path.join(os.tmpdir(), 'python-job-'));
+    const restored = await cache.restore('k', code('2'), target);
+
+    expect(restored).toEqual(result);
+    expect(fs.readFileSync(path.join(target, 'data.csv'), 'utf-8')).toBe('x,y\n1,2\n');
+    // The output folder the new script names, not the original one
+    expect(fs.readFileSync(path.join(runDir('2'), 'plot.png'), 'utf-8')).toBe('png');
+    expect(cache.stats()).toMatchObject({ hits: 1, misses: 0 });
+    fs.rmSync(target, { recursive: true, force: true });
+  });
+
+  it('counts misses and bypassed scripts', async () => {
+    const cache = new PythonResultCacheService(new MetricsService());
+
+    expect(await cache.restore('missing', 'print(1)', jobDir)).toBeNull();
+    expect(await cache.keyFor('print(random.random())')).toBeNull();
+
+    expect(cache.stats()).toMatchObject({ hits: 0, misses: 1, bypassed: 1 });
+  });
+
+  describe('keys', () => {
+    const code = 'print(1)';
+    const keyWith = (packages: string) => {
+      process.env.PACKAGES = packages;
+      return new PythonResultCacheService(new MetricsService()).keyFor(code);
+    };
+
+    beforeEach(() => {
+      // Prints a package list instead of asking importlib.metadata
+      const python = path.join(jobDir, 'python');
+      fs.writeFileSync(python, `#!${process.execPath}\nconsole.log(process.env.PACKAGES)`, {
+        mode: 0o755,
+      });
+      process.env.PYTHON_BIN = python;
+    });
+
+    it('change when the installed packages change', async () => {
+      const key = await keyWith('numpy==2.0.0\npandas==2.2.3');
+
+      expect(await keyWith('numpy==2.0.0\npandas==2.2.3')).toBe(key);
+      expect(await keyWith('numpy==2.1.0\npandas==2.2.3')).not.toBe(key);
+    });
+
+    it('change with the contents of PYTHON_LOCKFILE', async () => {
+      const lockfile = path.join(jobDir, 'requirements.txt');
+      process.env.PYTHON_LOCKFILE = lockfile;
+      fs.writeFileSync(lockfile, 'numpy==2.0.0\n');
+      const key = await keyWith('');
+
+      fs.writeFileSync(lockfile, 'numpy==2.1.0\n');
+
+      expect(await keyWith('')).not.toBe(key);
+    });
+  });
+
+  it('evicts the least recently used entries past PYTHON_CACHE_MAX_BYTES', async () => {
+    await new PythonResultCacheService(new MetricsService()).store('a', '', jobDir, result);
+    const size = entrySize('a');
+    // Room for two entries, not three
+    process.env.PYTHON_CACHE_MAX_BYTES = String(Math.floor(size * 2.5));
+    const metrics = new MetricsService();
+    const cache = new PythonResultCacheService(metrics);
+    await cache.onModuleInit();
+
+    await cache.store('b', '', jobDir, result);
+    await cache.restore('a', '', fs.mkdtempSync(path.join(jobDir, 'restore-')));
+    await cache.store('c', '', jobDir, result);
+
+    expect(fs.readdirSync(cacheDir).sort()).toEqual(['a', 'c']);
+    expect(cache.stats()).toMatchObject({ entries: 2, bytes: size * 2 });
+    expect(metrics.count('python.cache.evicted')).toBe(1);
+  });
+
+  it('does not load staging folders left by a crash as entries', async () => {
+    fs.mkdirSync(path.join(cacheDir, 'k.123.abcd1234.tmp'));
+    fs.writeFileSync(path.join(cacheDir, 'k.123.abcd1234.tmp', 'result.json'), '{}');
+
+    const cache = new PythonResultCacheService(new MetricsService());
+    await cache.onModuleInit();
+
+    expect(cache.stats().entries).toBe(0);
+  });
+});
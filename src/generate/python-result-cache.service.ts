@@ -0,0 +1,343 @@
+import { Injectable, Logger, OnModuleInit } from '@nestjs/common';
+import { execFile } from 'child_process';
+import { createHash, randomBytes } from 'crypto';
+import { promisify } from 'util';
+import * as fs from 'fs/promises';
+import * as path from 'path';
+import { MetricsService } from './metrics.service';
+
+const execFileAsync = promisify(execFile);
+
+// Interpreter version and every installed distribution, one per line
+const ENVIRONMENT_SCRIPT = [
+  'import sys',
+  'from importlib import metadata',
+  'print(sys.version)',
+  "print('\\n'.join(sorted(f\"{d.metadata['Name']}=={d.version}\" for d in metadata.distributions())))",
+].join('\n');
+
+const RESULT_FILE = 'result.json';
+// Staging folders older than this were left by a crash, not by a store in progress
+const STALE_STAGING_MS = 60 * 60 * 1000;
+
+// Quoted paths into a per-run output folder, e.g. '.../temp/1758385135509/plot.png'
+const OUTPUT_PATH = /(['"])([^'"\n]*?[\\/]temp[\\/][\w-]+)[\\/]([^'"\\/\n]+)\1/g;
+
+// Each source of randomness and how a script pins it down
+const RNG_SOURCES: { uses: RegExp; seeded: RegExp }[] = [
+  {
+    uses: /\b(?:np|numpy)\.random\.(?!seed\b|default_rng\b|RandomState\b|Generator\b)\w+|\.rvs\s*\(/,
+    seeded: /\b(?:np|numpy)\.random\.seed\s*\(\s*[^)\s]/,
+  },
+  {
+    uses: /(?<![.\w])random\.(?!seed\b)\w+\s*\(|\bfrom\s+random\s+import\b/,
+    seeded: /(?<![.\w])random\.seed\s*\(\s*[^)\s]/,
+  },
+  {
+    uses: /\bFaker\s*\(/,
+    seeded: /\bFaker\.seed\s*\(|\.seed_instance\s*\(/,
+  },
+];
+const UNSEEDED = /\bdefault_rng\s*\(\s*\)|\bRandomState\s*\(\s*\)/;
+const UNSEEDABLE =
+  /\buuid\.uuid[14]\s*\(|\btime\.(?:time|perf_counter)\s*\(|\b(?:datetime|date)\.(?:now|today|utcnow)\s*\(|\bos\.urandom\s*\(|\bsecrets\./;
+
+export interface CachedExecution {
+  stdout: string;
+  stderr: string;
+  artifacts: string[];
+}
+
+interface CacheEntry {
+  size: number;
+  lastAccess: number;
+}
+
+interface StoredResult extends CachedExecution {
+  outputs: string[];
+}
+
+/**
+ * Content-addressed cache of script results. Scripts are keyed on their
+ * normalized source (per-run output folders masked out), the interpreter
+ * version and the installed packages (plus PYTHON_LOCKFILE, if set); only
+ * deterministic scripts are cached.
+ */
+@Injectable()
+export class PythonResultCacheService implements OnModuleInit {
+  private readonly logger = new Logger(PythonResultCacheService.name);
+
+  private readonly enabled = process.env.PYTHON_CACHE_ENABLED !== 'false';
+  private readonly cacheDir =
+    process.env.PYTHON_CACHE_DIR || path.join(__dirname, '../../temp/.cache');
+  private readonly maxBytes =
+    Number(process.env.PYTHON_CACHE_MAX_BYTES) || 256 * 1024 * 1024;
+  private readonly lockfile = process.env.PYTHON_LOCKFILE;
+  private readonly pythonBin = process.env.PYTHON_BIN || 'python';
+
+  // Insertion order doubles as LRU order: oldest access first
+  private readonly entries = new Map<string, CacheEntry>();
+  private totalBytes = 0;
+  private readonly storing = new Map<string, Promise<void>>();
+  private environment?: Promise<string>;
+
+  constructor(private readonly metrics: MetricsService) {}
+
+  async onModuleInit() {
+    if (!this.enabled) return;
+    await fs.mkdir(this.cacheDir, { recursive: true });
+    // Listing the installed packages takes a moment; start it before the first job
+    void this.environmentFingerprint();
+
+    const loaded: [string, CacheEntry][] = [];
+    for (const key of await fs.readdir(this.cacheDir)) {
+      if (key.endsWith('.tmp')) {
+        await this.removeStaleStaging(path.join(this.cacheDir, key));
+        continue;
+      }
+      try {
+        const stat = await fs.stat(path.join(this.cacheDir, key, RESULT_FILE));
+        const size = await this.directorySize(path.join(this.cacheDir, key));
+        loaded.push([key, { size, lastAccess: stat.mtimeMs }]);
+      } catch {
+        // Half-written entry from a crash
+        await fs.rm(path.join(this.cacheDir, key), { recursive: true, force: true });
+      }
+    }
+    loaded.sort((a, b) => a[1].lastAccess - b[1].lastAccess);
+    for (const [key, entry] of loaded) {
+      this.entries.set(key, entry);
+      this.totalBytes += entry.size;
+    }
+  }
+
+  /**
+   * Cache key for a script, or null when its output is not reproducible.
+   */
+  async keyFor(code: string): Promise<string | null> {
+    if (!this.enabled) return null;
+    if (!isDeterministic(code)) {
+      this.metrics.increment('python.cache.bypass');
+      return null;
+    }
+    return createHash('sha256')
+      .update(normalizeScript(code))
+      .update('\0')
+      .update(await this.environmentFingerprint())
+      .digest('hex');
+  }
+
+  async restore(
+    key: string,
+    code: string,
+    jobDir: string,
+  ): Promise<CachedExecution | null> {
+    const entry = this.entries.get(key);
+    if (!entry) {
+      this.metrics.increment('python.cache.miss');
+      return null;
+    }
+
+    const entryDir = path.join(this.cacheDir, key);
+    try {
+      const stored: StoredResult = JSON.parse(
+        await fs.readFile(path.join(entryDir, RESULT_FILE), 'utf-8'),
+      );
+      for (const name of stored.artifacts) {
+        await fs.copyFile(path.join(entryDir, 'job', name), path.join(jobDir, name));
+      }
+      // Re-create files the original run wrote into its output folder
+      const targets = outputPaths(code);
+      for (const name of stored.outputs) {
+        const target = targets.get(name);
+        if (!target) continue;
+        await fs.mkdir(path.dirname(target), { recursive: true });
+        await fs.copyFile(path.join(entryDir, 'out', name), target);
+      }
+
+      this.touch(key, entry);
+      const now = new Date();
+      await fs.utimes(path.join(entryDir, RESULT_FILE), now, now);
+      this.metrics.increment('python.cache.hit');
+      return {
+        stdout: stored.stdout,
+        stderr: stored.stderr,
+        artifacts: stored.artifacts,
+      };
+    } catch (error) {
+      this.logger.warn(`Dropping unreadable cache entry ${key}: ${error.message}`);
+      await this.remove(key);
+      this.metrics.increment('python.cache.miss');
+      return null;
+    }
+  }
+
+  store(
+    key: string,
+    code: string,
+    jobDir: string,
+    result: CachedExecution,
+  ): Promise<void> {
+    // Same key, same result: identical jobs finishing together store it once
+    let pending = this.storing.get(key);
+    if (!pending) {
+      pending = this.write(key, code, jobDir, result).finally(() =>
+        this.storing.delete(key),
+      );
+      this.storing.set(key, pending);
+    }
+    return pending;
+  }
+
+  private async write(
+    key: string,
+    code: string,
+    jobDir: string,
+    result: CachedExecution,
+  ): Promise<void> {
+    const entryDir = path.join(this.cacheDir, key);
+    // Unique per store: another process may share the cache folder
+    const stagingDir = `${entryDir}.${process.pid}.${randomBytes(4).toString('hex')}.tmp`;
+    try {
+      await fs.mkdir(path.join(stagingDir, 'job'), { recursive: true });
+      await fs.mkdir(path.join(stagingDir, 'out'), { recursive: true });
+
+      for (const name of result.artifacts) {
+        await fs.copyFile(path.join(jobDir, name), path.join(stagingDir, 'job', name));
+      }
+      const outputs: string[] = [];
+      for (const [name, source] of outputPaths(code)) {
+        try {
+          await fs.copyFile(source, path.join(stagingDir, 'out', name));
+          outputs.push(name);
+        } catch {
+          // Referenced but never written
+        }
+      }
+
+      const stored: StoredResult = { ...result, outputs };
+      await fs.writeFile(path.join(stagingDir, RESULT_FILE), JSON.stringify(stored));
+      await this.remove(key);
+      await fs.rename(stagingDir, entryDir);
+
+      const size = await this.directorySize(entryDir);
+      this.entries.set(key, { size, lastAccess: Date.now() });
+      this.totalBytes += size;
+      await this.evict();
+    } catch (error) {
+      this.logger.warn(`Could not cache result ${key}: ${error.message}`);
+      await fs.rm(stagingDir, { recursive: true, force: true });
+    }
+  }
+
+  stats() {
+    return {
+      entries: this.entries.size,
+      bytes: this.totalBytes,
+      maxBytes: this.maxBytes,
+      hits: this.metrics.count('python.cache.hit'),
+      misses: this.metrics.count('python.cache.miss'),
+      bypassed: this.metrics.count('python.cache.bypass'),
+    };
+  }
+
+  private touch(key: string, entry: CacheEntry) {
+    this.entries.delete(key);
+    entry.lastAccess = Date.now();
+    this.entries.set(key, entry);
+  }
+
+  private async evict() {
+    for (const key of this.entries.keys()) {
+      if (this.totalBytes <= this.maxBytes) break;
+      await this.remove(key);
+      this.metrics.increment('python.cache.evicted');
+    }
+  }
+
+  private async remove(key: string) {
+    const entry = this.entries.get(key);
+    if (entry) {
+      this.entries.delete(key);
+      this.totalBytes -= entry.size;
+    }
+    await fs.rm(path.join(this.cacheDir, key), { recursive: true, force: true });
+  }
+
+  // Another process sharing the cache folder may still be staging into it
+  private async removeStaleStaging(dir: string) {
+    try {
+      const { mtimeMs } = await fs.stat(dir);
+      if (Date.now() - mtimeMs > STALE_STAGING_MS) {
+        await fs.rm(dir, { recursive: true, force: true });
+      }
+    } catch {
+      // Already renamed or removed
+    }
+  }
+
+  private async directorySize(dir: string): Promise<number> {
+    let size = 0;
+    for (const entry of await fs.readdir(dir, { withFileTypes: true })) {
+      const full = path.join(dir, entry.name);
+      size += entry.isDirectory()
+        ? await this.directorySize(full)
+        : (await fs.stat(full)).size;
+    }
+    return size;
+  }
+
+  private environmentFingerprint(): Promise<string> {
+    this.environment ??= (async () => {
+      const hash = createHash('sha256');
+      try {
+        const { stdout } = await execFileAsync(this.pythonBin, [
+          '-c',
+          ENVIRONMENT_SCRIPT,
+        ]);
+        hash.update(stdout);
+      } catch (error) {
+        this.logger.warn(`Could not list installed packages: ${error.message}`);
+        hash.update('unknown-python');
+      }
+      if (this.lockfile) {
+        try {
+          hash.update(await fs.readFile(this.lockfile));
+        } catch (error) {
+          this.logger.warn(`Could not read ${this.lockfile}: ${error.message}`);
+          hash.update('no-lockfile');
+        }
+      }
+      return hash.digest('hex');
+    })();
+    return this.environment;
+  }
+}
+
+/**
+ * Strips what differs between otherwise identical generated scripts:
+ * line endings, comment-only lines, blank lines and per-run output folders.
+ */
+export function normalizeScript(code: string): string {
+  return code
+    .replace(/\r\n?/g, '\n')
+    .replace(OUTPUT_PATH, (_match, quote, _dir, name) => `${quote}<output>/${name}${quote}`)
+    .split('\n')
+    .map((line) => line.trimEnd())
+    .filter((line) => line && !/^\s*#/.test(line))
+    .join('\n');
+}
+
+export function isDeterministic(code: string): boolean {
+  if (UNSEEDABLE.test(code) || UNSEEDED.test(code)) return false;
+  return RNG_SOURCES.every(({ uses, seeded }) => !uses.test(code) || seeded.test(code));
+}
+
+// File name -> absolute path for every output-folder path the script mentions
+function outputPaths(code: string): Map<string, string> {
+  const paths = new Map<string, string>();
+  for (const match of code.matchAll(OUTPUT_PATH)) {
+    paths.set(match[3], path.join(match[2], match[3]));
+  }
+  return paths;
+}
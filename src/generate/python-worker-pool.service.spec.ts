@@ -0,0 +1,143 @@
+import * as fs from 'fs';
+import * as os from 'os';
+import * as path from 'path';
+import { PythonJob } from './interfaces/python-run.interface';
+import { PythonWorkerPoolService } from './python-worker-pool.service';
+
+// Speaks worker.py's protocol. The job code picks the behaviour:
+// "hang" never answers, "sleep <ms>" answers late, "rss <mb>" reports its
+// memory. stdout is the worker's pid, so tests can tell workers apart.
+const FAKE_WORKER = `
+const readline = require('readline');
+const send = (message) => process.stdout.write(JSON.stringify(message) + '\\n');
+send({ type: 'ready', pid: process.pid, preloaded: [] });
+readline.createInterface({ input: process.stdin }).on('line', (line) => {
+  const job = JSON.parse(line);
+  const [command, arg] = job.code.split(' ');
+  if (command === 'hang') return;
+  const reply = () =>
+    send({
+      type: 'result',
+      id: job.id,
+      exitCode: 0,
+      stdout: String(process.pid),
+      stderr: '',
+      rssMb: command === 'rss' ? Number(arg) : 10,
+    });
+  if (command === 'sleep') setTimeout(reply, Number(arg));
+  else reply();
+});
+`;
+
+async function waitFor(condition: () => boolean, timeoutMs = 2000) {
+  const deadline = Date.now() + timeoutMs;
+  while (!condition()) {
+    if (Date.now() > deadline) throw new Error('Condition not met in time');
+    await new Promise((resolve) => setTimeout(resolve, 10));
+  }
+}
+
+describe('PythonWorkerPoolService', () => {
+  const env = { ...process.env };
+  let fixtureDir: string;
+  let pool: PythonWorkerPoolService;
+  let nextId = 0;
+
+  const job = (code: string, timeoutMs = 5000): PythonJob => ({
+    id: String(nextId++),
+    code,
+    filename: 'script.py',
+    timeoutMs,
+  });
+
+  // Configured through the environment, as in production
+  const createPool = (settings: Record<string, string> = {}) => {
+    Object.assign(process.env, { PYTHON_POOL_SIZE: '1', ...settings });
+    pool = new PythonWorkerPoolService();
+    return pool;
+  };
+
+  beforeEach(() => {
+    fixtureDir = fs.mkdtempSync(path.join(os.tmpdir(), 'python-pool-'));
+    const python = path.join(fixtureDir, 'python');
+    fs.writeFileSync(python, `#!${process.execPath}\n${FAKE_WORKER}`, { mode: 0o755 });
+    process.env.PYTHON_BIN = python;
+  });
+
+  afterEach(async () => {
+    await pool?.onApplicationShutdown();
+    process.env = { ...env };
+    fs.rmSync(fixtureDir, { recursive: true, force: true });
+  });
+
+  it('recycles a worker after PYTHON_POOL_MAX_JOBS jobs', async () => {
+    createPool({ PYTHON_POOL_MAX_JOBS: '2' });
+
+    const pids: string[] = [];
+    for (let i = 0; i < 3; i++) {
+      pids.push((await pool.run(job('echo'))).stdout);
+    }
+
+    expect(pids[1]).toBe(pids[0]);
+    expect(pids[2]).not.toBe(pids[0]);
+  });
+
+  it('recycles a worker once its RSS passes the limit', async () => {
+    createPool({ PYTHON_POOL_MAX_RSS_MB: '100' });
+
+    const first = await pool.run(job('rss 50'));
+    const second = await pool.run(job('rss 500'));
+    const third = await pool.run(job('echo'));
+
+    expect(second.stdout).toBe(first.stdout);
+    expect(third.stdout).not.toBe(first.stdout);
+  });
+
+  it('kills and replaces a worker whose job times out', async () => {
+    createPool();
+    const warm = await pool.run(job('echo'));
+    const stuck = (pool as any).workers[0].process;
+
+    const [outcome, queued] = await Promise.all([
+      pool.run(job('hang', 100)),
+      pool.run(job('echo')),
+    ]);
+
+    expect(outcome).toMatchObject({ timedOut: true, exitCode: null });
+    await waitFor(() => stuck.signalCode !== null);
+    expect(stuck.signalCode).toBe('SIGKILL');
+    // The kill is not reported as a crash to whoever gets the replacement
+    expect(queued).toMatchObject({ exitCode: 0, timedOut: false });
+    expect(queued.stdout).not.toBe(warm.stdout);
+  });
+
+  it('queues callers while every worker is busy', async () => {
+    createPool();
+    const finished: string[] = [];
+
+    await Promise.all([
+      pool.run(job('sleep 100')).then(() => finished.push('slow')),
+      pool.run(job('echo')).then(() => finished.push('queued')),
+    ]);
+
+    expect(finished).toEqual(['slow', 'queued']);
+  });
+
+  it('drains in-flight jobs on shutdown, refusing new ones and not respawning', async () => {
+    createPool();
+    const warm = await pool.run(job('echo'));
+    const worker = (pool as any).workers[0].process;
+    const running = pool.run(job('sleep 200'));
+    await new Promise((resolve) => setTimeout(resolve, 20));
+
+    const shutdown = pool.onApplicationShutdown();
+    await expect(pool.run(job('echo'))).rejects.toThrow('shutting down');
+    await expect(running).resolves.toMatchObject({ exitCode: 0, stdout: warm.stdout });
+    await shutdown;
+
+    // Retired by closing stdin, not killed, and nothing started in its place
+    await waitFor(() => worker.exitCode !== null);
+    expect(worker.exitCode).toBe(0);
+    expect((pool as any).workers).toHaveLength(0);
+  });
+});
@@ -0,0 +1,287 @@
+import { Injectable, Logger, OnApplicationShutdown } from '@nestjs/common';
+import { ChildProcess, spawn } from 'child_process';
+import * as os from 'os';
+import * as path from 'path';
+import * as readline from 'readline';
+import { PythonJob, PythonRunOutcome } from './interfaces/python-run.interface';
+
+const WORKER_SCRIPT = path.join(__dirname, 'python', 'worker.py');
+
+interface PendingRun {
+  job: PythonJob;
+  resolve: (outcome: PythonRunOutcome) => void;
+  timer: NodeJS.Timeout;
+}
+
+interface PoolWorker {
+  process: ChildProcess;
+  ready: boolean;
+  booted: boolean;
+  jobs: number;
+  current?: PendingRun;
+}
+
+interface Waiter {
+  resolve: (worker: PoolWorker) => void;
+  reject: (error: Error) => void;
+}
+
+/**
+ * Keeps a fixed number of warm Python interpreters with the scientific
+ * stack already imported, running one job per worker at a time.
+ */
+@Injectable()
+export class PythonWorkerPoolService implements OnApplicationShutdown {
+  private readonly logger = new Logger(PythonWorkerPoolService.name);
+
+  private readonly pythonBin = process.env.PYTHON_BIN || 'python';
+  private readonly size =
+    Number(process.env.PYTHON_POOL_SIZE) || Math.max(1, os.cpus().length - 1);
+  private readonly maxJobsPerWorker =
+    Number(process.env.PYTHON_POOL_MAX_JOBS) || 50;
+  private readonly maxRssMb = Number(process.env.PYTHON_POOL_MAX_RSS_MB) || 1024;
+  private readonly drainTimeoutMs =
+    Number(process.env.PYTHON_POOL_DRAIN_TIMEOUT_MS) || 15000;
+
+  private workers: PoolWorker[] = [];
+  private waiting: Waiter[] = [];
+  private started = false;
+  private draining = false;
+  private onIdle?: () => void;
+
+  start() {
+    if (this.started) return;
+    this.started = true;
+    for (let i = 0; i < this.size; i++) {
+      this.workers.push(this.spawnWorker());
+    }
+    this.logger.log(`Started ${this.size} Python workers`);
+  }
+
+  async run(job: PythonJob): Promise<PythonRunOutcome> {
+    if (this.draining) {
+      throw new Error('Python worker pool is shutting down');
+    }
+    this.start();
+
+    const worker = await this.acquire();
+
+    return new Promise<PythonRunOutcome>((resolve) => {
+      const timer = setTimeout(() => {
+        // The interpreter is stuck inside user code; it cannot be reused
+        this.replace(worker);
+        resolve({
+          exitCode: null,
+          stdout: '',
+          stderr: '',
+          timedOut: true,
+          error: `Script timed out after ${job.timeoutMs}ms`,
+        });
+      }, job.timeoutMs);
+
+      worker.current = { job, resolve, timer };
+      worker.process.stdin!.write(
+        JSON.stringify({
+          id: job.id,
+          code: job.code,
+          filename: job.filename,
+          cwd: job.cwd,
+          limits: job.limits,
+          maxOutputBytes: job.maxOutputBytes,
+          stream: job.onOutput !== undefined,
+        }) + '\n',
+      );
+    });
+  }
+
+  async onApplicationShutdown() {
+    if (!this.started) return;
+    this.draining = true;
+
+    if (this.hasWork()) {
+      await new Promise<void>((resolve) => {
+        const timer = setTimeout(resolve, this.drainTimeoutMs);
+        this.onIdle = () => {
+          clearTimeout(timer);
+          resolve();
+        };
+      });
+    }
+
+    for (const worker of this.workers) {
+      this.retire(worker);
+    }
+    this.workers = [];
+  }
+
+  private spawnWorker(): PoolWorker {
+    const child = spawn(this.pythonBin, ['-u', WORKER_SCRIPT], {
+      stdio: ['pipe', 'pipe', 'pipe'],
+      env: { ...process.env, MPLBACKEND: 'Agg' },
+    });
+    const worker: PoolWorker = {
+      process: child,
+      ready: false,
+      booted: false,
+      jobs: 0,
+    };
+
+    readline.createInterface({ input: child.stdout! }).on('line', (line) => {
+      this.handleMessage(worker, line);
+    });
+    readline.createInterface({ input: child.stderr! }).on('line', (line) => {
+      this.logger.warn(`[worker ${child.pid}] ${line}`);
+    });
+
+    // A worker dying mid-write surfaces through 'exit' instead
+    child.stdin!.on('error', () => undefined);
+
+    child.on('error', (error) => {
+      this.logger.error(`Python worker failed: ${error.message}`);
+      this.discard(worker, error);
+    });
+
+    child.on('exit', (code, signal) => {
+      const pending = worker.current;
+      worker.current = undefined;
+      if (pending) {
+        clearTimeout(pending.timer);
+        pending.resolve({
+          exitCode: code,
+          signal,
+          stdout: '',
+          stderr: '',
+          timedOut: false,
+          error: `Python worker exited unexpectedly (${signal ?? code})`,
+        });
+      }
+      if (!worker.booted) {
+        // Respawning an interpreter that cannot even start would loop forever
+        this.discard(
+          worker,
+          new Error(`Python worker failed to start (${signal ?? code})`),
+        );
+      } else if (this.workers.includes(worker)) {
+        this.replace(worker);
+      }
+    });
+
+    return worker;
+  }
+
+  private handleMessage(worker: PoolWorker, line: string) {
+    let message: any;
+    try {
+      message = JSON.parse(line);
+    } catch {
+      this.logger.warn(`Ignoring malformed worker message: ${line}`);
+      return;
+    }
+
+    if (message.type === 'ready') {
+      worker.booted = true;
+      this.release(worker);
+      return;
+    }
+
+    const pending = worker.current;
+    if (!pending || pending.job.id !== message.id) return;
+
+    if (message.type === 'output') {
+      pending.job.onOutput?.(message.stream, message.data);
+      return;
+    }
+    if (message.type !== 'result') return;
+
+    clearTimeout(pending.timer);
+    worker.current = undefined;
+    worker.jobs++;
+    pending.resolve({
+      exitCode: message.exitCode,
+      stdout: message.stdout,
+      stderr: message.stderr,
+      timedOut: false,
+      truncated: message.truncated,
+    });
+
+    if (
+      worker.jobs >= this.maxJobsPerWorker ||
+      message.rssMb > this.maxRssMb
+    ) {
+      this.replace(worker);
+    } else {
+      this.release(worker);
+    }
+  }
+
+  private acquire(): Promise<PoolWorker> {
+    const idle = this.workers.find((w) => w.ready && !w.current);
+    if (idle) {
+      // Reserve it before the caller writes the job
+      idle.ready = false;
+      return Promise.resolve(idle);
+    }
+    if (this.workers.length === 0) {
+      return Promise.reject(new Error('No Python workers are available'));
+    }
+    return new Promise((resolve, reject) =>
+      this.waiting.push({ resolve, reject }),
+    );
+  }
+
+  private release(worker: PoolWorker) {
+    const next = this.waiting.shift();
+    if (next) {
+      worker.ready = false;
+      next.resolve(worker);
+      return;
+    }
+    worker.ready = true;
+    if (this.draining && !this.hasWork()) {
+      this.onIdle?.();
+    }
+  }
+
+  private replace(worker: PoolWorker) {
+    const index = this.workers.indexOf(worker);
+    if (index === -1) return;
+    this.retire(worker);
+    if (this.draining) {
+      this.workers.splice(index, 1);
+      if (!this.hasWork()) this.onIdle?.();
+      return;
+    }
+    this.workers[index] = this.spawnWorker();
+  }
+
+  private discard(worker: PoolWorker, error: Error) {
+    const index = this.workers.indexOf(worker);
+    if (index === -1) return;
+    this.workers.splice(index, 1);
+    if (this.workers.length === 0) {
+      for (const waiter of this.waiting.splice(0)) {
+        waiter.reject(error);
+      }
+      this.started = false;
+    }
+  }
+
+  private retire(worker: PoolWorker) {
+    worker.ready = false;
+    worker.process.removeAllListeners('exit');
+    if (worker.current) {
+      // Only reached on a timeout; the timer answers the caller
+      worker.current = undefined;
+      worker.process.kill('SIGKILL');
+      return;
+    }
+    worker.process.stdin!.end();
+    setTimeout(() => worker.process.kill('SIGKILL'), 5000).unref();
+  }
+
+  private hasWork() {
+    return (
+      this.waiting.length > 0 || this.workers.some((w) => w.current !== undefined)
+    );
+  }
+}
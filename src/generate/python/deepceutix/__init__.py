@@ -0,0 +1,48 @@
+"""Runtime injected into every generated script by PythonExecutorService.
+
+Scripts can register their results explicitly:
+
+    import deepceutix
+    deepceutix.series('absorbance', wavenumber, absorbance, label='Formulation')
+    deepceutix.table('summary', {'drug': names, 'dose_mg': doses})
+    deepceutix.dataframe('patients', patients_df)
+
+Each result is written once as an NPZ file in the job folder and described
+in <job dir>/manifest.json, together with every figure the script drew; the
+executor turns the manifest into the execute-python response. Line and
+scatter data of saved figures is registered automatically, and so is every
+DataFrame left in the script's globals. DataFrames are written as Parquet
+(or Arrow IPC, PYTHON_DATAFRAME_FORMAT=arrow) when pyarrow is installed.
+
+Outside the executor (no runtime active) these calls do nothing.
+"""
+from . import _runtime
+from ._runtime import Runtime
+
+__all__ = ['Runtime', 'series', 'table', 'dataframe']
+
+
+def series(name, x=None, y=None, label=None):
+    """Register one x/y series; x defaults to 0..n-1."""
+    if _runtime.current is not None:
+        if y is None:
+            x, y = None, x
+        _runtime.current.store.add_series(name, x, y, label=label)
+
+
+def table(name, data, headers=None):
+    """Register a table given as {column: values} or as rows plus headers."""
+    if _runtime.current is None:
+        return
+    if not isinstance(data, dict):
+        rows = list(data)
+        if headers is None:
+            raise ValueError('table %r: rows need headers' % (name,))
+        data = {header: [row[i] for row in rows] for i, header in enumerate(headers)}
+    _runtime.current.store.add_table(name, data)
+
+
+def dataframe(name, df):
+    """Register a pandas DataFrame; the index is kept as a column when named."""
+    if _runtime.current is not None:
+        _runtime.current.store.add_dataframe(name, df)
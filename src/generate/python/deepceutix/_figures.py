@@ -0,0 +1,139 @@
+import functools
+import io
+import ntpath
+import os
+import re
+import struct
+import sys
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+
+class FigureCapture:
+    """Keeps every matplotlib figure a script renders.
+
+    Each savefig() call is rendered once into memory and written both to
+    figure_<n>.<ext> and to wherever the script asked, within the job
+    directory, so saving several figures to the same plot.png no longer
+    loses the earlier ones. Figures still open when the script ends are
+    saved too.
+    """
+
+    def __init__(self, out_dir, on_first_save=None):
+        self.out_dir = out_dir
+        self.on_first_save = on_first_save
+        self.entries = []
+        self.saved = set()
+        self.original = None
+
+    def install(self):
+        import matplotlib.figure
+
+        self.original = matplotlib.figure.Figure.savefig
+        capture = self
+
+        # pyplot checks the qualified name of the method it wraps
+        @functools.wraps(self.original)
+        def savefig(figure, fname, *args, **kwargs):
+            return capture.save(figure, fname, *args, **kwargs)
+
+        matplotlib.figure.Figure.savefig = savefig
+
+    def finish(self):
+        if self.original is None:
+            return self.entries
+        import matplotlib.figure
+
+        plt = sys.modules.get('matplotlib.pyplot')
+        try:
+            for number in plt.get_fignums() if plt else ():
+                figure = plt.figure(number)
+                if id(figure) not in self.saved:
+                    self.save(figure, None)
+        finally:
+            matplotlib.figure.Figure.savefig = self.original
+            self.original = None
+        return self.entries
+
+    def save(self, figure, fname, *args, **kwargs):
+        fmt = kwargs.pop('format', None) or _format_of(fname)
+        buffer = io.BytesIO()
+        self.original(figure, buffer, *args, format=fmt, **kwargs)
+        data = buffer.getvalue()
+
+        name = 'figure_%d.%s' % (len(self.entries), fmt)
+        with open(os.path.join(self.out_dir, name), 'wb') as out:
+            out.write(data)
+        if fname is not None:
+            _write_target(fname, data, self.out_dir, name)
+
+        width, height = _dimensions(data, figure, kwargs.get('dpi'))
+        if id(figure) not in self.saved and self.on_first_save is not None:
+            self.on_first_save(figure, name)
+        self.saved.add(id(figure))
+        self.entries.append({
+            'name': name,
+            'format': fmt,
+            'width': width,
+            'height': height,
+            'title': _title(figure),
+        })
+
+
+def _format_of(fname):
+    import matplotlib
+
+    if isinstance(fname, (str, os.PathLike)):
+        ext = os.path.splitext(os.fspath(fname))[1].lstrip('.').lower()
+        if ext:
+            return ext
+    fmt = matplotlib.rcParams['savefig.format']
+    return 'png' if fmt == 'auto' else fmt
+
+
+def _write_target(fname, data, out_dir, default_name):
+    if isinstance(fname, (str, os.PathLike)):
+        target = _confine(os.fsdecode(fname), out_dir, default_name)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, 'wb') as out:
+            out.write(data)
+    else:
+        fname.write(data)
+
+
+def _confine(target, out_dir, default_name):
+    """Where to write a figure the script saved to target: inside out_dir.
+
+    Relative paths resolve against out_dir. Paths that leave it (absolute
+    paths elsewhere, Windows drive or UNC paths such as
+    C:/Users/me/plot.png, or ../) keep only their file name.
+    """
+    root = os.path.realpath(out_dir)
+    if not ntpath.splitdrive(target)[0]:
+        path = os.path.realpath(os.path.join(root, target))
+        if os.path.commonpath([root, path]) == root and path != root:
+            return path
+    name = re.split(r'[\\/]', target)[-1]
+    return os.path.join(root, name if name not in ('', '.', '..') else default_name)
+
+
+def _dimensions(data, figure, dpi):
+    if data[:8] == PNG_SIGNATURE:
+        return struct.unpack('>II', data[16:24])
+    import matplotlib
+
+    if dpi is None or dpi == 'figure':
+        dpi = matplotlib.rcParams['savefig.dpi']
+    if dpi == 'figure':
+        dpi = figure.dpi
+    width, height = figure.get_size_inches()
+    return round(width * dpi), round(height * dpi)
+
+
+def _title(figure):
+    if getattr(figure, '_suptitle', None) is not None:
+        return figure._suptitle.get_text()
+    for axes in figure.get_axes():
+        if axes.get_title():
+            return axes.get_title()
+    return None
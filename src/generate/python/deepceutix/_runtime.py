@@ -0,0 +1,82 @@
+import json
+import os
+import sys
+
+from ._figures import FigureCapture
+from ._store import ResultStore
+
+MANIFEST_NAME = 'manifest.json'
+
+# Runtime of the script currently executing, if any
+current = None
+
+
+class Runtime:
+    """Collects a script's outputs into its job directory."""
+
+    def __init__(self, out_dir, code):
+        self.out_dir = out_dir
+        self.store = ResultStore(out_dir)
+        self.figures = (
+            FigureCapture(out_dir, self.series_from_figure)
+            if 'matplotlib' in code else None
+        )
+
+    def start(self):
+        global current
+        current = self
+        if self.figures is not None:
+            self.figures.install()
+
+    def finish(self, namespace=None):
+        global current
+        current = None
+        if namespace:
+            self.dataframes_from(namespace)
+        manifest = {
+            'figures': self.figures.finish() if self.figures is not None else [],
+            'series': self.store.series,
+            'tables': self.store.tables,
+        }
+        # NaN/inf would be written as bare NaN/Infinity, which JSON.parse rejects;
+        # raising here gets reported instead of the manifest silently vanishing
+        text = json.dumps(manifest, allow_nan=False)
+        with open(os.path.join(self.out_dir, MANIFEST_NAME), 'w', encoding='utf-8') as out:
+            out.write(text)
+        return manifest
+
+    def dataframes_from(self, namespace):
+        """Register every DataFrame the script left in its globals."""
+        pandas = sys.modules.get('pandas')
+        if pandas is None:
+            return
+        for name, value in list(namespace.items()):
+            if isinstance(value, pandas.DataFrame) and not name.startswith('_'):
+                try:
+                    self.store.add_dataframe(name, value)
+                except Exception as exc:
+                    print('deepceutix: could not save DataFrame %r: %s' % (name, exc),
+                          file=sys.stderr)
+
+    def series_from_figure(self, figure, name):
+        """Register the data behind every line and scatter plot in a figure."""
+        for axes in figure.get_axes():
+            for line in axes.get_lines():
+                self._plotted(name, axes, line.get_label(), line.get_xdata(), line.get_ydata())
+            for collection in axes.collections:
+                offsets = collection.get_offsets()
+                if getattr(offsets, 'ndim', 0) == 2 and len(offsets):
+                    self._plotted(name, axes, collection.get_label(), offsets[:, 0], offsets[:, 1])
+
+    def _plotted(self, figure, axes, label, x, y):
+        # matplotlib labels unlabelled artists "_child0", "_line1", ...
+        if not label or label.startswith('_'):
+            label = None
+        try:
+            self.store.add_series(
+                label or axes.get_title() or 'series_%d' % len(self.store.series),
+                x, y, label=label, figure=figure,
+            )
+        except (TypeError, ValueError):
+            # Unusual artist data (ragged, units objects); the figure is still kept
+            pass
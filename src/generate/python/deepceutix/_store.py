@@ -0,0 +1,168 @@
+import os
+
+# parquet | arrow (Arrow IPC file); both need pyarrow, otherwise NPZ is used
+DATAFRAME_FORMAT = os.environ.get('PYTHON_DATAFRAME_FORMAT', 'parquet').lower()
+EXTENSIONS = {'parquet': 'parquet', 'arrow': 'arrow'}
+
+
+class ResultStore:
+    """Writes registered series and tables to files in the job folder.
+
+    Each entry is stored once, as one uncompressed NPZ (a zip of NPY
+    arrays) per entry, and described in the manifest by name, file, length
+    and per-column dtype. DataFrames go to Parquet or Arrow IPC when pyarrow
+    is installed, with per-column stats.
+    """
+
+    def __init__(self, out_dir):
+        self.out_dir = out_dir
+        self.series = []
+        self.tables = []
+        self.dataframe_ids = set()
+
+    def add_series(self, name, x, y, label=None, figure=None):
+        import numpy as np
+
+        y = _column(y)
+        x = np.arange(len(y)) if x is None else _column(x)
+        if len(x) != len(y):
+            raise ValueError('series %r: x has %d values, y has %d' % (name, len(x), len(y)))
+
+        file = self._write('series_%d.npz' % len(self.series), {'x': x, 'y': y})
+        entry = {
+            'name': name,
+            'file': file,
+            'label': label,
+            'figure': figure,
+            'length': len(y),
+            'x': {'dtype': x.dtype.str},
+            'y': {'dtype': y.dtype.str},
+        }
+        self.series.append(entry)
+        return entry
+
+    def add_table(self, name, columns, kind='table'):
+        arrays = {str(key): _column(values) for key, values in columns.items()}
+        lengths = {len(values) for values in arrays.values()}
+        if len(lengths) > 1:
+            raise ValueError('table %r: columns differ in length' % (name,))
+
+        file = self._write(
+            'table_%d.npz' % len(self.tables),
+            # NPZ member names must be unique and simple; the manifest keeps the real ones
+            {'c%d' % i: values for i, values in enumerate(arrays.values())},
+        )
+        entry = {
+            'name': name,
+            'kind': kind,
+            'file': file,
+            'format': 'npz',
+            'length': lengths.pop() if lengths else 0,
+            'columns': [
+                {'name': key, 'key': 'c%d' % i, 'dtype': values.dtype.str}
+                for i, (key, values) in enumerate(arrays.items())
+            ],
+        }
+        self.tables.append(entry)
+        return entry
+
+    def add_dataframe(self, name, df):
+        if id(df) in self.dataframe_ids:
+            return None
+        self.dataframe_ids.add(id(df))
+        if any(level is not None for level in df.index.names):
+            df = df.reset_index()
+        df = df.loc[:, ~df.columns.duplicated()]
+
+        try:
+            import pyarrow
+        except ImportError:
+            pyarrow = None
+        if pyarrow is None or DATAFRAME_FORMAT not in EXTENSIONS:
+            entry = self.add_table(
+                name, {column: df[column].to_numpy() for column in df.columns}, kind='dataframe',
+            )
+        else:
+            entry = self._write_arrow(name, df, pyarrow)
+        for column, source in zip(entry['columns'], df.columns):
+            column['stats'] = _stats(df[source])
+        return entry
+
+    def _write_arrow(self, name, df, pyarrow):
+        table = pyarrow.Table.from_pandas(
+            df.rename(columns=str), preserve_index=False,
+        )
+        file = 'table_%d.%s' % (len(self.tables), EXTENSIONS[DATAFRAME_FORMAT])
+        path = os.path.join(self.out_dir, file)
+        if DATAFRAME_FORMAT == 'parquet':
+            import pyarrow.parquet
+
+            pyarrow.parquet.write_table(table, path)
+        else:
+            import pyarrow.feather
+
+            pyarrow.feather.write_feather(table, path, compression='uncompressed')
+
+        entry = {
+            'name': name,
+            'kind': 'dataframe',
+            'file': file,
+            'format': DATAFRAME_FORMAT,
+            'length': table.num_rows,
+            'columns': [
+                {'name': str(column), 'key': str(column), 'dtype': str(df[column].dtype)}
+                for column in df.columns
+            ],
+        }
+        self.tables.append(entry)
+        return entry
+
+    def _write(self, file, arrays):
+        import numpy as np
+
+        with open(os.path.join(self.out_dir, file), 'wb') as out:
+            np.savez(out, **arrays)
+        return file
+
+
+def _stats(column):
+    """Null and distinct counts, plus range and mean for numbers and dates."""
+    import pandas as pd
+
+    stats = {'nulls': int(column.isna().sum())}
+    try:
+        stats['distinct'] = int(column.nunique())
+    except TypeError:
+        # Unhashable cells (lists, dicts)
+        pass
+    if pd.api.types.is_bool_dtype(column):
+        stats['true'] = int(column.sum())
+    elif pd.api.types.is_numeric_dtype(column):
+        values = column.dropna()
+        if len(values):
+            stats.update(
+                min=_scalar(values.min()), max=_scalar(values.max()), mean=_scalar(values.mean()),
+            )
+    elif pd.api.types.is_datetime64_any_dtype(column):
+        values = column.dropna()
+        if len(values):
+            stats.update(min=values.min().isoformat(), max=values.max().isoformat())
+    return stats
+
+
+def _scalar(value):
+    value = value.item() if hasattr(value, 'item') else value
+    # NaN/inf are not valid JSON
+    return value if value == value and value not in (float('inf'), float('-inf')) else None
+
+
+def _column(values):
+    import numpy as np
+
+    array = np.asarray(values)
+    if array.ndim != 1:
+        array = array.reshape(-1)
+    if array.dtype.kind == 'O':
+        # Keep files loadable without pickle
+        array = array.astype(str)
+    return array
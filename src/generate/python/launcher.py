@@ -0,0 +1,35 @@
+"""Entry point for one-shot script runs.
+
+    python launcher.py <script.py>        run a script file
+    python launcher.py - <script.py>      read the code from stdin; the path
+                                          only names it in tracebacks
+
+Joins the job's cgroup and applies resource limits (both passed through the
+environment by PythonExecutorService) before running the script.
+"""
+import json
+import os
+import sys
+
+from limits import apply_limits, enter_cgroup
+from preload import run_script
+
+
+def main():
+    if sys.argv[1] == '-':
+        filename = sys.argv[2]
+        code = sys.stdin.buffer.read().decode('utf-8')
+        sys.stdin = open(os.devnull, encoding='utf-8')
+    else:
+        filename = sys.argv[1]
+        with open(filename, encoding='utf-8') as script:
+            code = script.read()
+
+    enter_cgroup(os.environ.get('DEEPCEUTIX_CGROUP'))
+    apply_limits(json.loads(os.environ.get('DEEPCEUTIX_LIMITS') or '{}'))
+    sys.argv = [filename]
+    sys.exit(run_script(code, filename, os.getcwd()))
+
+
+if __name__ == '__main__':
+    main()
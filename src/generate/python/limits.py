@@ -0,0 +1,84 @@
+"""Per-job resource caps for generated scripts (POSIX only).
+
+Limits arrive as the JSON object built by PythonLimitsService, e.g.
+{"memoryMb": 2048, "cpuSeconds": 30, "openFiles": 256, "fileSizeMb": 100}.
+"""
+import os
+import signal
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+MB = 1024 * 1024
+
+# limit key -> (rlimit name, multiplier)
+RLIMITS = {
+    'memoryMb': ('RLIMIT_AS', MB),
+    'cpuSeconds': ('RLIMIT_CPU', 1),
+    'openFiles': ('RLIMIT_NOFILE', 1),
+    'fileSizeMb': ('RLIMIT_FSIZE', MB),
+}
+
+
+def enter_cgroup(path):
+    """Move the calling process into a cgroup v2 directory prepared by Node."""
+    if not path:
+        return
+    with open(os.path.join(path, 'cgroup.procs'), 'w') as procs:
+        procs.write(str(os.getpid()))
+
+
+def apply_limits(limits):
+    """Apply hard caps to a process that runs exactly one job."""
+    if resource is None or not limits:
+        return
+    # Python ignores SIGXFSZ by default; die with it so the status is clear
+    signal.signal(signal.SIGXFSZ, signal.SIG_DFL)
+    for key, (name, scale) in RLIMITS.items():
+        value = limits.get(key)
+        if not value:
+            continue
+        which = getattr(resource, name)
+        soft = int(value * scale)
+        _, hard = resource.getrlimit(which)
+        if hard != resource.RLIM_INFINITY:
+            soft = min(soft, hard)
+        if which == resource.RLIMIT_CPU:
+            # SIGXCPU at the soft limit, SIGKILL a second later
+            hard = soft + 1 if hard == resource.RLIM_INFINITY else hard
+        else:
+            hard = soft if hard == resource.RLIM_INFINITY else hard
+        resource.setrlimit(which, (soft, hard))
+
+
+def apply_soft_limits(limits):
+    """Lower soft limits for one job in a long-lived worker.
+
+    Returns the previous limits so restore_limits can undo them. CPU time is
+    cumulative for the process, so that cap is relative to what was used.
+    """
+    if resource is None or not limits:
+        return {}
+    previous = {}
+    for key, (name, scale) in RLIMITS.items():
+        value = limits.get(key)
+        if not value:
+            continue
+        which = getattr(resource, name)
+        soft, hard = resource.getrlimit(which)
+        target = int(value * scale)
+        if which == resource.RLIMIT_CPU:
+            usage = resource.getrusage(resource.RUSAGE_SELF)
+            target += int(usage.ru_utime + usage.ru_stime) + 1
+        if hard != resource.RLIM_INFINITY:
+            target = min(target, hard)
+        previous[which] = (soft, hard)
+        resource.setrlimit(which, (target, hard))
+    return previous
+
+
+def restore_limits(previous):
+    for which, limits in previous.items():
+        resource.setrlimit(which, limits)
@@ -0,0 +1,88 @@
+"""Scientific stack preloading shared by the long-lived Python executors."""
+import builtins
+import importlib
+import linecache
+import os
+import sys
+import traceback
+
+from deepceutix import Runtime
+
+PRELOAD_MODULES = (
+    'numpy',
+    'pandas',
+    'scipy',
+    'scipy.stats',
+    'matplotlib',
+    'matplotlib.pyplot',
+)
+
+
+def preload():
+    """Import the stack generated scripts rely on; missing packages are skipped."""
+    os.environ.setdefault('MPLBACKEND', 'Agg')
+    loaded = []
+    for name in PRELOAD_MODULES:
+        try:
+            module = importlib.import_module(name)
+        except Exception:
+            continue
+        if name == 'matplotlib':
+            module.use('Agg')
+        loaded.append(name)
+    return loaded
+
+
+def run_script(code, filename, out_dir=None):
+    """Run code as __main__ in a fresh namespace and return its exit code.
+
+    With out_dir, figures and other results are collected there as the
+    script runs and described in out_dir/manifest.json afterwards.
+    """
+    # Tracebacks show source lines even when the script never touched disk
+    linecache.cache[filename] = (len(code), None, code.splitlines(True), filename)
+    namespace = {
+        '__name__': '__main__',
+        '__file__': filename,
+        '__builtins__': builtins,
+    }
+    runtime = Runtime(out_dir, code) if out_dir else None
+    try:
+        if runtime is not None:
+            runtime.start()
+        exec(compile(code, filename, 'exec'), namespace)
+        return 0
+    except SystemExit as exc:
+        return _exit_code(exc.code)
+    except BaseException:
+        etype, value, tb = sys.exc_info()
+        # Drop this frame so the traceback starts in the user's script
+        traceback.print_exception(etype, value, tb.tb_next)
+        return 1
+    finally:
+        if runtime is not None:
+            _finish(runtime, namespace)
+        reset_plots()
+
+
+def reset_plots():
+    pyplot = sys.modules.get('matplotlib.pyplot')
+    if pyplot is not None:
+        pyplot.close('all')
+
+
+def _finish(runtime, namespace):
+    try:
+        runtime.finish(namespace)
+    except Exception:
+        print('deepceutix: failed to collect results', file=sys.stderr)
+        traceback.print_exc()
+
+
+def _exit_code(code):
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    print(code, file=sys.stderr)
+    return 1
@@ -0,0 +1,130 @@
+"""Long-lived worker process for PythonWorkerPoolService.
+
+Reads one JSON job per line on stdin and answers with one JSON line on the
+original stdout. Script output is captured per job so it never mixes with
+the protocol stream.
+"""
+import io
+import json
+import os
+import sys
+
+from limits import apply_soft_limits, restore_limits
+from preload import preload, run_script
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Default for jobs sent without maxOutputBytes, as PYTHON_OUTPUT_MAX_BYTES
+MAX_OUTPUT_BYTES = 1024 * 1024
+
+
+def rss_mb():
+    try:
+        with open('/proc/self/statm') as statm:
+            pages = int(statm.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        pass
+    if resource is not None:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return 0
+
+
+def send(proto, message):
+    proto.write(json.dumps(message) + '\n')
+    proto.flush()
+
+
+class OutputBudget:
+    """Bytes of output a job may still write, shared by stdout and stderr."""
+
+    def __init__(self, max_bytes):
+        self.remaining = max_bytes
+        self.truncated = False
+
+    def take(self, text):
+        """The part of text that fits; everything after the limit is dropped."""
+        if self.truncated:
+            return ''
+        data = text.encode('utf-8', 'replace')
+        if len(data) > self.remaining:
+            # 'ignore' drops a character cut in half by the limit
+            text = data[:self.remaining].decode('utf-8', 'ignore')
+            data = text.encode('utf-8')
+            self.truncated = True
+        self.remaining -= len(data)
+        return text
+
+
+class CapturedOutput(io.StringIO):
+    """Captures script output within a budget, forwarding it as it happens
+    when the job streams."""
+
+    def __init__(self, budget, proto=None, job_id=None, name=None):
+        super().__init__()
+        self.budget = budget
+        self.proto = proto
+        self.job_id = job_id
+        self.name = name
+
+    def write(self, text):
+        kept = self.budget.take(text)
+        if kept:
+            if self.proto is not None:
+                send(self.proto, {
+                    'type': 'output',
+                    'id': self.job_id,
+                    'stream': self.name,
+                    'data': kept,
+                })
+            super().write(kept)
+        # Report everything as written, so scripts never see a short write
+        return len(text)
+
+
+def main():
+    proto = os.fdopen(os.dup(1), 'w', encoding='utf-8')
+    # Stray writes to fd 1 (subprocesses, C extensions) must not corrupt the protocol
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, 1)
+    os.close(devnull)
+    jobs = sys.stdin
+    sys.stdin = io.StringIO()
+
+    loaded = preload()
+    home = os.getcwd()
+    send(proto, {'type': 'ready', 'pid': os.getpid(), 'preloaded': loaded})
+
+    for line in jobs:
+        if not line.strip():
+            continue
+        job = json.loads(line)
+        budget = OutputBudget(job.get('maxOutputBytes') or MAX_OUTPUT_BYTES)
+        streaming = proto if job.get('stream') else None
+        stdout = CapturedOutput(budget, streaming, job['id'], 'stdout')
+        stderr = CapturedOutput(budget, streaming, job['id'], 'stderr')
+        sys.stdout, sys.stderr, sys.stdin = stdout, stderr, io.StringIO()
+        previous = apply_soft_limits(job.get('limits'))
+        try:
+            os.chdir(job.get('cwd') or home)
+            exit_code = run_script(job['code'], job['filename'], job.get('cwd'))
+        finally:
+            restore_limits(previous)
+            sys.stdout, sys.stderr = sys.__stdout__, sys.__stderr__
+            os.chdir(home)
+        send(proto, {
+            'type': 'result',
+            'id': job['id'],
+            'exitCode': exit_code,
+            'stdout': stdout.getvalue(),
+            'stderr': stderr.getvalue(),
+            'truncated': budget.truncated,
+            'rssMb': rss_mb(),
+        })
+
+
+if __name__ == '__main__':
+    main()
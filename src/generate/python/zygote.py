@@ -0,0 +1,234 @@
+"""Fork server for PythonForkServerService.
+
+Imports the scientific stack once, then forks a fresh child per job so every
+script starts from the same clean, pre-imported state. Jobs arrive as JSON
+lines on stdin; results leave as JSON lines on the original stdout. POSIX only.
+"""
+import codecs
+import json
+import os
+import selectors
+import signal
+import sys
+import traceback
+
+from limits import apply_limits, enter_cgroup
+from preload import preload, run_script
+
+CHUNK_SIZE = 65536
+# Default for jobs sent without maxOutputBytes, as PYTHON_OUTPUT_MAX_BYTES
+MAX_OUTPUT_BYTES = 1024 * 1024
+# The result is a short JSON line; anything past this is not from run_child
+MAX_RESULT_BYTES = 1024 * 1024
+
+
+class Child:
+    def __init__(self, job_id, pid, streams, result_fd, stream, max_output):
+        self.id = job_id
+        self.pid = pid
+        self.streams = streams
+        self.result_fd = result_fd
+        self.stream = stream
+        # Byte budget shared by stdout and stderr; output past it is read and dropped
+        self.remaining = max_output
+        self.truncated = False
+        self.output = {name: bytearray() for name in streams.values()}
+        self.decoders = {
+            name: codecs.getincrementaldecoder('utf-8')('replace')
+            for name in streams.values()
+        }
+        self.result = bytearray()
+        self.open_fds = len(streams) + 1
+
+    def accept(self, data):
+        """The part of data that fits the output budget."""
+        if len(data) > self.remaining:
+            # Nothing after the cut, or stderr could continue past a cut stdout
+            data = utf8_prefix(data, self.remaining)
+            self.truncated = True
+            self.remaining = 0
+            return data
+        self.remaining -= len(data)
+        return data
+
+
+def utf8_prefix(data, size):
+    """data cut to at most size bytes, without splitting a character."""
+    while size > 0 and data[size] & 0xC0 == 0x80:
+        size -= 1
+    return data[:size]
+
+
+def list_artifacts(cwd, script):
+    return sorted(
+        name for name in os.listdir(cwd)
+        if os.path.join(cwd, name) != script
+        and os.path.isfile(os.path.join(cwd, name))
+    )
+
+
+def run_child(job, fds):
+    """Runs in the forked child; never returns."""
+    exit_code = 1
+    try:
+        os.setpgid(0, 0)
+        os.close(fds['proto'])
+        os.close(fds['jobs'])
+        for fd in (fds['out_r'], fds['err_r'], fds['res_r']):
+            os.close(fd)
+        devnull = os.open(os.devnull, os.O_RDONLY)
+        os.dup2(devnull, 0)
+        os.dup2(fds['out_w'], 1)
+        os.dup2(fds['err_w'], 2)
+        sys.stdin = open(0, 'r', closefd=False)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        enter_cgroup(job.get('cgroup'))
+        apply_limits(job.get('limits'))
+
+        # Children would otherwise share the zygote's RNG state;
+        # the stdlib random module already reseeds itself on fork
+        numpy = sys.modules.get('numpy')
+        if numpy is not None:
+            numpy.random.seed()
+
+        os.chdir(job['cwd'])
+        exit_code = run_script(job['code'], job['filename'], job['cwd'])
+        sys.stdout.flush()
+        sys.stderr.flush()
+        result = {
+            'exitCode': exit_code,
+            'artifacts': list_artifacts(job['cwd'], job['filename']),
+        }
+        os.write(fds['res_w'], json.dumps(result).encode('utf-8'))
+    except BaseException:
+        traceback.print_exc()
+    finally:
+        os._exit(exit_code)
+
+
+class Zygote:
+    def __init__(self):
+        self.proto = os.fdopen(os.dup(1), 'w', encoding='utf-8')
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, 1)
+        os.close(devnull)
+        self.selector = selectors.DefaultSelector()
+        self.children = {}
+        self.pending = b''
+        self.accepting = True
+
+    def send(self, message):
+        self.proto.write(json.dumps(message) + '\n')
+        self.proto.flush()
+
+    def serve(self):
+        loaded = preload()
+        self.selector.register(0, selectors.EVENT_READ, ('jobs', None))
+        self.send({'type': 'ready', 'pid': os.getpid(), 'preloaded': loaded})
+
+        while self.accepting or self.children:
+            for key, _ in self.selector.select():
+                kind, child = key.data
+                if kind == 'jobs':
+                    self.read_jobs()
+                else:
+                    self.read_child(key.fd, kind, child)
+
+    def read_jobs(self):
+        data = os.read(0, CHUNK_SIZE)
+        if not data:
+            self.accepting = False
+            self.selector.unregister(0)
+            return
+        self.pending += data
+        *lines, self.pending = self.pending.split(b'\n')
+        for line in lines:
+            if line.strip():
+                self.dispatch(json.loads(line))
+
+    def dispatch(self, message):
+        if message.get('op') == 'kill':
+            child = self.children.get(message['id'])
+            if child is not None:
+                try:
+                    os.killpg(child.pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+            return
+        self.fork(message)
+
+    def fork(self, job):
+        out_r, out_w = os.pipe()
+        err_r, err_w = os.pipe()
+        res_r, res_w = os.pipe()
+        fds = {
+            'proto': self.proto.fileno(), 'jobs': 0,
+            'out_r': out_r, 'out_w': out_w,
+            'err_r': err_r, 'err_w': err_w,
+            'res_r': res_r, 'res_w': res_w,
+        }
+        pid = os.fork()
+        if pid == 0:
+            run_child(job, fds)
+
+        for fd in (out_w, err_w, res_w):
+            os.close(fd)
+        child = Child(
+            job['id'], pid, {out_r: 'stdout', err_r: 'stderr'}, res_r,
+            bool(job.get('stream')), job.get('maxOutputBytes') or MAX_OUTPUT_BYTES,
+        )
+        self.children[child.id] = child
+        for fd, name in child.streams.items():
+            self.selector.register(fd, selectors.EVENT_READ, (name, child))
+        self.selector.register(res_r, selectors.EVENT_READ, ('result', child))
+
+    def read_child(self, fd, kind, child):
+        data = os.read(fd, CHUNK_SIZE)
+        if data:
+            if kind == 'result':
+                if len(child.result) < MAX_RESULT_BYTES:
+                    child.result += data
+                return
+            data = child.accept(data)
+            if not data:
+                return
+            child.output[kind] += data
+            if child.stream:
+                text = child.decoders[kind].decode(data)
+                if text:
+                    self.send({
+                        'type': 'output',
+                        'id': child.id,
+                        'stream': kind,
+                        'data': text,
+                    })
+            return
+
+        self.selector.unregister(fd)
+        os.close(fd)
+        child.open_fds -= 1
+        if child.open_fds == 0:
+            self.finish(child)
+
+    def finish(self, child):
+        del self.children[child.id]
+        _, status = os.waitpid(child.pid, 0)
+        code = os.waitstatus_to_exitcode(status)
+        try:
+            result = json.loads(child.result) if child.result else {}
+        except ValueError:
+            result = {}
+        self.send({
+            'type': 'result',
+            'id': child.id,
+            'exitCode': code if code >= 0 else None,
+            'signal': signal.Signals(-code).name if code < 0 else None,
+            'stdout': child.output['stdout'].decode('utf-8', 'replace'),
+            'stderr': child.output['stderr'].decode('utf-8', 'replace'),
+            'truncated': child.truncated,
+            'artifacts': result.get('artifacts'),
+        })
+
+
+if __name__ == '__main__':
+    Zygote().serve()
@@ -0,0 +1,23 @@
+import { ReplayFeed } from './replay-feed';
+
+describe('ReplayFeed', () => {
+  const collect = async (items: AsyncIterable<string>) => {
+    const received: string[] = [];
+    for await (const item of items) received.push(item);
+    return received;
+  };
+
+  it('replays earlier items to late readers, then follows the writer', async () => {
+    const feed = new ReplayFeed<string>();
+    const early = collect(feed.read());
+    feed.push('a');
+    await new Promise((resolve) => setImmediate(resolve));
+    const late = collect(feed.read());
+    feed.push('b');
+    feed.end();
+
+    await expect(early).resolves.toEqual(['a', 'b']);
+    await expect(late).resolves.toEqual(['a', 'b']);
+    await expect(collect(feed.read())).resolves.toEqual(['a', 'b']);
+  });
+});
@@ -0,0 +1,34 @@
+/**
+ * Items produced by one writer, readable by any number of readers. Each
+ * reader gets everything pushed so far, then the rest as it arrives, until
+ * the feed ends.
+ */
+export class ReplayFeed<T> {
+  private readonly items: T[] = [];
+  private ended = false;
+  private waiting: (() => void)[] = [];
+
+  push(item: T) {
+    this.items.push(item);
+    this.wake();
+  }
+
+  end() {
+    this.ended = true;
+    this.wake();
+  }
+
+  async *read(): AsyncGenerator<T> {
+    for (let next = 0; ; ) {
+      while (next < this.items.length) yield this.items[next++];
+      if (this.ended) return;
+      await new Promise<void>((resolve) => this.waiting.push(resolve));
+    }
+  }
+
+  private wake() {
+    const waiting = this.waiting;
+    this.waiting = [];
+    for (const resolve of waiting) resolve();
+  }
+}
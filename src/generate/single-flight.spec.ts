@@ -0,0 +1,72 @@
+import { SingleFlight } from './single-flight';
+
+describe('SingleFlight', () => {
+  it('shares one pending call between identical requests', async () => {
+    const flight = new SingleFlight<string>();
+    let release!: (value: string) => void;
+    const work = jest.fn(() => new Promise<string>((resolve) => (release = resolve)));
+
+    const calls = [flight.run('a', work), flight.run('a', work), flight.run('b', async () => 'b')];
+    expect(flight.stats()).toEqual({ inFlight: 2, saved: 1 });
+    release('a');
+
+    await expect(Promise.all(calls)).resolves.toEqual(['a', 'a', 'b']);
+    expect(work).toHaveBeenCalledTimes(1);
+    expect(flight.stats()).toEqual({ inFlight: 0, saved: 1 });
+  });
+
+  it('propagates failures to every caller and forgets the key', async () => {
+    const flight = new SingleFlight<string>();
+    const failing = flight.run('a', () => Promise.reject(new Error('upstream down')));
+    const joined = flight.run('a', async () => 'unused');
+
+    await expect(failing).rejects.toThrow('upstream down');
+    await expect(joined).rejects.toThrow('upstream down');
+    await expect(flight.run('a', async () => 'retry')).resolves.toBe('retry');
+  });
+
+  it('cancels the work only once every caller has aborted', async () => {
+    const flight = new SingleFlight<string>();
+    const callers = [new AbortController(), new AbortController()];
+    let workSignal!: AbortSignal;
+    const work = (signal: AbortSignal) =>
+      new Promise<string>((_, reject) => {
+        workSignal = signal;
+        signal.addEventListener('abort', () => reject(new Error('cancelled')));
+      });
+
+    const calls = callers.map((caller) => flight.run('a', work, caller.signal));
+    callers[0].abort();
+    expect(workSignal.aborted).toBe(false);
+    callers[1].abort();
+    expect(workSignal.aborted).toBe(true);
+
+    await expect(Promise.all(calls)).rejects.toThrow('cancelled');
+  });
+
+  it('starts fresh work once every caller has aborted, before the old work settles', async () => {
+    const flight = new SingleFlight<string>();
+    const caller = new AbortController();
+    // Ignores the abort, like an upstream call that is slow to wind down
+    let settleStale!: (value: string) => void;
+    const stale = flight.run(
+      'a',
+      () => new Promise((resolve) => (settleStale = resolve)),
+      caller.signal,
+    );
+    caller.abort();
+
+    let release!: (value: string) => void;
+    const work = jest.fn(() => new Promise<string>((resolve) => (release = resolve)));
+    const fresh = flight.run('a', work);
+    settleStale('stale');
+    await stale;
+
+    // The stale flight settling must not drop the fresh one
+    expect(flight.run('a', work)).toBe(fresh);
+    release('fresh');
+    await expect(fresh).resolves.toBe('fresh');
+    expect(work).toHaveBeenCalledTimes(1);
+    expect(flight.stats()).toEqual({ inFlight: 0, saved: 1 });
+  });
+});
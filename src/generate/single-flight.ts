@@ -0,0 +1,63 @@
+interface Flight<T> {
+  promise: Promise<T>;
+  controller: AbortController;
+  // Callers still waiting for the result
+  callers: number;
+}
+
+/**
+ * Deduplicates concurrent work by key: while a call for a key is pending,
+ * further callers with the same key share its promise instead of starting
+ * their own. The entry is dropped once the call settles, so later callers
+ * start fresh. The work is cancelled only once every caller has aborted,
+ * and the key is dropped right then.
+ */
+export class SingleFlight<T> {
+  private readonly pending = new Map<string, Flight<T>>();
+  private sharedCalls = 0;
+
+  run(
+    key: string,
+    work: (signal: AbortSignal) => Promise<T>,
+    signal?: AbortSignal,
+  ): Promise<T> {
+    let flight = this.pending.get(key);
+    if (flight) {
+      this.sharedCalls++;
+    } else {
+      const controller = new AbortController();
+      const started = { controller, callers: 0 } as Flight<T>;
+      started.promise = (async () => {
+        try {
+          return await work(controller.signal);
+        } finally {
+          this.forget(key, started);
+        }
+      })();
+      flight = started;
+      this.pending.set(key, flight);
+    }
+
+    const joined = flight;
+    joined.callers++;
+    const leave = () => {
+      if (--joined.callers === 0) {
+        // The cancelled work may take a while to settle; callers from now on start fresh
+        this.forget(key, joined);
+        joined.controller.abort(signal!.reason);
+      }
+    };
+    if (signal?.aborted) leave();
+    else signal?.addEventListener('abort', leave, { once: true });
+    return joined.promise;
+  }
+
+  stats() {
+    return { inFlight: this.pending.size, saved: this.sharedCalls };
+  }
+
+  // A newer flight may hold the key by the time an old one settles
+  private forget(key: string, flight: Flight<T>) {
+    if (this.pending.get(key) === flight) this.pending.delete(key);
+  }
+}
@@ -5,6 +5,7 @@ import * as dotenv from 'dotenv';
 async function bootstrap() {
   dotenv.config();
   const app = await NestFactory.create(AppModule, { cors: true });
+  app.enableShutdownHooks();
   await app.listen(process.env.PORT || 3001);
 }
 bootstrap();